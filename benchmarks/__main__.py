@@ -0,0 +1,7 @@
+"""Run the benchmarks with python -m benchmarks."""
+
+from .run import main
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Synthetic TIL repositories for benchmarking."""
+
+import datetime
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+from git import Actor, Repo
+
+
+WORDS = (
+    "array",
+    "buffer",
+    "cache",
+    "commit",
+    "config",
+    "cursor",
+    "daemon",
+    "deploy",
+    "diff",
+    "docker",
+    "encoding",
+    "feature",
+    "function",
+    "git",
+    "handler",
+    "index",
+    "iterator",
+    "json",
+    "kernel",
+    "lambda",
+    "latency",
+    "markdown",
+    "memory",
+    "module",
+    "network",
+    "parser",
+    "pipeline",
+    "process",
+    "query",
+    "regex",
+    "request",
+    "schema",
+    "shell",
+    "socket",
+    "sqlite",
+    "stream",
+    "string",
+    "syntax",
+    "template",
+    "thread",
+    "token",
+    "unicode",
+    "vector",
+    "watch",
+    "window",
+)
+
+AUTHOR = Actor("Benchmark", "benchmark@example.com")
+
+# Commit times start here and advance an hour per commit
+EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Shape of a synthetic TIL repository."""
+
+    # Topic directories under content/
+    topics: int = 10
+    # TIL files at the last commit
+    files: int = 200
+    # Approximate size of each file's markdown body
+    body_bytes: int = 2000
+    # Commits in the history; files are added across all of them
+    commits: int = 50
+    # Files renamed within their topic over the history
+    renames: int = 10
+    # Existing files edited by each commit after the first
+    edits_per_commit: int = 2
+    # Seed for the random content, so a spec always gives the same corpus
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        """Validate the spec."""
+        if self.topics < 1 or self.files < 1 or self.commits < 1:
+            raise ValueError("topics, files and commits must be at least 1")
+        if self.renames > self.files:
+            raise ValueError("renames cannot exceed files")
+
+
+def markdown_body(rng: random.Random, size: int) -> str:
+    """Markdown of roughly size bytes with the constructs TILs use.
+
+    Args:
+        rng: Random source
+        size: Target size in bytes
+
+    Returns:
+        Paragraphs with inline code, links, a list and a code block
+
+    """
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.15:
+            lines = [f"    {' '.join(rng.choices(WORDS, k=6))}" for _ in range(4)]
+            part = "```python\n" + "\n".join(lines) + "\n```"
+        elif kind < 0.3:
+            part = "\n".join(f"- {' '.join(rng.choices(WORDS, k=5))}" for _ in range(4))
+        else:
+            words = rng.choices(WORDS, k=rng.randint(30, 60))
+            words[rng.randrange(len(words))] = f"`{rng.choice(WORDS)}()`"
+            words[rng.randrange(len(words))] = (
+                f"[{rng.choice(WORDS)}](https://example.com/{rng.choice(WORDS)})"
+            )
+            part = " ".join(words).capitalize() + "."
+        parts.append(part)
+        length += len(part) + 2
+    return "\n\n".join(parts)
+
+
+def generate_corpus(root: Path, spec: CorpusSpec) -> Repo:
+    """Create a git repository of synthetic TIL files.
+
+    Files are spread over the topics and added over the commits, each
+    commit after the first also edits a few existing files, and some files
+    are renamed along the way, so history extraction sees a realistic mix
+    of additions, modifications and renames.
+
+    Args:
+        root: Empty or missing directory to create the repository in
+        spec: Shape of the corpus
+
+    Returns:
+        The repository, with every file committed
+
+    """
+    rng = random.Random(spec.seed)  # noqa: S311
+    root.mkdir(parents=True, exist_ok=True)
+    repo = Repo.init(root)
+    topics = [f"{rng.choice(WORDS)}-{index}" for index in range(spec.topics)]
+
+    # Commit that adds each file, spread evenly over the history
+    added_in = [index * spec.commits // spec.files for index in range(spec.files)]
+    # Commits that rename a file, spread over all but the first
+    rename_commits = sorted(
+        rng.choices(range(1, spec.commits), k=spec.renames) if spec.commits > 1 else []
+    )
+
+    paths: list[str] = []
+    renamed = 0
+    for commit in range(spec.commits):
+        changed: list[str] = []
+        for index in (i for i, added in enumerate(added_in) if added == commit):
+            topic = topics[index % spec.topics]
+            path = f"content/{topic}/{rng.choice(WORDS)}-{index}.md"
+            title = " ".join(rng.choices(WORDS, k=5)).capitalize()
+            _write(root / path, f"# {title}\n\n{markdown_body(rng, spec.body_bytes)}\n")
+            paths.append(path)
+            changed.append(path)
+
+        existing = [path for path in paths if path not in changed]
+        if commit and existing:
+            for path in rng.sample(existing, min(spec.edits_per_commit, len(existing))):
+                with (root / path).open("a", encoding="utf-8") as f:
+                    f.write(f"\n{' '.join(rng.choices(WORDS, k=12)).capitalize()}.\n")
+                changed.append(path)
+
+        if changed:
+            repo.index.add(changed)
+
+        for _ in range(rename_commits.count(commit)):
+            candidates = [path for path in paths if path not in changed]
+            if not candidates:
+                break
+            source = rng.choice(candidates)
+            target = source.replace(".md", f"-renamed-{renamed}.md")
+            renamed += 1
+            repo.index.move([source, target])
+            paths[paths.index(source)] = target
+            changed.append(target)
+
+        # Git's internal "<unix time> <offset>" date format
+        moment = EPOCH + datetime.timedelta(hours=commit)
+        date = f"{int(moment.timestamp())} +0000"
+        repo.index.commit(
+            f"Commit {commit}",
+            author=AUTHOR,
+            committer=AUTHOR,
+            author_date=date,
+            commit_date=date,
+        )
+
+    return repo
+
+
+def _write(path: Path, text: str) -> None:
+    """Write a file, creating its directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
@@ -0,0 +1,421 @@
+"""Benchmarks of the build pipeline against a synthetic corpus."""
+
+import contextlib
+import datetime
+import html
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional
+
+import click
+import httpx
+
+from til.config import TILConfig
+from til.database import TILDatabase
+from til.database_validator import DatabaseValidator
+from til.mock_api import MockAPIConfig, MockMarkdownAPI
+from til.processor import TILProcessor
+from til.readme_generator import ReadmeGenerator
+from til.repository import GitRepository
+
+from .corpus import CorpusSpec, generate_corpus
+
+
+RESULTS_VERSION = 1
+
+# Any token will do for the stand-in API; setting one keeps the renderer
+# from warning about rate limits on every request
+STAND_IN_TOKEN = "benchmark"  # noqa: S105
+
+# Benchmarks whose median grows by more than this fraction are regressions
+DEFAULT_MAX_REGRESSION = 0.25
+
+
+class Benchmark(NamedTuple):
+    """A timed operation and the untimed setup run before each repeat."""
+
+    name: str
+    setup: Callable[[], Any]
+    # Runs the operation on the setup's result; returns the items handled
+    run: Callable[[Any], int]
+
+
+def stand_in_client(latency: float = 0.0) -> httpx.Client:
+    """HTTP client answering markdown API requests locally.
+
+    Args:
+        latency: Seconds each response is delayed by, to model the network
+
+    Returns:
+        Client whose transport renders paragraphs without leaving the process
+
+    """
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if latency:
+            time.sleep(latency)
+        text = json.loads(request.content)["text"]
+        paragraphs = (
+            f"<p>{html.escape(block)}</p>" for block in text.split("\n\n") if block
+        )
+        return httpx.Response(200, text="\n".join(paragraphs))
+
+    return httpx.Client(transport=httpx.MockTransport(handle))
+
+
+def build_reference(config: TILConfig, client: httpx.Client) -> Path:
+    """Build the database the read-only benchmarks run against."""
+    processor = TILProcessor(config)
+    processor.renderer.client = client
+    processor.build_database()
+    processor.database.close()
+    return config.database_path
+
+
+def suite(
+    corpus: Path,
+    workdir: Path,
+    client: httpx.Client,
+    reference: Path,
+    api_url: str = TILConfig.markdown_api_url,
+) -> list[Benchmark]:
+    """The benchmarks, each isolated from the state left by the others.
+
+    Args:
+        corpus: Root of the synthetic repository
+        workdir: Scratch directory for databases
+        client: Stand-in markdown API client
+        reference: Database built from the corpus
+        api_url: Markdown API endpoint the client sends requests to
+
+    Returns:
+        Benchmarks in the order they run
+
+    """
+    database = TILDatabase(reference)
+    records = [dict(row) for row in database.get_table().rows]
+    database.close()
+    scratch = workdir / "scratch.db"
+
+    def fresh_scratch() -> None:
+        for path in workdir.glob("scratch.db*"):
+            path.unlink()
+
+    def history_setup() -> GitRepository:
+        # A new handle, so the history cache starts cold
+        return GitRepository(corpus)
+
+    def processor_setup() -> TILProcessor:
+        fresh_scratch()
+        config = TILConfig(
+            root_path=corpus,
+            database_name=str(scratch),
+            github_token=STAND_IN_TOKEN,
+            markdown_api_url=api_url,
+        )
+        processor = TILProcessor(config)
+        processor.renderer.client = client
+        return processor
+
+    def process_all_files(processor: TILProcessor) -> int:
+        processor.process_all_files()
+        count = processor.database.count()
+        processor.database.close()
+        return count
+
+    def upsert_setup() -> TILDatabase:
+        fresh_scratch()
+        return TILDatabase(scratch)
+
+    def upsert_records(database: TILDatabase) -> int:
+        for record in records:
+            database.upsert_record(record)
+        database.close()
+        return len(records)
+
+    def search_setup() -> TILDatabase:
+        fresh_scratch()
+        shutil.copyfile(reference, scratch)
+        return TILDatabase(scratch)
+
+    def enable_search(database: TILDatabase) -> int:
+        database.enable_search()
+        database.close()
+        return len(records)
+
+    def generate_index(database: TILDatabase) -> int:
+        ReadmeGenerator(database).generate_index()
+        return len(records)
+
+    def validate(validator: DatabaseValidator) -> int:
+        validator.run_all_validations()
+        return len(records)
+
+    return [
+        Benchmark(
+            "get_file_history",
+            history_setup,
+            lambda repository: len(repository.get_file_history()),
+        ),
+        Benchmark("process_all_files", processor_setup, process_all_files),
+        Benchmark("upsert_record", upsert_setup, upsert_records),
+        Benchmark("enable_search", search_setup, enable_search),
+        Benchmark("generate_index", lambda: TILDatabase(reference), generate_index),
+        Benchmark("validate", lambda: DatabaseValidator(reference), validate),
+    ]
+
+
+def measure(benchmark: Benchmark, repeats: int) -> dict[str, Any]:
+    """Time a benchmark.
+
+    Args:
+        benchmark: Benchmark to run
+        repeats: Number of timed runs
+
+    Returns:
+        Summary of the run times in seconds and the items handled per run
+
+    """
+    times = []
+    items = 0
+    for _ in range(repeats):
+        state = benchmark.setup()
+        started = time.perf_counter()
+        items = benchmark.run(state)
+        times.append(time.perf_counter() - started)
+
+    median = statistics.median(times)
+    return {
+        "repeats": repeats,
+        "items": items,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "per_item": median / items if items else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Commit of the code being benchmarked, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(  # noqa: PLR0913, PLR0917
+    spec: CorpusSpec,
+    repeats: int = 3,
+    api_latency: float = 0.0,
+    only: Optional[set[str]] = None,
+    corpus_dir: Optional[Path] = None,
+    api_server: bool = False,
+) -> dict[str, Any]:
+    """Generate a corpus and run the benchmarks against it.
+
+    Args:
+        spec: Shape of the corpus
+        repeats: Timed runs of each benchmark
+        api_latency: Seconds the stand-in markdown API waits per request
+        only: Names of the benchmarks to run (default: all)
+        corpus_dir: Directory to generate the corpus in (default: a
+            temporary directory removed afterwards)
+        api_server: Render through a local MockMarkdownAPI over HTTP
+            instead of an in-process transport, to include the cost of
+            the HTTP stack
+
+    Returns:
+        Results document, as written by --output
+
+    """
+    with tempfile.TemporaryDirectory(prefix="til-bench-") as tmp:
+        workdir = Path(tmp)
+        corpus = corpus_dir or workdir / "corpus"
+        started = time.perf_counter()
+        generate_corpus(corpus, spec)
+        generated = time.perf_counter() - started
+
+        with contextlib.ExitStack() as stack:
+            if api_server:
+                server = stack.enter_context(
+                    MockMarkdownAPI(MockAPIConfig(latency=api_latency))
+                )
+                client = stack.enter_context(httpx.Client())
+                api_url = server.url
+            else:
+                client = stack.enter_context(stand_in_client(api_latency))
+                api_url = TILConfig.markdown_api_url
+            config = TILConfig(
+                root_path=corpus,
+                database_name=str(workdir / "reference.db"),
+                github_token=STAND_IN_TOKEN,
+                markdown_api_url=api_url,
+            )
+            reference = build_reference(config, client)
+            results = {
+                benchmark.name: measure(benchmark, repeats)
+                for benchmark in suite(corpus, workdir, client, reference, api_url)
+                if not only or benchmark.name in only
+            }
+
+    return {
+        "version": RESULTS_VERSION,
+        "created_utc": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": asdict(spec),
+        "corpus_seconds": generated,
+        "api_latency": api_latency,
+        "api_server": api_server,
+        "benchmarks": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    max_regression: float = DEFAULT_MAX_REGRESSION,
+) -> list[tuple[str, float, float, bool]]:
+    """Compare median times of two result documents.
+
+    Args:
+        baseline: Results from the reference commit
+        current: Results to check
+        max_regression: Fraction by which a median may grow
+
+    Returns:
+        (name, baseline median, current median, regressed) for each
+        benchmark in both documents
+
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if not before:
+            continue
+        regressed = result["median"] > before["median"] * (1 + max_regression)
+        rows.append((name, before["median"], result["median"], regressed))
+    return rows
+
+
+@click.command()
+@click.option("--topics", default=CorpusSpec.topics, show_default=True)
+@click.option("--files", default=CorpusSpec.files, show_default=True)
+@click.option("--body-bytes", default=CorpusSpec.body_bytes, show_default=True)
+@click.option("--commits", default=CorpusSpec.commits, show_default=True)
+@click.option("--renames", default=CorpusSpec.renames, show_default=True)
+@click.option("--seed", default=CorpusSpec.seed, show_default=True)
+@click.option("--repeats", default=3, show_default=True, help="Timed runs of each")
+@click.option(
+    "--api-latency",
+    default=0.0,
+    show_default=True,
+    help="Seconds the stand-in markdown API waits per request",
+)
+@click.option(
+    "--api-server",
+    is_flag=True,
+    help="Render through a local stand-in API server over HTTP",
+)
+@click.option("--only", multiple=True, help="Run only the named benchmarks")
+@click.option(
+    "--corpus-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Keep the generated corpus in this directory",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the results as JSON",
+)
+@click.option(
+    "--compare",
+    "baseline_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Results JSON from an earlier commit to compare against",
+)
+@click.option(
+    "--max-regression",
+    default=DEFAULT_MAX_REGRESSION,
+    show_default=True,
+    help="Fail when a median grows by more than this fraction of the baseline",
+)
+def main(  # noqa: PLR0913, PLR0917
+    topics: int,
+    files: int,
+    body_bytes: int,
+    commits: int,
+    renames: int,
+    seed: int,
+    repeats: int,
+    api_latency: float,
+    api_server: bool,
+    only: tuple[str, ...],
+    corpus_dir: Optional[Path],
+    output: Optional[Path],
+    baseline_path: Optional[Path],
+    max_regression: float,
+) -> None:
+    """Benchmark the build pipeline on a synthetic corpus."""
+    logging.basicConfig(level=logging.WARNING)
+    spec = CorpusSpec(
+        topics=topics,
+        files=files,
+        body_bytes=body_bytes,
+        commits=commits,
+        renames=renames,
+        seed=seed,
+    )
+    results = run_benchmarks(
+        spec,
+        repeats=repeats,
+        api_latency=api_latency,
+        api_server=api_server,
+        only=set(only) or None,
+        corpus_dir=corpus_dir,
+    )
+
+    click.echo(f"{'Benchmark':<20}{'Median s':>12}{'Min s':>12}{'Items':>8}")
+    for name, result in results["benchmarks"].items():
+        click.echo(
+            f"{name:<20}{result['median']:>12.4f}{result['min']:>12.4f}"
+            f"{result['items']:>8}"
+        )
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2) + "\n")
+        click.echo(f"Results written to {output}")
+
+    if baseline_path:
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get("corpus") != results["corpus"]:
+            click.echo("Warning: baseline was run on a different corpus", err=True)
+        rows = compare(baseline, results, max_regression)
+        click.echo(
+            f"\n{'Benchmark':<20}{'Baseline s':>12}{'Current s':>12}{'Change':>9}"
+        )
+        for name, before, after, regressed in rows:
+            change = (after - before) / before * 100 if before else 0.0
+            flag = "  REGRESSION" if regressed else ""
+            click.echo(f"{name:<20}{before:>12.4f}{after:>12.4f}{change:>8.1f}%{flag}")
+        if any(regressed for *_, regressed in rows):
+            sys.exit(1)
@@ -0,0 +1,29 @@
+import zlib
+from typing import Any
+
+from datasette import hookimpl
+
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Matches til.compression: zstd frames start with this magic number and any
+# other blob in body or html is a zlib stream
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def til_decompress(value: Any) -> Any:
+    if not isinstance(value, bytes):
+        return value
+    if value.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed columns")
+        return zstandard.ZstdDecompressor().decompress(value).decode("utf-8")
+    return zlib.decompress(value).decode("utf-8")
+
+
+@hookimpl
+def prepare_connection(conn: Any) -> None:
+    conn.create_function("til_decompress", 1, til_decompress, deterministic=True)
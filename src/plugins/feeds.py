@@ -0,0 +1,152 @@
+import json
+from collections.abc import Awaitable
+from pathlib import Path
+from typing import Any, Callable, cast, Optional
+
+from datasette import hookimpl
+
+
+# Written by `til build` next to the feeds; maps each feed to its ETag
+MANIFEST_NAME = "manifest.json"
+
+# Feed readers poll often, and an unchanged feed revalidates to a 304
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+
+PREFIX = "/feeds/"
+
+ASGIApp = Callable[..., Awaitable[None]]
+Manifest = dict[str, dict[str, Any]]
+
+
+def feeds_dir(datasette: Any) -> Optional[Path]:
+    """Directory of the feeds: plugin config, else the /feeds static mount."""
+    config = datasette.plugin_config("feeds") or {}
+    if config.get("feeds_dir"):
+        return Path(config["feeds_dir"])
+    for mount, directory in datasette.static_mounts:
+        if mount == PREFIX.strip("/"):
+            return Path(directory)
+    return None
+
+
+def load_manifest(directory: Path, cached: dict[str, Any]) -> Manifest:
+    """Feed manifest, re-read only when the file changes."""
+    path = directory / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if cached.get("key") != (path, mtime):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        cached.update(
+            key=(path, mtime), manifest=data if isinstance(data, dict) else {}
+        )
+    return cast(Manifest, cached["manifest"])
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether gzip is acceptable, honouring q=0 exclusions."""
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            params = params.strip()
+            try:
+                return not params.startswith("q=") or float(params[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def etag_matches(if_none_match: str, etags: set[str]) -> bool:
+    """Weak comparison of If-None-Match against a feed's ETags."""
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or bool(candidates & etags)
+
+
+@hookimpl
+def asgi_wrapper(datasette: Any) -> Callable[[ASGIApp], ASGIApp]:
+    def wrap(app: ASGIApp) -> ASGIApp:
+        cached: dict[str, Any] = {}
+
+        async def feeds(scope: dict, receive: Any, send: Any) -> None:
+            if (
+                scope["type"] != "http"
+                or scope["method"] not in ("GET", "HEAD")
+                or not scope["path"].startswith(PREFIX)
+            ):
+                await app(scope, receive, send)
+                return
+
+            directory = feeds_dir(datasette)
+            if directory is None:
+                await app(scope, receive, send)
+                return
+
+            # Only files listed in the manifest are feeds; anything else,
+            # including paths trying to leave the directory, falls through
+            name = scope["path"][len(PREFIX) :]
+            entry = load_manifest(directory, cached).get(name)
+            if not entry:
+                await app(scope, receive, send)
+                return
+
+            request_headers = {
+                key.decode("latin-1"): value.decode("latin-1")
+                for key, value in scope.get("headers") or []
+            }
+            path = directory / name
+            gzipped = path.with_name(f"{path.name}.gz")
+            # Each encoding is its own representation with its own ETag
+            etag = entry["etag"]
+            gzip_etag = f'{etag[:-1]}-gzip"'
+            use_gzip = (
+                accepts_gzip(request_headers.get("accept-encoding", ""))
+                and gzipped.is_file()
+            )
+
+            config = datasette.plugin_config("feeds") or {}
+            headers = [
+                (b"content-type", b"application/atom+xml; charset=utf-8"),
+                (b"etag", (gzip_etag if use_gzip else etag).encode()),
+                (
+                    b"cache-control",
+                    config.get("cache_control", DEFAULT_CACHE_CONTROL).encode(),
+                ),
+                (b"vary", b"Accept-Encoding"),
+            ]
+
+            if_none_match = request_headers.get("if-none-match")
+            if if_none_match is not None and etag_matches(
+                if_none_match, {etag, gzip_etag}
+            ):
+                await send(
+                    {"type": "http.response.start", "status": 304, "headers": headers}
+                )
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            try:
+                body = (gzipped if use_gzip else path).read_bytes()
+            except OSError:
+                await app(scope, receive, send)
+                return
+            if use_gzip:
+                headers.append((b"content-encoding", b"gzip"))
+            headers.append((b"content-length", str(len(body)).encode()))
+
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": headers}
+            )
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b"" if scope["method"] == "HEAD" else body,
+                }
+            )
+
+        return feeds
+
+    return wrap
@@ -0,0 +1,170 @@
+from collections.abc import Awaitable
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs
+
+from datasette import hookimpl
+
+
+# Responses only change when a new build is deployed, so let browsers and
+# CDNs reuse them briefly and revalidate with the build ETag after that
+DEFAULT_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+
+CACHE_HEADERS = (b"etag", b"last-modified", b"cache-control")
+
+# Ad-hoc SQL may be nondeterministic, such as the random TIL lookup, so
+# its results are never stored or revalidated
+NO_STORE = [(b"cache-control", b"no-store")]
+
+# Served by the feeds plugin with per-feed ETags that survive deploys
+EXEMPT_PREFIXES = ("/feeds/",)
+
+ASGIApp = Callable[..., Awaitable[None]]
+
+
+async def load_build(datasette: Any) -> Optional[tuple[str, datetime]]:
+    """Read the build ID and build time stamped by `til build`."""
+    try:
+        db = datasette.get_database("til")
+        if "til_build" not in await db.table_names():
+            return None
+        row = (await db.execute("select build_id, built_utc from til_build")).first()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    built = datetime.fromisoformat(row["built_utc"]).astimezone(timezone.utc)
+    return row["build_id"], built.replace(microsecond=0)
+
+
+def is_not_modified(
+    headers: dict[bytes, bytes], etag: str, last_modified: datetime
+) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since."""
+    if_none_match = headers.get(b"if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip() for tag in if_none_match.decode("latin-1").split(",")}
+        return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+    if_modified_since = headers.get(b"if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since.decode("latin-1"))
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
+
+
+def is_ad_hoc_query(scope: dict) -> bool:
+    """Whether a request runs SQL passed in its query string."""
+    query = parse_qs(
+        scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True
+    )
+    return "sql" in query
+
+
+def cache_headers(
+    build_id: str, built: datetime, cache_control: str
+) -> list[tuple[bytes, bytes]]:
+    return [
+        (b"etag", f'W/"{build_id}"'.encode()),
+        (b"last-modified", format_datetime(built, usegmt=True).encode()),
+        (b"cache-control", cache_control.encode()),
+    ]
+
+
+@hookimpl(trylast=True)
+def asgi_wrapper(datasette: Any) -> Callable[[ASGIApp], ASGIApp]:
+    def wrap(app: ASGIApp) -> ASGIApp:
+        cached: dict[str, tuple[str, datetime]] = {}
+
+        async def get_build() -> Optional[tuple[str, datetime]]:
+            if "build" in cached:
+                return cached["build"]
+            build = await load_build(datasette)
+            # An immutable database cannot change until the next deploy
+            if build is not None and not datasette.get_database("til").is_mutable:
+                cached["build"] = build
+            return build
+
+        async def http_cache(scope: dict, receive: Any, send: Any) -> None:
+            if (
+                scope["type"] != "http"
+                or scope["method"] not in ("GET", "HEAD")
+                or (
+                    scope["path"].startswith("/-/")
+                    and not scope["path"].startswith("/-/static/")
+                )
+                or scope["path"].startswith(EXEMPT_PREFIXES)
+            ):
+                await app(scope, receive, send)
+                return
+
+            if is_ad_hoc_query(scope):
+
+                async def send_no_store(message: dict) -> None:
+                    if message["type"] == "http.response.start":
+                        message = dict(
+                            message,
+                            headers=[
+                                (key, value)
+                                for key, value in message.get("headers", [])
+                                if key.lower() not in CACHE_HEADERS
+                            ]
+                            + NO_STORE,
+                        )
+                    await send(message)
+
+                await app(scope, receive, send_no_store)
+                return
+
+            build = await get_build()
+            if build is None:
+                await app(scope, receive, send)
+                return
+
+            build_id, built = build
+            config = datasette.plugin_config("http_cache") or {}
+            headers = cache_headers(
+                build_id, built, config.get("cache_control", DEFAULT_CACHE_CONTROL)
+            )
+            etag = headers[0][1].decode()
+
+            request_headers = dict(scope.get("headers") or [])
+            if is_not_modified(request_headers, etag, built):
+                await send(
+                    {"type": "http.response.start", "status": 304, "headers": headers}
+                )
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            async def send_with_cache_headers(message: dict) -> None:
+                if (
+                    message["type"] == "http.response.start"
+                    and message["status"] == 200
+                ):
+                    response_headers = message.get("headers", [])
+                    # Never mark responses that set cookies as shareable
+                    if not any(
+                        key.lower() == b"set-cookie" for key, _ in response_headers
+                    ):
+                        message = dict(
+                            message,
+                            headers=[
+                                (key, value)
+                                for key, value in response_headers
+                                if key.lower() not in CACHE_HEADERS
+                            ]
+                            + headers,
+                        )
+                await send(message)
+
+            await app(scope, receive, send_with_cache_headers)
+
+        return http_cache
+
+    return wrap
@@ -0,0 +1,312 @@
+import asyncio
+import gzip
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs
+
+from datasette import hookimpl
+
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Rendered pages kept in memory per Datasette instance
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# Busiest topic pages rendered when the server starts
+DEFAULT_WARM_TOPICS = 10
+
+# Content encodings stored with each page, preferred first
+ENCODINGS = ("br", "gzip")
+
+ASGIApp = Callable[..., Awaitable[None]]
+CacheKey = tuple[str, bytes, str]
+# Response headers, identity body and the body in each content encoding
+CacheEntry = tuple[list, bytes, dict[str, bytes]]
+
+
+def entry_size(headers: list, body: bytes, variants: dict[str, bytes]) -> int:
+    return (
+        len(body)
+        + sum(len(v) for v in variants.values())
+        + sum(len(k) + len(v) for k, v in headers)
+    )
+
+
+class PageCache:
+    """LRU cache of rendered responses bounded by total body size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initialize an empty cache holding at most max_bytes."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """Look up a response, marking it most recently used."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(
+        self,
+        key: CacheKey,
+        headers: list,
+        body: bytes,
+        variants: Optional[dict[str, bytes]] = None,
+    ) -> None:
+        """Store a response, evicting least recently used entries to fit."""
+        variants = variants or {}
+        size = entry_size(headers, body, variants)
+        if size > self.max_bytes:
+            return
+        self.discard(key)
+        self.entries[key] = (headers, body, variants)
+        self.size += size
+        while self.size > self.max_bytes:
+            self.discard(next(iter(self.entries)))
+
+    def discard(self, key: CacheKey) -> None:
+        """Remove a response if present."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry_size(*entry)
+
+
+# datasette.client builds its own ASGI app, so the cache lives on the
+# instance rather than in a wrapper closure to be shared with warm-up requests
+_caches: "weakref.WeakKeyDictionary[Any, PageCache]" = weakref.WeakKeyDictionary()
+_builds: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+_warming: set[asyncio.Task] = set()
+
+
+def get_cache(datasette: Any) -> PageCache:
+    cache = _caches.get(datasette)
+    if cache is None:
+        config = datasette.plugin_config("page_cache") or {}
+        cache = PageCache(int(config.get("max_bytes", DEFAULT_MAX_BYTES)))
+        _caches[datasette] = cache
+    return cache
+
+
+async def load_build_id(datasette: Any) -> Optional[str]:
+    """Build ID of the served database, or None if pages may change."""
+    if datasette in _builds:
+        return _builds[datasette]
+    try:
+        db = datasette.get_database("til")
+        build_id = None
+        if "til_build" in await db.table_names():
+            row = (await db.execute("select build_id from til_build")).first()
+            build_id = row["build_id"] if row else None
+    except Exception:
+        return None
+    if not db.is_mutable:
+        # An immutable database cannot change until the next deploy
+        _builds[datasette] = build_id or ""
+        return build_id or ""
+    return build_id
+
+
+def is_cacheable_request(scope: dict) -> bool:
+    if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+        return False
+    if scope["path"].startswith("/-/"):
+        return False
+    # Ad-hoc SQL may be nondeterministic, like the random TIL lookup
+    query = parse_qs(
+        scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True
+    )
+    if "sql" in query:
+        return False
+    # Cookies may carry an actor or CSRF token that changes the page
+    return not any(key == b"cookie" for key, _ in scope.get("headers") or [])
+
+
+def is_cacheable_response(message: dict) -> bool:
+    if message["status"] != 200:
+        return False
+    headers = dict(message.get("headers") or [])
+    # Encoded bodies depend on Accept-Encoding, which is not part of the key
+    if b"set-cookie" in headers or b"content-encoding" in headers:
+        return False
+    return bool(headers.get(b"content-type", b"").startswith(b"text/html"))
+
+
+def encode_variants(body: bytes) -> dict[str, bytes]:
+    """Page body compressed once in each encoding it may be served in."""
+    variants = {"gzip": gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def choose_encoding(accept_encoding: str, available: set[str]) -> Optional[str]:
+    """Best stored encoding the client accepts, or None for identity."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.strip()
+        try:
+            q = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    for encoding in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def encoded_response(entry: CacheEntry, accept_encoding: str) -> tuple[list, bytes]:
+    """Headers and body of a cached page in the encoding the client prefers."""
+    headers, body, variants = entry
+    encoding = choose_encoding(accept_encoding, set(variants))
+    if encoding:
+        body = variants[encoding]
+    headers = [
+        *((k, v) for k, v in headers if k != b"content-length"),
+        (b"content-length", str(len(body)).encode()),
+        (b"vary", b"Accept-Encoding"),
+    ]
+    if encoding:
+        headers.append((b"content-encoding", encoding.encode()))
+    return headers, body
+
+
+async def warm_paths(datasette: Any) -> list[str]:
+    """Index, all-TILs, busiest topic and most recent entry pages."""
+    config = datasette.plugin_config("page_cache") or {}
+    paths = ["/", "/all"]
+    try:
+        db = datasette.get_database("til")
+        tables = await db.table_names()
+        if "til_topics" in tables:
+            rows = await db.execute(
+                "select topic from til_topics order by count desc, topic limit ?",
+                [int(config.get("warm_topics", DEFAULT_WARM_TOPICS))],
+            )
+            paths.extend(f"/{row['topic']}" for row in rows)
+        if "til_recent" in tables:
+            rows = await db.execute("select topic, slug from til_recent order by rank")
+            paths.extend(f"/{row['topic']}/{row['slug']}" for row in rows)
+    except Exception:
+        pass
+    return paths
+
+
+async def warm_page_cache(datasette: Any) -> int:
+    """Render the top pages into the cache, returning how many were cached."""
+    cache = get_cache(datasette)
+    before = len(cache.entries)
+    for path in await warm_paths(datasette):
+        try:
+            await datasette.client.get(path)
+        except Exception:  # noqa: S112 - warming is best effort
+            continue
+    return len(cache.entries) - before
+
+
+@hookimpl
+def asgi_wrapper(datasette: Any) -> Callable[[ASGIApp], ASGIApp]:
+    def wrap(app: ASGIApp) -> ASGIApp:
+        async def page_cache(scope: dict, receive: Any, send: Any) -> None:
+            if scope["type"] == "lifespan":
+                await app(scope, receive, warm_after_startup(send))
+                return
+
+            if not is_cacheable_request(scope):
+                await app(scope, receive, send)
+                return
+
+            build_id = await load_build_id(datasette)
+            if build_id is None:
+                await app(scope, receive, send)
+                return
+
+            cache = get_cache(datasette)
+            key = (scope["path"], scope.get("query_string", b""), build_id)
+            accept_encoding = b"".join(
+                value
+                for name, value in scope.get("headers") or []
+                if name == b"accept-encoding"
+            ).decode("latin-1")
+            entry = cache.get(key)
+            if entry is not None:
+                headers, body = encoded_response(entry, accept_encoding)
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 200,
+                        "headers": [*headers, (b"x-page-cache", b"hit")],
+                    }
+                )
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": b"" if scope["method"] == "HEAD" else body,
+                    }
+                )
+                return
+
+            if scope["method"] == "HEAD":
+                await app(scope, receive, send)
+                return
+
+            start: dict = {}
+            chunks: list[bytes] = []
+
+            async def send_and_store(message: dict) -> None:
+                if message["type"] == "http.response.start":
+                    if is_cacheable_response(message):
+                        # Held back until the whole page can be encoded
+                        start.update(message)
+                        return
+                elif message["type"] == "http.response.body" and start:
+                    chunks.append(message.get("body", b""))
+                    if message.get("more_body"):
+                        return
+                    entry = (
+                        list(start.get("headers") or []),
+                        b"".join(chunks),
+                        encode_variants(b"".join(chunks)),
+                    )
+                    cache.put(key, *entry)
+                    headers, body = encoded_response(entry, accept_encoding)
+                    await send(
+                        {
+                            **start,
+                            "headers": [*headers, (b"x-page-cache", b"miss")],
+                        }
+                    )
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(message)
+
+            await app(scope, receive, send_and_store)
+
+        def warm_after_startup(send: Any) -> Any:
+            async def send_and_warm(message: dict) -> None:
+                await send(message)
+                config = datasette.plugin_config("page_cache") or {}
+                if message["type"] == "lifespan.startup.complete" and config.get(
+                    "warm", True
+                ):
+                    # Rendered in the background so startup is not delayed
+                    task = asyncio.get_running_loop().create_task(
+                        warm_page_cache(datasette)
+                    )
+                    _warming.add(task)
+                    task.add_done_callback(_warming.discard)
+
+            return send_and_warm
+
+        return page_cache
+
+    return wrap
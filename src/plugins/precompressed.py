@@ -0,0 +1,116 @@
+from collections.abc import Awaitable
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from datasette import hookimpl
+
+
+# Preferred encoding first; identity is always acceptable
+ENCODINGS = ("br", "gzip")
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+ASGIApp = Callable[..., Awaitable[None]]
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Encodings a client accepts, honouring q=0 exclusions."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    if "*" in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+
+def choose_encoding(accept_encoding: str, available: set[str]) -> Optional[str]:
+    """Best precompressed encoding the client accepts, or None for identity."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in ENCODINGS:
+        if encoding in accepted and encoding in available:
+            return encoding
+    return None
+
+
+def encoded_headers(encoding: Optional[str], length: int) -> list[tuple[bytes, bytes]]:
+    headers = [
+        (b"content-type", b"text/html; charset=utf-8"),
+        (b"content-length", str(length).encode()),
+        (b"vary", b"Accept-Encoding"),
+    ]
+    if encoding:
+        headers.append((b"content-encoding", encoding.encode()))
+    return headers
+
+
+def static_page(static_dir: Path, path: str) -> Optional[Path]:
+    """Exported page file for a request path, if it exists in static_dir."""
+    parts = [part for part in path.split("/") if part]
+    if any(part in (".", "..") or part.startswith(".") for part in parts):
+        return None
+    page = static_dir.joinpath(*parts, "index.html")
+    return page if page.is_file() else None
+
+
+@hookimpl
+def asgi_wrapper(datasette: Any) -> Callable[[ASGIApp], ASGIApp]:
+    def wrap(app: ASGIApp) -> ASGIApp:
+        async def precompressed(scope: dict, receive: Any, send: Any) -> None:
+            # Pages exported by `til export-static`, if configured
+            static_dir = (datasette.plugin_config("precompressed") or {}).get(
+                "static_dir"
+            )
+            if (
+                not static_dir
+                or scope["type"] != "http"
+                or scope["method"] not in ("GET", "HEAD")
+                or scope.get("query_string")
+                or scope["path"].startswith("/-/")
+            ):
+                await app(scope, receive, send)
+                return
+
+            page = static_page(Path(static_dir), scope["path"])
+            if page is None:
+                await app(scope, receive, send)
+                return
+
+            request_headers = dict(scope.get("headers") or [])
+            available = {
+                encoding
+                for encoding, suffix in SUFFIXES.items()
+                if page.with_name(page.name + suffix).is_file()
+            }
+            encoding = choose_encoding(
+                request_headers.get(b"accept-encoding", b"").decode("latin-1"),
+                available,
+            )
+            if encoding:
+                page = page.with_name(page.name + SUFFIXES[encoding])
+            body = page.read_bytes()
+
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": encoded_headers(encoding, len(body)),
+                }
+            )
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b"" if scope["method"] == "HEAD" else body,
+                }
+            )
+
+        return precompressed
+
+    return wrap
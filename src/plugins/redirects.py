@@ -1,3 +1,5 @@
+from urllib.parse import quote
+
 from datasette import hookimpl, Response
 
 
@@ -10,4 +12,16 @@ def register_routes() -> tuple:
                 "/{topic}/{slug}".format(**request.url_vars), status=301
             ),
         ),
+        # Feeds are static files written by `til build`
+        (
+            r"^/til/feed\.atom$",
+            lambda: Response.redirect("/feeds/feed.atom", status=301),
+        ),
+        (
+            r"^/tils/feed_by_topic\.atom$",
+            lambda request: Response.redirect(
+                "/feeds/topics/{}.atom".format(quote(request.args.get("topic", ""))),
+                status=301,
+            ),
+        ),
     )
@@ -0,0 +1,20 @@
+from typing import Any
+
+from datasette import hookimpl
+
+
+# Mirrors the "serve" profile in til.connections, which plugins cannot
+# import because the til package is not deployed with the site
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_KIB = 16 * 1024
+
+
+@hookimpl
+def prepare_connection(conn: Any, database: str) -> None:
+    if database != "til":
+        return
+    # The site only reads til.db; memory mapping avoids copying pages into
+    # the page cache for every connection in the thread pool
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+    conn.execute("PRAGMA query_only=1")
@@ -10,11 +10,13 @@ const TIL = {
     navigation: {
         /**
          * Redirect a random TIL entry
-         * Use Datasette JSON API to fetch random entry
+         * Use Datasette JSON API to fetch random entry by its dense
+         * til_random id, a single rowid lookup regardless of table size
          */
         async getRandomTIL() {
             try {
-                const response = await fetch('/til.json?sql=SELECT+topic,+slug+FROM+til+ORDER+BY+RANDOM()+LIMIT+1&_shape=array');
+                const sql = 'SELECT topic, slug FROM til_random WHERE id = 1 + abs(random() % (SELECT total FROM til_stats))';
+                const response = await fetch(`/til.json?sql=${encodeURIComponent(sql)}&_shape=array`);
                 const data = await response.json();
 
                 if (data && data.length > 0) {
@@ -32,4 +34,5 @@ const TIL = {
 };
 
 window.TIL = TIL;
+window.getRandomTIL = () => TIL.navigation.getRandomTIL();
 
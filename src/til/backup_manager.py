@@ -4,11 +4,12 @@
 import hashlib
 import logging
 import shutil
-import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from .connections import connect
+
 
 logger = logging.getLogger(__name__)
 
@@ -169,7 +170,7 @@ class BackupManager:
 
             # Quick database integrity check
             try:
-                conn = sqlite3.connect(target_path)
+                conn = connect(target_path, "validate")
                 cursor = conn.cursor()
                 cursor.execute("PRAGMA integrity_check")
                 result = cursor.fetchone()[0]
@@ -0,0 +1 @@
+"""Subcommands of the til CLI, each imported only when it runs."""
@@ -0,0 +1,96 @@
+"""Back up the database and list backups."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..backup_manager import BackupManager
+from ..config_loader import ConfigLoader
+
+
+@click.command(name="backup")
+@click.option("--db", default="til.db", help="Database file name")
+@click.option("--backup-dir", default="backups", help="Backup directory")
+@click.option("--description", help="Backup description")
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def backup_cmd(
+    ctx: click.Context,
+    db: str,
+    backup_dir: str,
+    description: Optional[str],
+    config: Optional[Path],
+) -> None:
+    """Create a backup of the database.
+
+    Creates a timestamped backup with checksum verification.
+    Useful before major operations or as routine maintenance.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        # Load configuration
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        if not quiet:
+            click.echo("💾 Creating database backup...")
+
+        backup_manager = BackupManager(Path(backup_dir))
+        backup = backup_manager.create_backup(til_config.database_path, description)
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Backup created: {backup.path.name} (checksum: {backup.checksum[:8]}...)",
+                    fg="green",
+                )
+            )
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Backup failed: {e}", fg="red"), err=True)
+        sys.exit(1)
+
+
+@click.command(name="list-backups")
+@click.option("--backup-dir", default="backups", help="Backup directory")
+@click.pass_context
+def list_backups_cmd(
+    ctx: click.Context,
+    backup_dir: str,
+) -> None:
+    """List available database backups."""
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        backup_manager = BackupManager(Path(backup_dir))
+        backups = backup_manager.list_backups()
+
+        if not backups:
+            if not quiet:
+                click.echo("No backups found")
+            return
+
+        if not quiet:
+            click.echo(f"Found {len(backups)} backups:")
+            for backup in backups:
+                click.echo(f"  📁 {backup.path.name}")
+                click.echo(f"     📅 {backup.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
+                click.echo(f"     🔢 {backup.checksum[:16]}...")
+                if backup.metadata.get("description"):
+                    click.echo(f"     📝 {backup.metadata['description']}")
+                click.echo()
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Failed to list backups: {e}", fg="red"), err=True)
+        sys.exit(1)
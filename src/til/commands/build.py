@@ -0,0 +1,235 @@
+"""Build and merge the TIL database."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..config_loader import ConfigLoader
+from ..exceptions import ConfigurationError, TILError
+from ..logging_config import LogLevel, setup_logging
+from ..metrics import BuildMetrics
+from ..processor import TILProcessor
+from ..profiling import BuildProfiler
+from ..tracing import start_tracing, stop_tracing
+
+
+@click.command()
+@click.option(
+    "--github-token",
+    envvar="MARKDOWN_GITHUB_TOKEN",
+    help="GitHub token for markdown API",
+)
+@click.option(
+    "--repo",
+    envvar="TIL_GITHUB_REPO",
+    default="jthodge/til",
+    help="GitHub repository (owner/name)",
+)
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--in-memory",
+    is_flag=True,
+    default=None,
+    help="Build in memory and write the database to disk once",
+)
+@click.option(
+    "--shard",
+    envvar="TIL_SHARD",
+    help="Build only shard i/N of the files into the partial database --db",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report time, calls and bytes for each build stage and file",
+)
+@click.option(
+    "--profile-report",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default="build-profile.json",
+    show_default=True,
+    help="JSON file the --profile report is written to",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write a Chrome trace of the build, viewable in Perfetto",
+)
+@click.option(
+    "--flamegraph",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the build's spans as collapsed stacks for flamegraph tools",
+)
+@click.option(
+    "--metrics-file",
+    envvar="TIL_METRICS_FILE",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write build and render metrics to an OpenMetrics textfile",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def build(  # noqa: PLR0913, PLR0917
+    ctx: click.Context,
+    github_token: Optional[str],
+    repo: str,
+    db: str,
+    in_memory: Optional[bool],
+    shard: Optional[str],
+    profile: bool,
+    profile_report: Path,
+    trace: Optional[Path],
+    flamegraph: Optional[Path],
+    metrics_file: Optional[Path],
+    config: Optional[Path],
+) -> None:
+    """Build TIL database from markdown files.
+
+    Scans the repository for markdown files organized by topic directories,
+    extracts metadata from git history, renders markdown to HTML using the
+    GitHub API, and creates a SQLite database for serving with Datasette.
+
+    With --profile, the time spent reading history and files, rendering,
+    writing entries and refreshing search and other derived tables is
+    printed as a table and written to a JSON report. --trace and
+    --flamegraph record a timeline of the build, showing where concurrent
+    work overlaps and where it waits on slow files or rate limits.
+    --metrics-file writes counters for a metrics scraper's textfile
+    collector, including when the build fails.
+    """
+    verbose = ctx.obj.get("verbose", False)
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            github_token=github_token,
+            github_repo=repo,
+            database_name=db,
+            in_memory_build=in_memory,
+            shard=shard,
+        )
+
+        # Configure logging based on flags and config
+        log_config = til_config.log_config
+        if quiet:
+            log_config.level = LogLevel.ERROR
+        elif verbose:
+            log_config.level = LogLevel.DEBUG
+
+        setup_logging(log_config)
+
+        import logging
+
+        logger = logging.getLogger(__name__)
+
+        if verbose:
+            click.echo(f"Building database: {til_config.database_path}")
+            click.echo(f"Repository: {til_config.github_repo}")
+
+        profiler = BuildProfiler() if profile else None
+        # Started after logging so spans carry the logs' request_id
+        tracer = start_tracing() if trace or flamegraph else None
+        metrics = BuildMetrics() if metrics_file else None
+        processor = TILProcessor(til_config, profiler=profiler, metrics=metrics)
+        try:
+            processor.build_database()
+        finally:
+            if metrics and metrics_file:
+                metrics.write(metrics_file)
+            if tracer:
+                stop_tracing()
+                if trace:
+                    tracer.write_chrome_trace(trace)
+                if flamegraph:
+                    tracer.write_collapsed_stacks(flamegraph)
+                if not quiet:
+                    written = [str(path) for path in (trace, flamegraph) if path]
+                    click.echo(f"Trace written to {', '.join(written)}")
+            if profiler:
+                profiler.finish()
+                profiler.write_report(profile_report)
+                if not quiet:
+                    click.echo(profiler.format_table())
+                    click.echo(f"Profile written to {profile_report}")
+
+        if not quiet:
+            click.echo(click.style("✨ Database built successfully!", fg="green"))
+
+    except ConfigurationError as e:
+        click.echo(click.style(f"Configuration error: {e}", fg="red"), err=True)
+        sys.exit(1)
+    except TILError as e:
+        click.echo(click.style(f"Error: {e}", fg="red"), err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\nBuild interrupted by user")
+        sys.exit(130)
+    except Exception as e:
+        import logging
+
+        try:
+            logger = logging.getLogger(__name__)
+            logger.exception("Unexpected error")
+        except Exception:
+            pass
+        click.echo(click.style(f"Unexpected error: {e}", fg="red"), err=True)
+        sys.exit(1)
+
+
+@click.command(name="merge-db")
+@click.argument(
+    "parts",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def merge_db_cmd(
+    ctx: click.Context,
+    parts: tuple[Path, ...],
+    db: str,
+    config: Optional[Path],
+) -> None:
+    """Merge partial databases from `til build --shard` into one.
+
+    The merged entries replace those in the database, then search,
+    aggregates, related TILs and feeds are rebuilt once. Shard builds must
+    cover every shard exactly once.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        if not quiet:
+            click.echo(f"🔀 Merging {len(parts)} databases...")
+
+        processor = TILProcessor(til_config)
+        count = processor.merge_databases(list(parts))
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Merged {count} entries into {til_config.database_path}",
+                    fg="green",
+                )
+            )
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Merge failed: {e}", fg="red"), err=True)
+        sys.exit(1)
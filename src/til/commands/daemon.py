@@ -0,0 +1,157 @@
+"""Control the long-running build daemon."""
+
+import contextlib
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..config_loader import ConfigLoader
+from ..exceptions import TILError
+from ..logging_config import setup_logging
+
+
+@click.group(name="daemon")
+def daemon_group() -> None:
+    """Run builds from a long-running daemon with warm caches.
+
+    `til daemon start` keeps the processor, git history and markdown API
+    connections in memory, and `til daemon send` asks it to build, update
+    the README or validate over a local Unix socket without paying start-up
+    costs each time.
+    """
+
+
+@daemon_group.command(name="start")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(path_type=Path),
+    default=".til.sock",
+    envvar="TIL_DAEMON_SOCKET",
+    show_default=True,
+    help="Unix socket to listen on",
+)
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def daemon_start_cmd(
+    ctx: click.Context,
+    socket_path: Path,
+    db: str,
+    config: Optional[Path],
+) -> None:
+    """Start the daemon in the foreground."""
+    from ..daemon import BuildDaemon  # noqa: PLC0415
+
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+        setup_logging(til_config.log_config)
+        daemon = BuildDaemon(til_config, socket_path)
+
+        if not quiet:
+            click.echo(f"🚀 Daemon listening on {socket_path}")
+        with contextlib.suppress(KeyboardInterrupt):
+            daemon.serve_forever()
+        if not quiet:
+            click.echo("Daemon stopped")
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Daemon failed: {e}", fg="red"), err=True)
+        sys.exit(1)
+
+
+@daemon_group.command(name="send")
+@click.argument(
+    "command", type=click.Choice(["ping", "build", "update-readme", "validate"])
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(path_type=Path),
+    default=".til.sock",
+    envvar="TIL_DAEMON_SOCKET",
+    show_default=True,
+    help="Unix socket the daemon listens on",
+)
+@click.option(
+    "--rewrite", is_flag=True, help="With update-readme, update README.md in place"
+)
+@click.option("--timeout", type=float, help="Seconds to wait for the daemon")
+@click.pass_context
+def daemon_send_cmd(
+    ctx: click.Context,
+    command: str,
+    socket_path: Path,
+    rewrite: bool,
+    timeout: Optional[float],
+) -> None:
+    """Send a request to a running daemon."""
+    from ..daemon import send_request  # noqa: PLC0415
+
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        args = {"rewrite": True} if rewrite else {}
+        response = send_request(command, args, socket_path, timeout=timeout)
+    except TILError as e:
+        click.echo(click.style(str(e), fg="red"), err=True)
+        sys.exit(1)
+
+    if not response.get("ok"):
+        click.echo(
+            click.style(f"{command} failed: {response.get('error')}", fg="red"),
+            err=True,
+        )
+        sys.exit(1)
+
+    result = response.get("result") or {}
+    seconds = response.get("seconds", 0)
+    if command == "update-readme" and "index" in result:
+        click.echo(result["index"])
+    elif command == "validate":
+        for check in result.get("checks", []):
+            if not check["valid"] or not quiet:
+                click.echo(f"  {'✅' if check['valid'] else '❌'} {check['message']}")
+        if not result.get("valid"):
+            sys.exit(1)
+    elif not quiet:
+        details = ", ".join(f"{key}: {value}" for key, value in result.items())
+        click.echo(
+            click.style(f"✅ {command} done in {seconds:.2f}s ({details})", fg="green")
+        )
+
+
+@daemon_group.command(name="stop")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(path_type=Path),
+    default=".til.sock",
+    envvar="TIL_DAEMON_SOCKET",
+    show_default=True,
+    help="Unix socket the daemon listens on",
+)
+@click.pass_context
+def daemon_stop_cmd(ctx: click.Context, socket_path: Path) -> None:
+    """Stop a running daemon."""
+    from ..daemon import send_request  # noqa: PLC0415
+
+    try:
+        send_request("shutdown", socket_path=socket_path, timeout=10)
+    except TILError as e:
+        click.echo(click.style(str(e), fg="red"), err=True)
+        sys.exit(1)
+    if not ctx.obj.get("quiet", False):
+        click.echo("Daemon stopping")
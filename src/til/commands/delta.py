@@ -0,0 +1,108 @@
+"""Ship row-level database changes between builds."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..config_loader import ConfigLoader
+from ..database import TILDatabase
+from ..db_delta import apply_delta, create_delta
+
+
+@click.command(name="diff-db")
+@click.argument("base", type=click.Path(dir_okay=False, path_type=Path))
+@click.argument("target", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--output",
+    "-o",
+    default="til.delta.gz",
+    show_default=True,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="File to write the delta to",
+)
+@click.pass_context
+def diff_db_cmd(
+    ctx: click.Context,
+    base: Path,
+    target: Path,
+    output: Path,
+) -> None:
+    """Write the row-level changes between two database builds.
+
+    The delta holds only the entries and related rows that changed from
+    BASE to TARGET, so a deploy can ship it instead of the whole database.
+    A missing BASE is treated as an empty database.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        summary = create_delta(base if base.exists() else None, target, output)
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Wrote {output} ({summary.upserts} upserts, "
+                    f"{summary.deletes} deletes)",
+                    fg="green",
+                )
+            )
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Diff failed: {e}", fg="red"), err=True)
+        sys.exit(1)
+
+
+@click.command(name="apply-db")
+@click.argument("delta", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--no-rebuild",
+    is_flag=True,
+    help="Skip rebuilding search and aggregates",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def apply_db_cmd(
+    ctx: click.Context,
+    delta: Path,
+    db: str,
+    no_rebuild: bool,
+    config: Optional[Path],
+) -> None:
+    """Apply a delta written by diff-db to the database it was made from.
+
+    The database must match the delta's base exactly; the result is
+    verified against the delta's target before derived tables are rebuilt.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        summary = apply_delta(
+            TILDatabase(til_config.database_path), delta, rebuild=not no_rebuild
+        )
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Applied {delta} ({summary.upserts} upserts, "
+                    f"{summary.deletes} deletes)",
+                    fg="green",
+                )
+            )
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Apply failed: {e}", fg="red"), err=True)
+        sys.exit(1)
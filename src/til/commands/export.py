@@ -0,0 +1,84 @@
+"""Export the site as static HTML."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..config_loader import ConfigLoader
+from ..database import TILDatabase
+from ..static_export import StaticExporter
+
+
+@click.command(name="export-static")
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--output",
+    "-o",
+    default="site",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory to write the site to",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    default=8,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Pages rendered concurrently",
+)
+@click.option("--force", is_flag=True, help="Render every page, even if unchanged")
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def export_static_cmd(  # noqa: PLR0913, PLR0917
+    ctx: click.Context,
+    db: str,
+    output: Path,
+    jobs: int,
+    force: bool,
+    config: Optional[Path],
+) -> None:
+    """Export the site as static HTML files.
+
+    Renders the index, all-TILs, topic and TIL pages through the Datasette
+    templates into directory index files, alongside static assets, Atom
+    feeds and a sitemap. Only pages whose inputs changed since the last
+    export are rendered again.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        if not quiet:
+            click.echo(f"📦 Exporting static site to {output}...")
+
+        exporter = StaticExporter(
+            TILDatabase(til_config.database_path),
+            output,
+            til_config.root_path,
+            jobs=jobs,
+        )
+        result = exporter.export(force=force)
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Exported {len(result.written)} pages "
+                    f"({result.unchanged} unchanged, {len(result.removed)} removed)",
+                    fg="green",
+                )
+            )
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Export failed: {e}", fg="red"), err=True)
+        sys.exit(1)
@@ -0,0 +1,261 @@
+"""Validate, repair and optimize the database."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..config_loader import ConfigLoader
+from ..exceptions import ConfigurationError, TILError
+from ..logging_config import LogLevel, setup_logging
+
+
+@click.command(name="validate-db")
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.option(
+    "--verbose",
+    is_flag=True,
+    help="Show detailed validation results",
+)
+@click.pass_context
+def validate_db_cmd(
+    ctx: click.Context,
+    db: str,
+    config: Optional[Path],
+    verbose: bool,
+) -> None:
+    """Validate database integrity and consistency.
+
+    Runs comprehensive checks on the database to ensure data quality,
+    including schema validation, creation date consistency, content
+    integrity, and full-text search functionality.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        # Load configuration
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        if not quiet:
+            click.echo("🔍 Validating database integrity...")
+
+        # Import and run validation
+        from ..database_validator import DatabaseValidator
+
+        validator = DatabaseValidator(til_config.database_path)
+        results = validator.run_all_validations()
+
+        failed_checks = [r for r in results if not r.is_valid]
+
+        if failed_checks:
+            if not quiet:
+                click.echo(
+                    click.style(
+                        f"❌ Database validation failed ({len(failed_checks)} issues)",
+                        fg="red",
+                    )
+                )
+                for result in failed_checks:
+                    click.echo(f"  • {result.message}")
+            sys.exit(1)
+        elif not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Database validation passed (all {len(results)} checks)",
+                    fg="green",
+                )
+            )
+            if verbose:
+                for result in results:
+                    click.echo(f"  • {result.message}")
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Validation error: {e}", fg="red"), err=True)
+        sys.exit(1)
+
+
+@click.command(name="fix-creation-dates")
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show what changes would be made without applying them",
+)
+@click.pass_context
+def fix_creation_dates_cmd(
+    ctx: click.Context,
+    db: str,
+    config: Optional[Path],
+    dry_run: bool,
+) -> None:
+    """Fix creation dates in database by re-extracting from git history.
+
+    This command addresses the issue where TIL entries have incorrect creation
+    dates due to database rebuilds. It re-extracts the correct creation dates
+    from git history and updates the database and its Atom feeds.
+
+    Only entries with creation dates from 2025-05-18 or 2025-05-19 will be
+    updated, preserving existing update timestamps where appropriate.
+    """
+    verbose = ctx.obj.get("verbose", False)
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        # Configure logging based on flags and config
+        log_config = til_config.log_config
+        if quiet:
+            log_config.level = LogLevel.ERROR
+        elif verbose:
+            log_config.level = LogLevel.DEBUG
+
+        setup_logging(log_config)
+
+        import logging
+
+        logger = logging.getLogger(__name__)
+
+        # Check if database exists
+        if not til_config.database_path.exists():
+            click.echo(
+                click.style(
+                    f"Database not found at {til_config.database_path}\n"
+                    + "Run 'til build' to create the database first",
+                    fg="red",
+                ),
+                err=True,
+            )
+            sys.exit(1)
+
+        if verbose:
+            click.echo(f"Fixing creation dates in: {til_config.database_path}")
+            click.echo(f"Repository: {til_config.root_path}")
+
+        if dry_run:
+            click.echo(
+                click.style("DRY RUN MODE - No changes will be made", fg="yellow")
+            )
+
+        # Import the function that does the actual work
+        from ..fix_creation_dates import fix_creation_dates
+
+        # Call the fix function
+        fix_creation_dates(
+            til_config.database_path,
+            til_config.root_path,
+            dry_run=dry_run,
+            feeds_dir=til_config.feeds_path,
+        )
+
+        if not quiet:
+            if dry_run:
+                click.echo(
+                    click.style("✨ Dry run completed - no changes made", fg="green")
+                )
+            else:
+                click.echo(
+                    click.style("✨ Creation dates fixed successfully!", fg="green")
+                )
+
+    except ConfigurationError as e:
+        click.echo(click.style(f"Configuration error: {e}", fg="red"), err=True)
+        sys.exit(1)
+    except TILError as e:
+        click.echo(click.style(f"Error: {e}", fg="red"), err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\nFix interrupted by user")
+        sys.exit(130)
+    except Exception as e:
+        import logging
+
+        try:
+            logger = logging.getLogger(__name__)
+            logger.exception("Unexpected error")
+        except Exception:
+            pass
+        click.echo(click.style(f"Unexpected error: {e}", fg="red"), err=True)
+        sys.exit(1)
+
+
+@click.command(name="optimize")
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--page-size",
+    type=int,
+    help="Page size in bytes (default: chosen from entry sizes)",
+)
+@click.option(
+    "--inspect-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write Datasette inspect data with table counts to this file",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def optimize_cmd(
+    ctx: click.Context,
+    db: str,
+    page_size: Optional[int],
+    inspect_file: Optional[Path],
+    config: Optional[Path],
+) -> None:
+    """Optimize the database for publishing as an immutable file.
+
+    Merges the full-text index, rewrites the file with VACUUM at a page
+    size suited to the entries, and stores query planner statistics. The
+    inspect file lets `datasette --inspect-file` skip counting rows at
+    startup.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        if not quiet:
+            click.echo(f"🗜️  Optimizing {til_config.database_path}...")
+
+        from ..optimize import optimize_database, write_inspect_file  # noqa: PLC0415
+
+        result = optimize_database(til_config.database_path, page_size=page_size)
+        if inspect_file:
+            write_inspect_file(til_config.database_path, inspect_file)
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Optimized database: {result.size_before:,} -> "
+                    f"{result.size_after:,} bytes ({result.page_size} byte pages)",
+                    fg="green",
+                )
+            )
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Optimize failed: {e}", fg="red"), err=True)
+        sys.exit(1)
@@ -0,0 +1,129 @@
+"""Serve a local stand-in for the GitHub markdown API."""
+
+import sys
+import threading
+from typing import Optional
+
+import click
+
+from ..exceptions import ConfigurationError
+from ..mock_api import (
+    LATENCY_DISTRIBUTIONS,
+    MockAPIConfig,
+    MockMarkdownAPI,
+    RENDER_MODES,
+)
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8766, show_default=True)
+@click.option(
+    "--latency",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Mean seconds before each response",
+)
+@click.option(
+    "--distribution",
+    type=click.Choice(LATENCY_DISTRIBUTIONS),
+    default="fixed",
+    show_default=True,
+    help="Shape of the latency",
+)
+@click.option(
+    "--jitter",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Half-width of uniform latency, or sigma of lognormal latency",
+)
+@click.option("--rate-limit", type=int, help="Requests allowed per window")
+@click.option(
+    "--rate-limit-window",
+    type=float,
+    default=3600.0,
+    show_default=True,
+    help="Seconds after which the rate limit budget is restored",
+)
+@click.option(
+    "--error-rate",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Fraction of requests answered with --error-status",
+)
+@click.option("--error-status", type=int, default=502, show_default=True)
+@click.option(
+    "--forbidden-rate",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Fraction of requests refused with a secondary rate limit 403",
+)
+@click.option(
+    "--render",
+    type=click.Choice(RENDER_MODES),
+    default="escape",
+    show_default=True,
+    help="Escape paragraphs, or render with Python-Markdown",
+)
+@click.option("--seed", type=int, help="Seed for latency and injected faults")
+@click.pass_context
+def mock_api_cmd(  # noqa: PLR0913, PLR0917
+    ctx: click.Context,
+    host: str,
+    port: int,
+    latency: float,
+    distribution: str,
+    jitter: float,
+    rate_limit: Optional[int],
+    rate_limit_window: float,
+    error_rate: float,
+    error_status: int,
+    forbidden_rate: float,
+    render: str,
+    seed: Optional[int],
+) -> None:
+    """Serve a local stand-in for the GitHub markdown API.
+
+    Point builds at it with TIL_MARKDOWN_API_URL or markdown-api-url in
+    the config file to measure rendering and exercise retries and backoff
+    without the network. Prints a count of responses by status when
+    stopped with Ctrl+C.
+    """
+    quiet = ctx.obj.get("quiet", False)
+    try:
+        api = MockMarkdownAPI(
+            MockAPIConfig(
+                latency=latency,
+                distribution=distribution,
+                jitter=jitter,
+                rate_limit=rate_limit,
+                rate_limit_window=rate_limit_window,
+                error_rate=error_rate,
+                error_status=error_status,
+                forbidden_rate=forbidden_rate,
+                render=render,
+                seed=seed,
+            ),
+            host=host,
+            port=port,
+        )
+    except (ConfigurationError, OSError) as e:
+        click.echo(click.style(f"Mock API failed: {e}", fg="red"), err=True)
+        sys.exit(1)
+
+    if not quiet:
+        click.echo(f"🧪 Serving stand-in markdown API at {api.url}")
+    try:
+        with api:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        if not quiet:
+            by_status = ", ".join(
+                f"{status}: {count}" for status, count in sorted(api.stats.items())
+            )
+            summary = f"Stopped after {sum(api.stats.values())} responses"
+            click.echo(f"{summary} ({by_status})" if by_status else summary)
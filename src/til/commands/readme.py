@@ -0,0 +1,161 @@
+"""Regenerate the README index."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..config_loader import ConfigLoader
+from ..database import TILDatabase
+from ..exceptions import ConfigurationError, DatabaseError, TILError
+from ..logging_config import LogLevel, setup_logging
+from ..readme_generator import ReadmeGenerator
+
+
+@click.command(name="update-readme")
+@click.option("--rewrite", is_flag=True, help="Update README file in place")
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(),
+    help="Output file (default: stdout or README.md with --rewrite)",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def update_readme(
+    ctx: click.Context,
+    rewrite: bool,
+    db: str,
+    output: Optional[str],
+    config: Optional[Path],
+) -> None:
+    """Update README with latest TIL entries.
+
+    Generates an index of all TIL entries organized by topic. By default,
+    prints the index to stdout. Use --rewrite to update README.md in place.
+    """
+    verbose = ctx.obj.get("verbose", False)
+    quiet = ctx.obj.get("quiet", False)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+
+        # Configure logging based on flags and config
+        log_config = til_config.log_config
+        if quiet:
+            log_config.level = LogLevel.ERROR
+        elif verbose:
+            log_config.level = LogLevel.DEBUG
+
+        setup_logging(log_config)
+
+        import logging
+
+        logger = logging.getLogger(__name__)
+
+        # Check if database exists
+        if not til_config.database_path.exists():
+            click.echo(
+                click.style(
+                    f"Database not found at {til_config.database_path}\n"
+                    + "Run 'til build' to create the database first",
+                    fg="red",
+                ),
+                err=True,
+            )
+            sys.exit(1)
+
+        til_db = TILDatabase(til_config.database_path)
+        generator = ReadmeGenerator(til_db)
+
+        # Build index
+        try:
+            index_lines = generator.generate_index()
+            total_count = til_db.count()
+
+            if verbose:
+                click.echo(f"Found {total_count} TIL entries")
+
+        except DatabaseError as e:
+            click.echo(
+                click.style(f"Failed to read from database: {e}", fg="red"), err=True
+            )
+            sys.exit(1)
+
+        # Handle output
+        if rewrite:
+            readme_path = til_config.root_path / "README.md"
+            if not readme_path.exists():
+                click.echo(
+                    click.style(f"README.md not found at {readme_path}", fg="red"),
+                    err=True,
+                )
+                sys.exit(1)
+
+            try:
+                if verbose:
+                    click.echo(f"Updating {readme_path}")
+
+                generator.update_readme(readme_path)
+
+                if not quiet:
+                    click.echo(
+                        click.style("✨ README updated successfully!", fg="green")
+                    )
+
+            except OSError as e:
+                click.echo(
+                    click.style(f"Failed to update README: {e}", fg="red"), err=True
+                )
+                sys.exit(1)
+
+        elif output:
+            # Write to specified output file
+            output_path = Path(output)
+            try:
+                with open(output_path, "w") as f:
+                    f.write("\n".join(index_lines))
+
+                if not quiet:
+                    click.echo(
+                        click.style(f"✨ Index written to {output_path}", fg="green")
+                    )
+
+            except OSError as e:
+                click.echo(
+                    click.style(f"Failed to write output: {e}", fg="red"), err=True
+                )
+                sys.exit(1)
+
+        else:
+            # Print to stdout
+            click.echo("\n".join(index_lines))
+
+    except ConfigurationError as e:
+        click.echo(click.style(f"Configuration error: {e}", fg="red"), err=True)
+        sys.exit(1)
+    except TILError as e:
+        click.echo(click.style(f"Error: {e}", fg="red"), err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\nUpdate interrupted by user")
+        sys.exit(130)
+    except Exception as e:
+        import logging
+
+        try:
+            logger = logging.getLogger(__name__)
+            logger.exception("Unexpected error")
+        except Exception:
+            pass
+        click.echo(click.style(f"Unexpected error: {e}", fg="red"), err=True)
+        sys.exit(1)
@@ -0,0 +1,92 @@
+"""Update the database as TIL files are edited."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ..config_loader import ConfigLoader
+from ..processor import TILProcessor, UpdateSummary
+from ..watcher import create_watcher, DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL
+
+
+@click.command()
+@click.option("--db", default="til.db", help="Database file name")
+@click.option(
+    "--debounce",
+    type=float,
+    default=DEFAULT_DEBOUNCE,
+    show_default=True,
+    help="Seconds without changes that end a burst of edits",
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=DEFAULT_POLL_INTERVAL,
+    show_default=True,
+    help="Seconds between scans where inotify is unavailable",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to configuration file",
+)
+@click.pass_context
+def watch(
+    ctx: click.Context,
+    db: str,
+    debounce: float,
+    poll_interval: float,
+    config: Optional[Path],
+) -> None:
+    """Update the database as TIL files are edited.
+
+    Watches content/ for changed files and applies only those to the
+    database, so a running `datasette` shows edits on the next request.
+    Builds the database first if it does not exist. Stop with Ctrl+C.
+    """
+    quiet = ctx.obj.get("quiet", False)
+
+    def report(summary: UpdateSummary, seconds: float) -> None:
+        if quiet:
+            return
+        message = (
+            f"🔄 Updated {summary.updated}, removed {summary.deleted} "
+            f"in {seconds * 1000:.0f} ms"
+        )
+        if summary.errors:
+            click.echo(click.style(f"{message} ({summary.errors} failed)", fg="yellow"))
+        else:
+            click.echo(message)
+
+    try:
+        til_config = ConfigLoader.load_config(
+            config_file=config,
+            database_name=db,
+        )
+        processor = TILProcessor(til_config)
+        if not til_config.database_path.exists():
+            if not quiet:
+                click.echo("🔨 Building TIL database...")
+            processor.build_database()
+
+        roots = [source.root_path for source in til_config.sources] or [
+            til_config.root_path
+        ]
+        with create_watcher(roots, poll_interval=poll_interval) as watcher:
+            if not quiet:
+                click.echo(
+                    f"👀 Watching {', '.join(str(root / 'content') for root in roots)} "
+                    f"({type(watcher).__name__})"
+                )
+            try:
+                processor.watch(watcher, debounce=debounce, on_update=report)
+            except KeyboardInterrupt:
+                if not quiet:
+                    click.echo("Stopped watching")
+
+    except Exception as e:
+        if not quiet:
+            click.echo(click.style(f"Watch failed: {e}", fg="red"), err=True)
+        sys.exit(1)
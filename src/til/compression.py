@@ -0,0 +1,154 @@
+"""Content encodings for precompressed HTML and compressed column storage."""
+
+import gzip
+import sqlite3
+import zlib
+from typing import Any
+
+from .exceptions import ConfigurationError
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without zstandard
+    zstandard = None
+
+
+GZIP = "gzip"
+BROTLI = "br"
+
+# File suffix of each encoding's precompressed variant
+SUFFIXES = {GZIP: ".gz", BROTLI: ".br"}
+
+
+def available_encodings() -> list[str]:
+    """Content encodings that can be produced, best first.
+
+    Returns:
+        List of encoding names; brotli is included only when installed
+
+    """
+    return [BROTLI, GZIP] if brotli is not None else [GZIP]
+
+
+def encode(content: bytes, encoding: str) -> bytes:
+    """Compress content with the given content encoding at maximum level.
+
+    Output is deterministic, so unchanged content yields identical bytes.
+
+    Args:
+        content: Bytes to compress
+        encoding: Encoding name from available_encodings()
+
+    Returns:
+        Compressed bytes
+
+    Raises:
+        ConfigurationError: If the encoding is unknown or not installed
+
+    """
+    if encoding == GZIP:
+        return gzip.compress(content, 9, mtime=0)
+    if encoding == BROTLI and brotli is not None:
+        result: bytes = brotli.compress(content, quality=11)
+        return result
+    raise ConfigurationError(f"Unsupported content encoding: {encoding}")
+
+
+# Codecs for compressed storage of the body and html columns
+ZLIB = "zlib"
+ZSTD = "zstd"
+STORAGE_CODECS = (ZLIB, ZSTD)
+
+# Compressed columns are self-describing: zstd frames start with this magic
+# number and anything else stored as a blob is a zlib stream
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Columns stored compressed when storage compression is enabled
+COMPRESSED_COLUMNS = ("body", "html")
+
+DECOMPRESS_FUNCTION = "til_decompress"
+
+
+def compress_text(text: str, codec: str) -> bytes:
+    """Compress text for storage in a blob column.
+
+    Args:
+        text: Text to compress
+        codec: Codec name from STORAGE_CODECS
+
+    Returns:
+        Compressed UTF-8 bytes
+
+    Raises:
+        ConfigurationError: If the codec is unknown or not installed
+
+    """
+    data = text.encode("utf-8")
+    if codec == ZLIB:
+        return zlib.compress(data, 9)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise ConfigurationError(
+                "zstandard is required for zstd storage compression. "
+                "Install it with: uv add zstandard"
+            )
+        result: bytes = zstandard.ZstdCompressor(level=19).compress(data)
+        return result
+    raise ConfigurationError(f"Unsupported storage compression: {codec}")
+
+
+def decompress_text(value: Any) -> Any:
+    """Decompress a stored column value, passing plain values through.
+
+    Args:
+        value: Column value as read from SQLite
+
+    Returns:
+        Decompressed text for blobs, otherwise the value unchanged
+
+    Raises:
+        ConfigurationError: If a zstd value is read without zstandard installed
+
+    """
+    if not isinstance(value, bytes):
+        return value
+    if value.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ConfigurationError(
+                "zstandard is required to read zstd-compressed columns"
+            )
+        data: bytes = zstandard.ZstdDecompressor().decompress(value)
+        return data.decode("utf-8")
+    return zlib.decompress(value).decode("utf-8")
+
+
+def decompress_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Decompress the compressed columns of a record in place.
+
+    Args:
+        record: Row as a dictionary
+
+    Returns:
+        The same record with body and html as text
+
+    """
+    for column in COMPRESSED_COLUMNS:
+        if column in record:
+            record[column] = decompress_text(record[column])
+    return record
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """Register the til_decompress() SQL function on a connection.
+
+    Args:
+        conn: SQLite connection
+
+    """
+    conn.create_function(DECOMPRESS_FUNCTION, 1, decompress_text, deterministic=True)
@@ -1,12 +1,85 @@
 """Configuration for TIL application."""
 
 import os
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+from .compression import STORAGE_CODECS
 from .exceptions import ConfigurationError
 from .logging_config import LogConfig
+from .sharding import parse_shard
+
+
+# Live database written by full builds and served by Datasette
+DEFAULT_DATABASE_NAME = "til.db"
+
+# Where a source's created and updated times come from
+HISTORY_BACKENDS = ("git", "mtime", "none")
+
+SOURCE_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+@dataclass
+class SourceConfig:
+    """A content repository built into a federated database."""
+
+    # Short identifier stored in the til.source column
+    name: str
+
+    # Directory holding content/<topic>/<slug>.md, relative to the main
+    # root_path unless absolute
+    root_path: Path
+
+    # Links point at https://github.com/<github_repo>/blob/<branch>/<path>
+    github_repo: Optional[str] = None
+    branch: str = "main"
+
+    # Or at <url_base>/<path> for content hosted elsewhere
+    url_base: Optional[str] = None
+
+    # "git" history, file modification times ("mtime") or build time ("none")
+    history: str = "git"
+
+    def __post_init__(self) -> None:
+        """Validate source configuration after initialization."""
+        self.root_path = Path(self.root_path)
+        if not SOURCE_NAME_RE.match(self.name or ""):
+            raise ConfigurationError(
+                f"Invalid source name: '{self.name}'. "
+                "Use lowercase letters, digits, '-' and '_'"
+            )
+        if self.history not in HISTORY_BACKENDS:
+            raise ConfigurationError(
+                f"Invalid history for source '{self.name}': '{self.history}'. "
+                f"Expected one of: {', '.join(HISTORY_BACKENDS)}"
+            )
+        if self.url_base is None:
+            if not self.github_repo:
+                raise ConfigurationError(
+                    f"Source '{self.name}' needs a github_repo or url_base"
+                )
+            parts = self.github_repo.split("/")
+            if len(parts) != 2 or not all(parts):
+                raise ConfigurationError(
+                    f"Invalid GitHub repository format for source '{self.name}': "
+                    f"'{self.github_repo}'. Expected format: 'owner/repo'"
+                )
+
+    def file_url(self, path: str) -> str:
+        """Get the URL of a file in this source.
+
+        Args:
+            path: File path relative to the source's root_path
+
+        Returns:
+            URL to link the entry to
+
+        """
+        if self.url_base is not None:
+            return f"{self.url_base.rstrip('/')}/{path}"
+        return f"https://github.com/{self.github_repo}/blob/{self.branch}/{path}"
 
 
 @dataclass
@@ -19,7 +92,7 @@ class TILConfig:
     markdown_api_url: str = "https://api.github.com/markdown"
 
     # Database configuration
-    database_name: str = "til.db"
+    database_name: str = DEFAULT_DATABASE_NAME
 
     # Retry configuration
     max_retries: int = 3
@@ -30,6 +103,28 @@ class TILConfig:
         default_factory=lambda: Path(__file__).parent.parent.resolve()
     )
 
+    # Static Atom feeds (default: <root_path>/feeds)
+    feeds_dir: Optional[Path] = None
+
+    # Store body and html compressed with "zlib" or "zstd" (default: text)
+    storage_compression: Optional[str] = None
+
+    # Build into a validated shadow copy that replaces the database atomically
+    atomic_builds: bool = True
+
+    # Build in memory and write the database to disk once at the end
+    in_memory_build: bool = False
+
+    # Build only shard i of N ("i/N") into a partial database for merge-db
+    shard: Optional[str] = None
+
+    # Content repositories to federate into one database (default: just
+    # root_path and github_repo)
+    sources: list[SourceConfig] = field(default_factory=list)
+
+    # Sources collected concurrently in a federated build
+    source_workers: int = 4
+
     # Logging configuration
     log_config: LogConfig = field(default_factory=LogConfig)
 
@@ -39,6 +134,9 @@ class TILConfig:
         self._validate_database_name()
         self._validate_retries()
         self._validate_paths()
+        self._validate_storage_compression()
+        self._validate_shard()
+        self._validate_sources()
 
     def _validate_github_repo(self) -> None:
         """Validate GitHub repository format."""
@@ -81,6 +179,53 @@ class TILConfig:
         if not self.root_path.is_dir():
             raise ConfigurationError(f"Root path is not a directory: {self.root_path}")
 
+    def _validate_storage_compression(self) -> None:
+        """Validate storage compression codec."""
+        if (
+            self.storage_compression is not None
+            and self.storage_compression not in STORAGE_CODECS
+        ):
+            raise ConfigurationError(
+                f"Invalid storage_compression: '{self.storage_compression}'. "
+                f"Expected one of: {', '.join(STORAGE_CODECS)}"
+            )
+
+    def _validate_shard(self) -> None:
+        """Validate shard specification."""
+        if self.shard is not None:
+            parse_shard(self.shard)
+            # A shard build deletes other shards' entries in place, without
+            # the atomic shadow build, so it must never target the live file
+            if self.database_name == DEFAULT_DATABASE_NAME:
+                raise ConfigurationError(
+                    f"A shard build needs its own database, not "
+                    f"{DEFAULT_DATABASE_NAME}: pass --db, e.g. shard-1.db"
+                )
+
+    def _validate_sources(self) -> None:
+        """Validate federated sources and resolve their root paths."""
+        if self.source_workers < 1:
+            raise ConfigurationError(
+                f"source_workers must be positive: {self.source_workers}"
+            )
+        if not self.sources:
+            return
+        if self.shard is not None:
+            raise ConfigurationError("shard cannot be combined with sources")
+
+        names = [source.name for source in self.sources]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ConfigurationError(f"Duplicate source names: {', '.join(duplicates)}")
+        for source in self.sources:
+            if not source.root_path.is_absolute():
+                source.root_path = self.root_path / source.root_path
+            if not source.root_path.is_dir():
+                raise ConfigurationError(
+                    f"Root path of source '{source.name}' is not a directory: "
+                    f"{source.root_path}"
+                )
+
     @classmethod
     def from_environment(cls) -> "TILConfig":
         """Create configuration from environment variables."""
@@ -95,6 +240,11 @@ class TILConfig:
         """Get full path to database file."""
         return self.root_path / self.database_name
 
+    @property
+    def feeds_path(self) -> Path:
+        """Get directory static feeds are written to."""
+        return self.feeds_dir or self.root_path / "feeds"
+
     @property
     def github_url_base(self) -> str:
         """Get base URL for GitHub repository."""
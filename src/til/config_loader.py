@@ -5,7 +5,7 @@ import os
 from pathlib import Path
 from typing import Any, Optional
 
-from .config import TILConfig
+from .config import SourceConfig, TILConfig
 from .exceptions import ConfigurationError
 from .logging_config import LogConfig, LogFormat, LogLevel
 
@@ -23,13 +23,15 @@ class ConfigLoader:
     ]
 
     @classmethod
-    def load_config(
+    def load_config(  # noqa: PLR0913, PLR0917
         cls,
         config_file: Optional[Path] = None,
         github_token: Optional[str] = None,
         github_repo: Optional[str] = None,
         database_name: Optional[str] = None,
         root_path: Optional[Path] = None,
+        in_memory_build: Optional[bool] = None,
+        shard: Optional[str] = None,
     ) -> TILConfig:
         """Load configuration from file, environment, and CLI arguments.
 
@@ -45,6 +47,8 @@ class ConfigLoader:
             github_repo: GitHub repository (owner/repo)
             database_name: Database file name
             root_path: Root directory path
+            in_memory_build: Build in memory and write to disk once
+            shard: Build only shard "i/N" of the files
 
         Returns:
             Validated TILConfig instance
@@ -80,6 +84,10 @@ class ConfigLoader:
             config_dict["database_name"] = database_name
         if root_path is not None:
             config_dict["root_path"] = root_path
+        if in_memory_build is not None:
+            config_dict["in_memory_build"] = in_memory_build
+        if shard is not None:
+            config_dict["shard"] = shard
 
         # Extract logging configuration
         log_config = cls._load_log_config(config_dict)
@@ -89,6 +97,9 @@ class ConfigLoader:
             # Use environment-based config if no file config
             config_dict["log_config"] = LogConfig.from_environment()
 
+        if "sources" in config_dict:
+            config_dict["sources"] = cls._load_sources(config_dict["sources"])
+
         # Set default root_path if not provided
         if "root_path" not in config_dict or config_dict["root_path"] is None:
             config_dict["root_path"] = Path.cwd()
@@ -213,6 +224,40 @@ class ConfigLoader:
             add_context=log_data.get("add_context", True),
         )
 
+    @classmethod
+    def _load_sources(cls, data: Any) -> list[SourceConfig]:
+        """Parse federated sources from configuration data.
+
+        Args:
+            data: List of source tables from the configuration file
+
+        Returns:
+            List of SourceConfig instances
+
+        Raises:
+            ConfigurationError: If a source is malformed
+
+        """
+        if not isinstance(data, list):
+            raise ConfigurationError(
+                f"sources must be a list, got {type(data).__name__}"
+            )
+
+        sources = []
+        for entry in data:
+            if isinstance(entry, SourceConfig):
+                sources.append(entry)
+                continue
+            if not isinstance(entry, dict):
+                raise ConfigurationError(
+                    f"Each source must be a table, got {type(entry).__name__}"
+                )
+            try:
+                sources.append(SourceConfig(**cls._normalize_config(entry)))
+            except TypeError as e:
+                raise ConfigurationError(f"Invalid source {entry.get('name')!r}: {e}")
+        return sources
+
     @classmethod
     def _normalize_config(cls, data: dict[str, Any]) -> dict[str, Any]:
         """Normalize configuration keys and values.
@@ -234,7 +279,7 @@ class ConfigLoader:
             normalized_key = key.replace("-", "_")
 
             # Convert path strings to Path objects
-            if normalized_key == "root_path" and isinstance(value, str):
+            if normalized_key in ("root_path", "feeds_dir") and isinstance(value, str):
                 normalized[normalized_key] = Path(value)
             else:
                 normalized[normalized_key] = value
@@ -259,6 +304,10 @@ class ConfigLoader:
         if repo := os.environ.get("TIL_GITHUB_REPO"):
             config["github_repo"] = repo
 
+        # Markdown API endpoint, e.g. a local `til mock-api` server
+        if api_url := os.environ.get("TIL_MARKDOWN_API_URL"):
+            config["markdown_api_url"] = api_url
+
         # Database name
         if db_name := os.environ.get("TIL_DATABASE_NAME"):
             config["database_name"] = db_name
@@ -267,4 +316,34 @@ class ConfigLoader:
         if root := os.environ.get("TIL_ROOT_PATH"):
             config["root_path"] = Path(root)
 
+        # Storage compression codec
+        if codec := os.environ.get("TIL_STORAGE_COMPRESSION"):
+            config["storage_compression"] = codec
+
+        # Shadow builds with atomic swap
+        if atomic := os.environ.get("TIL_ATOMIC_BUILDS"):
+            config["atomic_builds"] = atomic.lower() not in ("0", "false", "no", "off")
+
+        # In-memory builds
+        if in_memory := os.environ.get("TIL_IN_MEMORY_BUILD"):
+            config["in_memory_build"] = in_memory.lower() not in (
+                "0",
+                "false",
+                "no",
+                "off",
+            )
+
+        # Build shard
+        if shard := os.environ.get("TIL_SHARD"):
+            config["shard"] = shard
+
+        # Federated source concurrency
+        if workers := os.environ.get("TIL_SOURCE_WORKERS"):
+            try:
+                config["source_workers"] = int(workers)
+            except ValueError:
+                raise ConfigurationError(
+                    f"TIL_SOURCE_WORKERS must be an integer: {workers}"
+                )
+
         return config
@@ -0,0 +1,143 @@
+"""SQLite connections tuned for each workload."""
+
+import sqlite3
+from pathlib import Path
+from typing import Any, NamedTuple, Union
+
+from .compression import register_functions
+from .exceptions import ConfigurationError
+
+
+class ConnectionProfile(NamedTuple):
+    """Open mode and pragmas for one kind of database work."""
+
+    name: str
+    read_only: bool
+    pragmas: tuple[tuple[str, Union[int, str]], ...]
+
+
+# Memory mapped I/O for reads, in bytes
+MMAP_SIZE = 256 * 1024 * 1024
+
+# A negative cache_size is in KiB rather than pages
+BUILD_CACHE_KIB = 64 * 1024
+READ_CACHE_KIB = 16 * 1024
+
+# Bulk writes into a build that is validated, or rebuilt, if interrupted.
+# WAL with synchronous=NORMAL can lose the last transactions on power
+# loss but never corrupts the file.
+BUILD = ConnectionProfile(
+    "build",
+    read_only=False,
+    pragmas=(
+        ("journal_mode", "wal"),
+        ("synchronous", "normal"),
+        ("cache_size", -BUILD_CACHE_KIB),
+        ("temp_store", "memory"),
+        ("busy_timeout", 5000),
+    ),
+)
+
+# Small in-place edits to a published database, such as fixing dates or
+# restoring backups, keep SQLite's durable defaults
+MAINTENANCE = ConnectionProfile(
+    "maintenance",
+    read_only=False,
+    pragmas=(("synchronous", "full"), ("busy_timeout", 5000)),
+)
+
+# Page rendering, exports and diffs only read
+SERVE = ConnectionProfile(
+    "serve",
+    read_only=True,
+    pragmas=(
+        ("query_only", 1),
+        ("mmap_size", MMAP_SIZE),
+        ("cache_size", -READ_CACHE_KIB),
+    ),
+)
+
+# Validation scans every row once, so it skips the page cache warm-up
+VALIDATE = ConnectionProfile(
+    "validate",
+    read_only=True,
+    pragmas=(
+        ("query_only", 1),
+        ("mmap_size", MMAP_SIZE),
+        ("temp_store", "memory"),
+    ),
+)
+
+PROFILES = {profile.name: profile for profile in (BUILD, MAINTENANCE, SERVE, VALIDATE)}
+
+
+def get_profile(name: str) -> ConnectionProfile:
+    """Look up a connection profile by name.
+
+    Args:
+        name: Profile name: build, maintenance, serve or validate
+
+    Returns:
+        The connection profile
+
+    Raises:
+        ConfigurationError: If the profile is unknown
+
+    """
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ConfigurationError(
+            f"Unknown connection profile: {name}. "
+            f"Expected one of: {', '.join(PROFILES)}"
+        )
+
+
+def apply_profile(conn: sqlite3.Connection, profile: ConnectionProfile) -> None:
+    """Set a profile's pragmas on an open connection.
+
+    Args:
+        conn: SQLite connection
+        profile: Connection profile to apply
+
+    """
+    for pragma, value in profile.pragmas:
+        conn.execute(f"PRAGMA {pragma}={value}")
+
+
+def connect(
+    db_path: Path, profile: str = "maintenance", **kwargs: Any
+) -> sqlite3.Connection:
+    """Open a database with the pragmas of a named profile.
+
+    Read-only profiles open the file with mode=ro, so they fail rather than
+    create a missing database. Every connection can call til_decompress().
+
+    Args:
+        db_path: Path to SQLite database file
+        profile: Profile name: build, maintenance, serve or validate
+        **kwargs: Passed on to sqlite3.connect
+
+    Returns:
+        Open SQLite connection
+
+    Raises:
+        ConfigurationError: If the profile is unknown
+        sqlite3.Error: If the database cannot be opened
+
+    """
+    settings = get_profile(profile)
+    conn: sqlite3.Connection
+    if settings.read_only:
+        conn = sqlite3.connect(
+            f"{db_path.resolve().as_uri()}?mode=ro", uri=True, **kwargs
+        )
+    else:
+        conn = sqlite3.connect(db_path, **kwargs)
+    try:
+        apply_profile(conn, settings)
+        register_functions(conn)
+    except Exception:
+        conn.close()
+        raise
+    return conn
@@ -0,0 +1,240 @@
+"""Long-running build server reached over a local Unix socket."""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+
+from .config import TILConfig
+from .database_validator import DatabaseValidator
+from .exceptions import TILError
+from .processor import TILProcessor
+from .readme_generator import ReadmeGenerator
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = Path(".til.sock")
+
+# Requests and responses are single lines of JSON
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+Response = dict[str, Any]
+
+
+class BuildDaemon:
+    """Serves build, README and validate requests from a warm processor.
+
+    The processor, its git repository handle and history cache and a
+    pooled HTTP client for the markdown API are created once and reused by
+    every request. Requests are handled one at a time, so two builds never
+    write the database at once.
+    """
+
+    def __init__(self, config: TILConfig, socket_path: Path = DEFAULT_SOCKET):
+        """Initialize BuildDaemon.
+
+        Args:
+            config: TIL configuration
+            socket_path: Unix socket to listen on
+
+        """
+        self.config = config
+        self.socket_path = socket_path
+        self.client = httpx.Client(timeout=30.0)
+        self.processor = TILProcessor(config)
+        self.processor.renderer.client = self.client
+        self.started = time.monotonic()
+        self.requests = 0
+        self._server: Optional[socketserver.UnixStreamServer] = None
+        self._commands: dict[str, Callable[[dict[str, Any]], Response]] = {
+            "ping": self.ping,
+            "build": self.build,
+            "update-readme": self.update_readme,
+            "validate": self.validate,
+            "shutdown": self.shutdown,
+        }
+
+    def ping(self, args: dict[str, Any]) -> Response:  # noqa: ARG002
+        """Report that the daemon is alive."""
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.monotonic() - self.started, 3),
+            "requests": self.requests,
+        }
+
+    def build(self, args: dict[str, Any]) -> Response:  # noqa: ARG002
+        """Build the database with the warm processor."""
+        self.processor.build_database()
+        return {"entries": self.processor.database.count()}
+
+    def update_readme(self, args: dict[str, Any]) -> Response:
+        """Regenerate the README index, in place with rewrite set."""
+        generator = ReadmeGenerator(self.processor.database)
+        if args.get("rewrite"):
+            readme_path = self.config.root_path / "README.md"
+            if not readme_path.exists():
+                raise TILError(f"README.md not found at {readme_path}")
+            generator.update_readme(readme_path)
+            return {"readme": str(readme_path)}
+        return {"index": "\n".join(generator.generate_index())}
+
+    def validate(self, args: dict[str, Any]) -> Response:  # noqa: ARG002
+        """Run every database validation."""
+        results = DatabaseValidator(self.config.database_path).run_all_validations()
+        return {
+            "valid": all(result.is_valid for result in results),
+            "checks": [
+                {"valid": result.is_valid, "message": result.message}
+                for result in results
+            ],
+        }
+
+    def shutdown(self, args: dict[str, Any]) -> Response:  # noqa: ARG002
+        """Stop serving once this request has been answered."""
+        if self._server:
+            # shutdown() waits for serve_forever() to return, which only
+            # happens after this request has been answered
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {"stopping": True}
+
+    def handle(self, request: dict[str, Any]) -> Response:
+        """Run one request.
+
+        Args:
+            request: Decoded request with a command and optional args
+
+        Returns:
+            Response with ok set, the command's result or an error, and the
+            seconds taken
+
+        """
+        self.requests += 1
+        started = time.perf_counter()
+        command = request.get("command")
+        handler = self._commands.get(command) if isinstance(command, str) else None
+        if handler is None:
+            return {
+                "ok": False,
+                "error": f"Unknown command: {command}. "
+                f"Expected one of: {', '.join(self._commands)}",
+            }
+
+        logger.info(f"Handling {command} request")
+        try:
+            result = handler(request.get("args") or {})
+        except Exception as e:
+            logger.error(f"{command} request failed: {e}")
+            response: Response = {"ok": False, "error": str(e)}
+        else:
+            response = {"ok": True, "result": result}
+        response["seconds"] = round(time.perf_counter() - started, 3)
+        return response
+
+    def serve_forever(self) -> None:
+        """Listen on the socket until a shutdown request or interrupt.
+
+        Raises:
+            TILError: If another daemon is already listening on the socket
+
+        """
+        if self.socket_path.exists():
+            if _is_listening(self.socket_path):
+                raise TILError(f"A daemon is already listening on {self.socket_path}")
+            # Left behind by a daemon that did not shut down cleanly
+            self.socket_path.unlink()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise TypeError("request must be a JSON object")
+                    except (TypeError, ValueError) as e:
+                        response: Response = {
+                            "ok": False,
+                            "error": f"Invalid request: {e}",
+                        }
+                    else:
+                        response = daemon.handle(request)
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        old_umask = os.umask(0o077)
+        try:
+            # The socket is only reachable by its owner
+            self._server = socketserver.UnixStreamServer(str(self.socket_path), Handler)
+        finally:
+            os.umask(old_umask)
+
+        logger.info(f"Daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever(poll_interval=0.1)
+        finally:
+            self._server.server_close()
+            self._server = None
+            self.socket_path.unlink(missing_ok=True)
+            self.client.close()
+            self.processor.database.close()
+            logger.info("Daemon stopped")
+
+
+def _is_listening(socket_path: Path) -> bool:
+    """Whether a server accepts connections on a Unix socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def send_request(
+    command: str,
+    args: Optional[dict[str, Any]] = None,
+    socket_path: Path = DEFAULT_SOCKET,
+    timeout: Optional[float] = None,
+) -> Response:
+    """Send a request to a running daemon and wait for the response.
+
+    Args:
+        command: ping, build, update-readme, validate or shutdown
+        args: Command arguments
+        socket_path: Unix socket the daemon listens on
+        timeout: Seconds to wait for the response (default: no limit)
+
+    Returns:
+        The daemon's response
+
+    Raises:
+        TILError: If the daemon cannot be reached or answers badly
+
+    """
+    request = json.dumps({"command": command, "args": args or {}}).encode("utf-8")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(request + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline(MAX_MESSAGE_BYTES)
+    except OSError as e:
+        raise TILError(f"Cannot reach daemon at {socket_path}: {e}")
+
+    try:
+        response = json.loads(line)
+    except ValueError as e:
+        raise TILError(f"Invalid response from daemon: {e}")
+    if not isinstance(response, dict):
+        raise TILError("Invalid response from daemon: expected a JSON object")
+    return response
@@ -1,41 +1,189 @@
 """Database operations for TIL."""
 
 import logging
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
 import sqlite_utils
 from sqlite_utils.db import NotFoundError, Table
 
-from .exceptions import DatabaseError
+from .compression import (
+    compress_text,
+    COMPRESSED_COLUMNS,
+    decompress_record,
+    STORAGE_CODECS,
+)
+from .connections import connect
+from .exceptions import ConfigurationError, DatabaseError
+from .tracing import traced
 
 
 logger = logging.getLogger(__name__)
 
+# Number of entries materialised into til_recent for the homepage
+RECENT_LIMIT = 5
+
+AGGREGATE_TABLES_SQL = [
+    "drop table if exists til_stats",
+    "create table til_stats (total integer not null, topics integer not null)",
+    "drop table if exists til_topics",
+    """
+    create table til_topics (
+        topic text primary key,
+        count integer not null,
+        latest_path text,
+        latest_slug text,
+        latest_title text,
+        latest_created_utc text
+    )
+    """,
+    "drop table if exists til_recent",
+    """
+    create table til_recent (
+        rank integer primary key,
+        path text not null,
+        topic text not null,
+        slug text not null,
+        title text,
+        created text,
+        created_utc text
+    )
+    """,
+    "drop table if exists til_random",
+    """
+    create table til_random (
+        id integer primary key,
+        topic text not null,
+        slug text not null
+    )
+    """,
+]
+
+RELATED_TABLES_SQL = [
+    """
+    create table if not exists til_related (
+        path text not null,
+        rank integer not null,
+        related_path text not null,
+        score real,
+        primary key (path, rank)
+    )
+    """,
+    """
+    create table if not exists til_related_state (
+        path text primary key,
+        digest text not null
+    )
+    """,
+]
+
 
 class TILDatabase:
     """Handle all database operations."""
 
-    def __init__(self, db_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        compression: Optional[str] = None,
+        profile: str = "maintenance",
+    ):
         """Initialize TILDatabase with database path.
 
         Args:
             db_path: Path to SQLite database file
+            compression: Codec used to store body and html compressed
+                (zlib or zstd), or None to store them as text
+            profile: Connection profile from til.connections; "build" for
+                bulk writes, "serve" for read-only use
 
         Raises:
+            ConfigurationError: If the compression codec or profile is unknown
             DatabaseError: If database cannot be initialized
 
         """
+        if compression is not None and compression not in STORAGE_CODECS:
+            raise ConfigurationError(
+                f"Unsupported storage compression: {compression}. "
+                f"Expected one of: {', '.join(STORAGE_CODECS)}"
+            )
         self.db_path = db_path
+        self.compression = compression
 
         # Ensure parent directory exists
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            self.db = sqlite_utils.Database(db_path)
+            # Connections can read compressed columns: til_decompress(body)
+            self.db = sqlite_utils.Database(connect(db_path, profile))
+        except ConfigurationError:
+            raise
         except Exception as e:
             raise DatabaseError(f"Failed to initialize database at {db_path}: {e}")
 
+    @classmethod
+    def in_memory(
+        cls, seed: Optional[Path] = None, compression: Optional[str] = None
+    ) -> "TILDatabase":
+        """Open a database held entirely in memory.
+
+        Args:
+            seed: Database file to start from, if it exists, so unchanged
+                entries keep their rendered HTML
+            compression: Codec used to store body and html compressed
+
+        Returns:
+            TILDatabase whose db_path is ":memory:"; write it out with flush()
+
+        Raises:
+            DatabaseError: If the seed database cannot be loaded
+
+        """
+        database = cls(Path(":memory:"), compression=compression, profile="build")
+        if seed is None or not seed.exists():
+            return database
+
+        try:
+            source = connect(seed, "serve")
+            try:
+                # An in-memory destination must match the source page size
+                page_size = source.execute("PRAGMA page_size").fetchone()[0]
+                database.db.execute(f"PRAGMA page_size={int(page_size)}")
+                source.backup(database.db.conn)
+            finally:
+                source.close()
+        except Exception as e:
+            raise DatabaseError(f"Failed to load {seed} into memory: {e}")
+
+        logger.info(f"Loaded {seed} into memory")
+        return database
+
+    @traced("flush", "database")
+    def flush(self, target_path: Path) -> None:
+        """Write the whole database to a file in a single backup.
+
+        The target is replaced page for page in one transaction, so disk
+        writes and syncs happen once at the end instead of on every commit.
+
+        Args:
+            target_path: File to write the database to
+
+        Raises:
+            DatabaseError: If the database cannot be written
+
+        """
+        try:
+            target = connect(target_path)
+            try:
+                self.db.conn.backup(target)
+            finally:
+                target.close()
+        except Exception as e:
+            raise DatabaseError(f"Failed to write database to {target_path}: {e}")
+
+        logger.info(f"Wrote database to {target_path}")
+
     def get_table(self) -> Table:
         """Get the til table, ensuring it's a Table instance.
 
@@ -55,6 +203,7 @@ class TILDatabase:
         except Exception as e:
             raise DatabaseError(f"Failed to get til table: {e}")
 
+    @traced("upsert", "database")
     def upsert_record(self, record: dict[str, Any]) -> None:
         """Insert or update a TIL record.
 
@@ -73,6 +222,14 @@ class TILDatabase:
         if missing_fields:
             raise DatabaseError(f"Record missing required fields: {missing_fields}")
 
+        if self.compression:
+            record = {
+                key: compress_text(value, self.compression)
+                if key in COMPRESSED_COLUMNS and isinstance(value, str)
+                else value
+                for key, value in record.items()
+            }
+
         try:
             table = self.get_table()
             with self.db.conn:
@@ -81,6 +238,7 @@ class TILDatabase:
         except Exception as e:
             raise DatabaseError(f"Failed to save record {record.get('path', '?')}: {e}")
 
+    @traced("previous record", "database")
     def get_previous_record(self, path: str) -> Optional[dict[str, Any]]:
         """Get previous version of a record.
 
@@ -99,7 +257,7 @@ class TILDatabase:
 
         try:
             table = self.get_table()
-            return dict(table.get(path))
+            return decompress_record(dict(table.get(path)))
         except NotFoundError:
             logger.debug(f"No previous record found for {path}")
             return None
@@ -109,9 +267,14 @@ class TILDatabase:
         except Exception as e:
             raise DatabaseError(f"Failed to get previous record for {path}: {e}")
 
+    @traced("enable search", "database")
     def enable_search(self) -> None:
         """Enable full-text search on title and body fields.
 
+        When bodies are stored compressed, til_fts keeps its own copy of the
+        decompressed text instead of reading the til table, and is rebuilt
+        in full on every call.
+
         Raises:
             DatabaseError: If search cannot be enabled
 
@@ -122,6 +285,13 @@ class TILDatabase:
             # Only enable if the table has records
             if "til" in self.db.table_names() and table.count > 0:
                 logger.info("Enabling full-text search...")
+                if self._has_compressed_rows():
+                    self._enable_compressed_search()
+                    logger.info("Full-text search enabled on decompressed text")
+                    return
+                if "til_fts" in self.db.table_names() and table.detect_fts() is None:
+                    # Replace a standalone index left by compressed storage
+                    self.db["til_fts"].drop()
                 table.enable_fts(
                     ["title", "body"],
                     tokenize="porter",
@@ -138,6 +308,358 @@ class TILDatabase:
             else:
                 raise DatabaseError(f"Failed to enable full-text search: {e}")
 
+    def _has_compressed_rows(self) -> bool:
+        """Check whether any body or html value is stored compressed."""
+        columns = [
+            column
+            for column in COMPRESSED_COLUMNS
+            if column in self.get_table().columns_dict
+        ]
+        if not columns:
+            return False
+        where = " or ".join(f"typeof({column}) = 'blob'" for column in columns)
+        return (
+            self.db.execute(f"select 1 from til where {where} limit 1").fetchone()  # noqa: S608
+            is not None
+        )
+
+    def _enable_compressed_search(self) -> None:
+        """Rebuild til_fts from decompressed bodies in a single transaction."""
+        table = self.get_table()
+        conn = self.db.conn
+        try:
+            table.disable_fts()
+            conn.execute("begin")
+            conn.execute("drop table if exists til_fts")
+            conn.execute(
+                "create virtual table til_fts using fts5("
+                "title, body, tokenize='porter')"
+            )
+            conn.execute(
+                "insert into til_fts (rowid, title, body) "
+                "select rowid, title, til_decompress(body) from til"
+            )
+            conn.execute("commit")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("rollback")
+            raise
+
+    def create_indexes(self) -> None:
+        """Create indexes backing the topic listing queries.
+
+        Raises:
+            DatabaseError: If the indexes cannot be created
+
+        """
+        if "til" not in self.db.table_names():
+            logger.info("No til table exists yet, skipping indexes")
+            return
+
+        try:
+            with self.db.conn:
+                self.db.execute(
+                    "create index if not exists til_topic_created "
+                    "on til (topic, created_utc desc)"
+                )
+                if "source" in self.get_table().columns_dict:
+                    self.db.execute(
+                        "create index if not exists til_source on til (source)"
+                    )
+        except Exception as e:
+            raise DatabaseError(f"Failed to create indexes: {e}")
+
+    def create_related_tables(self) -> None:
+        """Create the tables holding precomputed related entries.
+
+        Raises:
+            DatabaseError: If the tables cannot be created
+
+        """
+        try:
+            with self.db.conn:
+                for statement in RELATED_TABLES_SQL:
+                    self.db.execute(statement)
+        except Exception as e:
+            raise DatabaseError(f"Failed to create related tables: {e}")
+
+    @traced("refresh aggregates", "database")
+    def refresh_aggregates(self, recent_limit: int = RECENT_LIMIT) -> None:
+        """Rebuild the materialised aggregate tables read by the templates.
+
+        Replaces til_stats, til_topics, til_recent and til_random in a single
+        transaction so that pages never see a partially refreshed set of
+        aggregates. til_random numbers entries densely from 1 to the total,
+        letting a random entry be fetched with a single rowid lookup.
+
+        Args:
+            recent_limit: Number of most recently created entries to keep
+
+        Raises:
+            DatabaseError: If the aggregates cannot be refreshed
+
+        """
+        if "til" not in self.db.table_names():
+            logger.info("No til table exists yet, skipping aggregates")
+            return
+
+        conn = self.db.conn
+        try:
+            conn.execute("begin")
+            for statement in AGGREGATE_TABLES_SQL:
+                conn.execute(statement)
+            conn.execute(
+                """
+                insert into til_stats (total, topics)
+                select count(*), count(distinct topic) from til
+                """
+            )
+            # SQLite fills bare columns from the row that produced max()
+            conn.execute(
+                """
+                insert into til_topics (
+                    topic, count, latest_path, latest_slug, latest_title,
+                    latest_created_utc
+                )
+                select topic, count(*), path, slug, title, max(created_utc)
+                from til
+                group by topic
+                """
+            )
+            conn.execute(
+                """
+                insert into til_recent (
+                    rank, path, topic, slug, title, created, created_utc
+                )
+                select
+                    row_number() over (order by created_utc desc),
+                    path, topic, slug, title, created, created_utc
+                from til
+                order by created_utc desc
+                limit ?
+                """,
+                [recent_limit],
+            )
+            conn.execute(
+                """
+                insert into til_random (id, topic, slug)
+                select row_number() over (order by path), topic, slug
+                from til
+                """
+            )
+            conn.execute("commit")
+            logger.info("Refreshed aggregate tables")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("rollback")
+            raise DatabaseError(f"Failed to refresh aggregate tables: {e}")
+
+    @traced("delete records", "database")
+    def delete_records(self, paths: list[str]) -> int:
+        """Delete TIL entries by path.
+
+        Args:
+            paths: Paths of the entries to delete
+
+        Returns:
+            Number of entries deleted
+
+        Raises:
+            DatabaseError: If the entries cannot be deleted
+
+        """
+        if not paths or "til" not in self.db.table_names():
+            return 0
+        try:
+            with self.db.conn:
+                self.db.conn.executemany(
+                    "delete from til where path = ?", [(path,) for path in paths]
+                )
+        except Exception as e:
+            raise DatabaseError(f"Failed to delete records: {e}")
+        return len(paths)
+
+    def record_shard(self, index: int, count: int) -> None:
+        """Mark this database as holding shard index of count.
+
+        Args:
+            index: 1-based shard number
+            count: Number of shards
+
+        Raises:
+            DatabaseError: If the shard cannot be recorded
+
+        """
+        try:
+            with self.db.conn:
+                self.db.table("til_shard").insert(
+                    {"id": 1, "shard_index": index, "shard_count": count},
+                    pk="id",
+                    replace=True,
+                )
+        except Exception as e:
+            raise DatabaseError(f"Failed to record shard: {e}")
+
+    def get_shard(self) -> Optional[tuple[int, int]]:
+        """Shard recorded by record_shard(), as (index, count).
+
+        Returns:
+            The shard, or None for a database built from every file
+
+        """
+        if "til_shard" not in self.db.table_names():
+            return None
+        row = self.db.execute(
+            "select shard_index, shard_count from til_shard"
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def clear_shard(self) -> None:
+        """Remove the shard marker once shards have been merged."""
+        if "til_shard" in self.db.table_names():
+            self.db.table("til_shard").drop()
+
+    def get_records(self, columns: list[str]) -> dict[str, dict[str, Any]]:
+        """Get selected columns of every entry, keyed by path.
+
+        Args:
+            columns: Columns to read besides path
+
+        Returns:
+            Dictionary mapping path to the record's decompressed columns
+
+        """
+        if "til" not in self.db.table_names():
+            return {}
+        table = self.get_table()
+        present = [column for column in columns if column in table.columns_dict]
+        return {
+            row["path"]: decompress_record(row)
+            for row in table.rows_where(select=", ".join(["path", *present]))
+        }
+
+    def get_source_watermarks(self) -> dict[str, Optional[str]]:
+        """Watermarks recorded by record_source(), keyed by source name."""
+        if "til_sources" not in self.db.table_names():
+            return {}
+        return {
+            row["source"]: row["watermark"] for row in self.db.table("til_sources").rows
+        }
+
+    def record_source(self, name: str, watermark: Optional[str], entries: int) -> None:
+        """Record the watermark a federated source was built from.
+
+        Args:
+            name: Source name
+            watermark: Watermark of the source's content, or None to
+                rebuild the source next time
+            entries: Number of entries the source contributes
+
+        Raises:
+            DatabaseError: If the source cannot be recorded
+
+        """
+        built_utc = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        try:
+            with self.db.conn:
+                self.db.table("til_sources").insert(
+                    {
+                        "source": name,
+                        "watermark": watermark,
+                        "entries": entries,
+                        "built_utc": built_utc,
+                    },
+                    pk="source",
+                    replace=True,
+                )
+        except Exception as e:
+            raise DatabaseError(f"Failed to record source {name}: {e}")
+
+    def delete_other_sources(self, names: list[str]) -> int:
+        """Delete entries and watermarks of sources not in names.
+
+        Entries without a source, left by a build that was not federated,
+        are deleted too.
+
+        Args:
+            names: Sources to keep
+
+        Returns:
+            Number of entries deleted
+
+        Raises:
+            DatabaseError: If the entries cannot be deleted
+
+        """
+        placeholders = ", ".join("?" for _ in names)
+        deleted = 0
+        try:
+            with self.db.conn:
+                if "til" in self.db.table_names():
+                    if "source" not in self.get_table().columns_dict:
+                        self.get_table().add_column("source", str)
+                    deleted = self.db.execute(
+                        "delete from til where source is null "  # noqa: S608
+                        f"or source not in ({placeholders})",
+                        names,
+                    ).rowcount
+                if "til_sources" in self.db.table_names():
+                    self.db.execute(
+                        "delete from til_sources "  # noqa: S608
+                        f"where source not in ({placeholders})",
+                        names,
+                    )
+        except Exception as e:
+            raise DatabaseError(f"Failed to delete removed sources: {e}")
+        return deleted
+
+    def stamp_build(self, build_id: Optional[str] = None) -> str:
+        """Record the ID and time of this build for HTTP cache validation.
+
+        Args:
+            build_id: Build ID to record (default: a new random ID)
+
+        Returns:
+            The recorded build ID
+
+        Raises:
+            DatabaseError: If the build cannot be recorded
+
+        """
+        build_id = build_id or uuid.uuid4().hex
+        built_utc = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+        try:
+            with self.db.conn:
+                self.db.table("til_build").insert(
+                    {"id": 1, "build_id": build_id, "built_utc": built_utc},
+                    pk="id",
+                    replace=True,
+                )
+        except Exception as e:
+            raise DatabaseError(f"Failed to record build: {e}")
+
+        logger.info(f"Stamped build {build_id}")
+        return build_id
+
+    @traced("checkpoint", "database")
+    def checkpoint(self) -> None:
+        """Fold the write-ahead log into the database file.
+
+        Builds write in WAL mode; switching back to a rollback journal
+        leaves a single self-contained file that can be copied, published
+        or opened immutably.
+
+        Raises:
+            DatabaseError: If the log cannot be checkpointed
+
+        """
+        try:
+            self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.db.execute("PRAGMA journal_mode=DELETE")
+        except Exception as e:
+            raise DatabaseError(f"Failed to checkpoint database: {e}")
+
     def get_all_by_topic(self) -> dict[str, list[dict[str, Any]]]:
         """Get all entries grouped by topic.
 
@@ -157,7 +679,7 @@ class TILDatabase:
 
             for row in self.db["til"].rows_where(order_by="created_utc"):
                 topic = row.get("topic", "unknown")
-                by_topic.setdefault(topic, []).append(dict(row))
+                by_topic.setdefault(topic, []).append(decompress_record(dict(row)))
 
             logger.info(
                 f"Retrieved {sum(len(records) for records in by_topic.values())} records across {len(by_topic)} topics"
@@ -2,11 +2,12 @@
 """Database validation and integrity checks for TIL."""
 
 import logging
-import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import NamedTuple, Optional
 
+from .connections import connect
+
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +32,31 @@ class DatabaseValidator:
         """
         self.db_path = db_path
 
+    def validate_sqlite_integrity(self) -> ValidationResult:
+        """Validate the database file is structurally sound."""
+        try:
+            conn = connect(self.db_path, "validate")
+            cursor = conn.cursor()
+
+            cursor.execute("PRAGMA quick_check")
+            problems = [row[0] for row in cursor.fetchall() if row[0] != "ok"]
+
+            conn.close()
+            if problems:
+                return ValidationResult(
+                    False,
+                    f"SQLite integrity check failed: {problems[0]}",
+                    {"problems": problems},
+                )
+            return ValidationResult(True, "SQLite integrity check passed")
+
+        except Exception as e:
+            return ValidationResult(False, f"SQLite integrity check failed: {e}")
+
     def validate_schema(self) -> ValidationResult:
         """Validate database has expected schema."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, "validate")
             cursor = conn.cursor()
 
             # Check if til table exists
@@ -78,7 +100,7 @@ class DatabaseValidator:
     def validate_creation_dates(self) -> ValidationResult:
         """Validate creation dates are reasonable (not all the same recent date)."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, "validate")
             cursor = conn.cursor()
 
             # Get all creation dates
@@ -143,15 +165,15 @@ class DatabaseValidator:
     def validate_content_integrity(self) -> ValidationResult:
         """Validate content fields are populated and consistent."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, "validate")
             cursor = conn.cursor()
 
             # Check for entries with missing required content
             cursor.execute("""
                 SELECT COUNT(*) FROM til
                 WHERE title IS NULL OR title = ''
-                OR body IS NULL OR body = ''
-                OR html IS NULL OR html = ''
+                OR body IS NULL OR til_decompress(body) = ''
+                OR html IS NULL OR til_decompress(html) = ''
             """)
 
             missing_content = cursor.fetchone()[0]
@@ -164,7 +186,8 @@ class DatabaseValidator:
             # Check for reasonable content lengths
             cursor.execute("""
                 SELECT COUNT(*) FROM til
-                WHERE LENGTH(body) < 10 OR LENGTH(html) < 20
+                WHERE LENGTH(til_decompress(body)) < 10
+                OR LENGTH(til_decompress(html)) < 20
             """)
 
             short_content = cursor.fetchone()[0]
@@ -183,7 +206,7 @@ class DatabaseValidator:
     def validate_full_text_search(self) -> ValidationResult:
         """Validate FTS table exists and is populated."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, "validate")
             cursor = conn.cursor()
 
             # Check if FTS table exists
@@ -219,6 +242,7 @@ class DatabaseValidator:
     def run_all_validations(self) -> list[ValidationResult]:
         """Run all validation checks."""
         validations = [
+            ("SQLite Integrity", self.validate_sqlite_integrity),
             ("Schema", self.validate_schema),
             ("Creation Dates", self.validate_creation_dates),
             ("Content Integrity", self.validate_content_integrity),
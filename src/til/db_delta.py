@@ -0,0 +1,341 @@
+"""Row-level deltas between two TIL database builds."""
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from sqlite_utils.db import COLUMN_TYPE_MAPPING
+
+from .database import TILDatabase
+from .exceptions import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+DELTA_FORMAT = "til-delta"
+DELTA_VERSION = 1
+
+# Source tables carried in a delta. Search and aggregates are rebuilt after
+# applying; related entries are carried because computing them needs NumPy
+DELTA_TABLES = ("til", "til_related", "til_related_state")
+
+Row = dict[str, Any]
+
+
+class DeltaSummary(NamedTuple):
+    """Changes described by a delta."""
+
+    upserts: int
+    deletes: int
+    base_checksum: str
+    target_checksum: str
+
+
+def _encode_value(value: Any) -> Any:
+    """Make a column value JSON-serialisable."""
+    if isinstance(value, bytes):
+        return {"$base64": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Reverse _encode_value."""
+    if isinstance(value, dict) and "$base64" in value:
+        return base64.b64decode(value["$base64"])
+    return value
+
+
+def _canonical(row: Row) -> str:
+    """Canonical JSON form of a row used for comparison and checksums."""
+    return json.dumps(
+        {key: _encode_value(value) for key, value in row.items()},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+def _read_tables(database: Optional[TILDatabase]) -> dict[str, tuple[list[str], dict]]:
+    """Read the delta tables keyed by primary key.
+
+    Returns:
+        Dictionary mapping table name to (primary key columns, rows by key)
+
+    """
+    tables: dict[str, tuple[list[str], dict]] = {}
+    if database is None:
+        return tables
+    names = database.db.table_names()
+    for name in DELTA_TABLES:
+        if name not in names:
+            continue
+        table = database.db.table(name)
+        pks = table.pks
+        rows = {tuple(row[pk] for pk in pks): dict(row) for row in table.rows}
+        tables[name] = (pks, rows)
+    return tables
+
+
+def _checksum(tables: dict[str, tuple[list[str], dict]]) -> str:
+    """Checksum of the delta tables' content, independent of file layout."""
+    digest = hashlib.sha256()
+    for name in sorted(tables):
+        _, rows = tables[name]
+        if not rows:
+            # An empty table and a missing one hold the same content
+            continue
+        digest.update(name.encode("utf-8") + b"\0")
+        for key in sorted(rows, key=_canonical_key):
+            digest.update(_canonical(rows[key]).encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def _canonical_key(key: tuple) -> str:
+    """Sort key for primary keys of any column type."""
+    return json.dumps([_encode_value(part) for part in key])
+
+
+def table_checksum(db_path: Path) -> str:
+    """Checksum of the content a delta can change in a database.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        Hex SHA256 checksum
+
+    """
+    return _checksum(_read_tables(TILDatabase(db_path, profile="serve")))
+
+
+def create_delta(
+    base_path: Optional[Path], target_path: Path, output_path: Path
+) -> DeltaSummary:
+    """Write the row-level changes that turn base into target.
+
+    The delta is gzip-compressed JSON Lines: a header recording the
+    checksums of both databases and the target's build ID, then one line
+    per deleted or upserted row in a deterministic order.
+
+    Args:
+        base_path: Previous build, or None to diff against an empty database
+        target_path: New build
+        output_path: File to write the delta to
+
+    Returns:
+        DeltaSummary of the changes written
+
+    Raises:
+        DatabaseError: If either database cannot be read or the delta written
+
+    """
+    try:
+        base = _read_tables(
+            TILDatabase(base_path, profile="serve")
+            if base_path and base_path.exists()
+            else None
+        )
+        target_db = TILDatabase(target_path, profile="serve")
+        target = _read_tables(target_db)
+        build_id = None
+        if "til_build" in target_db.db.table_names():
+            row = target_db.db.execute("select build_id from til_build").fetchone()
+            build_id = row[0] if row else None
+    except Exception as e:
+        raise DatabaseError(f"Failed to read databases for delta: {e}")
+
+    changes: list[dict[str, Any]] = []
+    for name in sorted(set(base) | set(target)):
+        base_rows = base.get(name, ([], {}))[1]
+        pks, target_rows = target.get(name, (base.get(name, ([], {}))[0], {}))
+
+        for key in sorted(set(base_rows) - set(target_rows), key=_canonical_key):
+            changes.append({"table": name, "op": "delete", "key": dict(zip(pks, key))})
+        for key in sorted(target_rows, key=_canonical_key):
+            row = target_rows[key]
+            if key not in base_rows or _canonical(base_rows[key]) != _canonical(row):
+                changes.append(
+                    {
+                        "table": name,
+                        "op": "upsert",
+                        "pk": pks,
+                        "row": {k: _encode_value(v) for k, v in row.items()},
+                    }
+                )
+
+    summary = DeltaSummary(
+        upserts=sum(1 for change in changes if change["op"] == "upsert"),
+        deletes=sum(1 for change in changes if change["op"] == "delete"),
+        base_checksum=_checksum(base),
+        target_checksum=_checksum(target),
+    )
+    header = {
+        "format": DELTA_FORMAT,
+        "version": DELTA_VERSION,
+        "base_checksum": summary.base_checksum,
+        "target_checksum": summary.target_checksum,
+        "build_id": build_id,
+        "upserts": summary.upserts,
+        "deletes": summary.deletes,
+    }
+
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+        payload = b"".join(
+            json.dumps(line, sort_keys=True).encode("utf-8") + b"\n"
+            for line in [header, *changes]
+        )
+        # No file name or mtime in the gzip header, so identical changes give
+        # identical files
+        tmp_path.write_bytes(gzip.compress(payload, 9, mtime=0))
+        tmp_path.replace(output_path)
+    except Exception as e:
+        raise DatabaseError(f"Failed to write delta {output_path}: {e}")
+
+    logger.info(
+        f"Wrote delta with {summary.upserts} upserts and {summary.deletes} deletes "
+        f"to {output_path}"
+    )
+    return summary
+
+
+def _read_delta(delta_path: Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Read and validate a delta file."""
+    try:
+        with gzip.open(delta_path, "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+    except Exception as e:
+        raise DatabaseError(f"Failed to read delta {delta_path}: {e}")
+
+    if not lines or lines[0].get("format") != DELTA_FORMAT:
+        raise DatabaseError(f"Not a TIL delta file: {delta_path}")
+    header = lines[0]
+    if header.get("version") != DELTA_VERSION:
+        raise DatabaseError(f"Unsupported delta version: {header.get('version')}")
+    return header, lines[1:]
+
+
+def _create_table_sql(name: str, types: dict[str, type], pks: list[str]) -> str:
+    """SQL creating a delta table with the column types seen in its rows."""
+    columns = [
+        f"[{column}] {COLUMN_TYPE_MAPPING.get(column_type, 'TEXT')}"
+        for column, column_type in types.items()
+    ]
+    primary_key = ", ".join(f"[{pk}]" for pk in pks)
+    return f"create table [{name}] ({', '.join(columns)}, primary key ({primary_key}))"
+
+
+def apply_delta(
+    database: TILDatabase, delta_path: Path, rebuild: bool = True
+) -> DeltaSummary:
+    """Apply a delta to the database it was created from.
+
+    The database's content must match the delta's base checksum. Changes
+    are applied in a single transaction that is only committed once the
+    result matches the target checksum. Search, indexes and aggregates are
+    then rebuilt and the target's build ID is stamped.
+
+    Args:
+        database: Database to update in place
+        delta_path: Delta written by create_delta
+        rebuild: Rebuild derived tables after applying
+
+    Returns:
+        DeltaSummary of the changes applied
+
+    Raises:
+        DatabaseError: If the delta does not apply cleanly
+
+    """
+    header, changes = _read_delta(delta_path)
+
+    current = _checksum(_read_tables(database))
+    if current != header["base_checksum"]:
+        raise DatabaseError(
+            f"Delta base checksum {header['base_checksum'][:12]} does not match "
+            f"database {current[:12]}"
+        )
+
+    # Column types come from the first non-null value across all upserts so a
+    # leading null does not give a numeric column text affinity
+    column_types: dict[str, dict[str, type]] = {}
+    pks_by_table: dict[str, list[str]] = {}
+    for change in changes:
+        if change["op"] != "upsert":
+            continue
+        pks_by_table.setdefault(change["table"], change["pk"])
+        types = column_types.setdefault(change["table"], {})
+        for column, value in change["row"].items():
+            if types.get(column, str) is str and value is not None:
+                types[column] = type(_decode_value(value))
+            types.setdefault(column, str)
+
+    db = database.db
+    conn = db.conn
+    try:
+        conn.execute("begin")
+        # Schema changes go through plain SQL so they join the transaction and
+        # are rolled back with the rows
+        for name, types in column_types.items():
+            table = db.table(name)
+            if not table.exists():
+                conn.execute(_create_table_sql(name, types, pks_by_table[name]))
+                continue
+            for column in sorted(set(types) - set(table.columns_dict)):
+                conn.execute(
+                    f"alter table [{name}] add column [{column}] "
+                    f"{COLUMN_TYPE_MAPPING.get(types[column], 'TEXT')}"
+                )
+        for change in changes:
+            name = change["table"]
+            if change["op"] == "delete":
+                key = change["key"]
+                where = " and ".join(f"[{column}] = ?" for column in key)
+                conn.execute(
+                    f"delete from [{name}] where {where}",  # noqa: S608
+                    list(key.values()),
+                )
+            else:
+                row = {k: _decode_value(v) for k, v in change["row"].items()}
+                columns = ", ".join(f"[{column}]" for column in row)
+                placeholders = ", ".join("?" for _ in row)
+                conn.execute(
+                    f"insert or replace into [{name}] ({columns}) "  # noqa: S608
+                    f"values ({placeholders})",
+                    list(row.values()),
+                )
+        # Verified before committing, so a mismatch leaves the database as it was
+        applied = _checksum(_read_tables(database))
+    except Exception as e:
+        if conn.in_transaction:
+            conn.execute("rollback")
+        raise DatabaseError(f"Failed to apply delta {delta_path}: {e}")
+
+    if applied != header["target_checksum"]:
+        conn.execute("rollback")
+        raise DatabaseError(
+            f"Database checksum {applied[:12]} does not match delta target "
+            f"{header['target_checksum'][:12]} after applying"
+        )
+    conn.execute("commit")
+
+    if rebuild:
+        database.enable_search()
+        database.create_indexes()
+        database.refresh_aggregates()
+        database.stamp_build(header.get("build_id"))
+
+    logger.info(
+        f"Applied delta with {header['upserts']} upserts and "
+        f"{header['deletes']} deletes from {delta_path}"
+    )
+    return DeltaSummary(
+        upserts=header["upserts"],
+        deletes=header["deletes"],
+        base_checksum=header["base_checksum"],
+        target_checksum=header["target_checksum"],
+    )
@@ -0,0 +1,123 @@
+"""Content discovery, history and watermarks for federated sources."""
+
+import datetime
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from .config import SourceConfig
+from .exceptions import RepositoryError
+from .repository import GitRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class SourceBuild(NamedTuple):
+    """Entries collected from one source."""
+
+    name: str
+    watermark: Optional[str]
+    records: list[dict[str, Any]]
+    errors: int
+    skipped: bool = False
+    failed: bool = False
+
+
+def source_files(source: SourceConfig) -> list[Path]:
+    """Markdown files of a source in a stable order.
+
+    Args:
+        source: Source to scan
+
+    Returns:
+        Paths of content/<topic>/<slug>.md files
+
+    """
+    return sorted(source.root_path.glob("content/*/*.md"))
+
+
+def _head_commit(source: SourceConfig) -> str:
+    """Commit checked out in a git source, or an empty string."""
+    try:
+        return GitRepository(source.root_path).repo.head.commit.hexsha
+    except Exception:
+        return ""
+
+
+def source_watermark(source: SourceConfig, files: list[Path]) -> str:
+    """Fingerprint of everything a source's entries are built from.
+
+    Covers the source's link and history settings, its checked out commit
+    and the name, size and modification time of every file. A source whose
+    watermark matches the one stored by the previous build is unchanged and
+    can be skipped.
+
+    Args:
+        source: Source to fingerprint
+        files: The source's markdown files
+
+    Returns:
+        Hex SHA256 watermark
+
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{source.file_url('')}\0{source.history}\0".encode())
+    if source.history == "git":
+        digest.update(_head_commit(source).encode() + b"\0")
+    for filepath in files:
+        stat = filepath.stat()
+        relative = filepath.relative_to(source.root_path).as_posix()
+        digest.update(f"{relative}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _timestamps(moment: datetime.datetime) -> dict[str, str]:
+    """Local and UTC ISO timestamps for a moment."""
+    return {
+        "created": moment.isoformat(),
+        "created_utc": moment.astimezone(datetime.timezone.utc).isoformat(),
+        "updated": moment.isoformat(),
+        "updated_utc": moment.astimezone(datetime.timezone.utc).isoformat(),
+    }
+
+
+def source_history(
+    source: SourceConfig, files: list[Path]
+) -> dict[str, dict[str, str]]:
+    """Created and updated times of a source's files from its history backend.
+
+    Args:
+        source: Source to read history for
+        files: The source's markdown files
+
+    Returns:
+        Dictionary mapping relative file path to timestamps. Files without
+        history are missing and fall back to the build time.
+
+    """
+    if source.history == "git":
+        try:
+            return GitRepository(source.root_path).get_file_history()
+        except RepositoryError as e:
+            logger.warning(
+                f"No git history for source {source.name}, using build time: {e}"
+            )
+            return {}
+
+    if source.history == "mtime":
+        history = {}
+        for filepath in files:
+            modified = datetime.datetime.fromtimestamp(filepath.stat().st_mtime)
+            history[filepath.relative_to(source.root_path).as_posix()] = _timestamps(
+                modified.astimezone()
+            )
+        return history
+
+    return {}
+
+
+def build_timestamps() -> dict[str, str]:
+    """Timestamps for files without history, set to the current time."""
+    return _timestamps(datetime.datetime.now())
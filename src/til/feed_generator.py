@@ -0,0 +1,255 @@
+"""Static Atom feed generation for TIL."""
+
+import gzip
+import hashlib
+import json
+import logging
+import pathlib
+import xml.etree.ElementTree as ET
+from typing import Any, Optional
+
+from .database import TILDatabase
+from .exceptions import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+
+FEED_TITLE = "Taylor Hodge - TIL"
+SITE_URL = "https://til.taylorhodge.me/"
+ATOM_ID_PREFIX = "tag:til.taylorhodge.me,2020-04-20:"
+AUTHOR_NAME = "Taylor Hodge"
+AUTHOR_URI = "https://taylorhodge.me/"
+
+# Number of entries in each feed
+FEED_LIMIT = 15
+
+MANIFEST_NAME = "manifest.json"
+GLOBAL_FEED = "feed.atom"
+
+
+def topic_feed_name(topic: str) -> str:
+    """Relative path of the feed for a topic."""
+    return f"topics/{topic}.atom"
+
+
+def _element(
+    parent: ET.Element, tag: str, text: Optional[str] = None, **attrib: str
+) -> ET.Element:
+    """Append an Atom element to parent."""
+    child = ET.SubElement(parent, f"{{{ATOM_NAMESPACE}}}{tag}", attrib)
+    if text is not None:
+        child.text = text
+    return child
+
+
+class FeedGenerator:
+    """Write the site-wide and per-topic Atom feeds as static files."""
+
+    def __init__(
+        self, database: TILDatabase, output_dir: pathlib.Path, limit: int = FEED_LIMIT
+    ):
+        """Initialize FeedGenerator.
+
+        Args:
+            database: TIL database instance
+            output_dir: Directory the feeds are written to
+            limit: Number of entries in each feed
+
+        """
+        self.database = database
+        self.output_dir = output_dir
+        self.limit = limit
+
+    def generate(self, force: bool = False) -> list[str]:
+        """Write every feed whose entries changed since the last run.
+
+        Each feed is written alongside a gzip-compressed copy, and a
+        manifest records its ETag and a fingerprint of its entries and
+        their rendered HTML, so unchanged feeds are skipped on the next
+        build and keep their ETag.
+
+        Args:
+            force: Rewrite every feed regardless of fingerprints
+
+        Returns:
+            Relative paths of the feeds that were written
+
+        Raises:
+            DatabaseError: If feed entries cannot be read
+
+        """
+        feeds = self._feed_entries()
+        manifest = self._load_manifest()
+        html = self._fetch_html(
+            {entry["path"] for entries in feeds.values() for entry in entries}
+        )
+        fingerprints = {
+            name: self._fingerprint(entries, html) for name, entries in feeds.items()
+        }
+
+        stale = {
+            name: entries
+            for name, entries in feeds.items()
+            if force
+            or not (self.output_dir / name).exists()
+            or manifest.get(name, {}).get("fingerprint") != fingerprints[name]
+        }
+
+        written = []
+        for name, entries in sorted(stale.items()):
+            topic = None if name == GLOBAL_FEED else entries[0]["topic"]
+            content = self._render(name, topic, entries, html)
+            self._write(name, content)
+            manifest[name] = {
+                "etag": f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+                "fingerprint": fingerprints[name],
+                "bytes": len(content),
+            }
+            written.append(name)
+
+        # Remove feeds for topics that no longer exist
+        for name in sorted(set(manifest) - set(feeds)):
+            for suffix in ("", ".gz"):
+                (self.output_dir / f"{name}{suffix}").unlink(missing_ok=True)
+            del manifest[name]
+
+        self._write(
+            MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode()
+        )
+        logger.info(f"Wrote {len(written)} of {len(feeds)} feeds to {self.output_dir}")
+        return written
+
+    def _feed_entries(self) -> dict[str, list[dict[str, Any]]]:
+        """Select the narrow columns of every feed's entries in one scan."""
+        if "til" not in self.database.db.table_names():
+            return {}
+
+        try:
+            rows = self.database.db.execute(
+                """
+                select * from (
+                    select
+                        path, topic, slug, title, created_utc, updated_utc,
+                        row_number() over (order by created_utc desc) as overall,
+                        row_number() over (
+                            partition by topic order by created_utc desc
+                        ) as in_topic
+                    from til
+                )
+                where overall <= :limit or in_topic <= :limit
+                order by created_utc desc, path
+                """,
+                {"limit": self.limit},
+            ).fetchall()
+        except Exception as e:
+            raise DatabaseError(f"Failed to select feed entries: {e}")
+
+        columns = ["path", "topic", "slug", "title", "created_utc", "updated_utc"]
+        feeds: dict[str, list[dict[str, Any]]] = {}
+        for row in rows:
+            entry = dict(zip(columns, row[:6]))
+            overall, in_topic = row[6], row[7]
+            if overall <= self.limit:
+                feeds.setdefault(GLOBAL_FEED, []).append(entry)
+            if in_topic <= self.limit:
+                feeds.setdefault(topic_feed_name(entry["topic"]), []).append(entry)
+        return feeds
+
+    def _fetch_html(self, paths: set[str]) -> dict[str, str]:
+        """Fetch rendered HTML for the entries of every feed."""
+        if not paths:
+            return {}
+        try:
+            table = self.database.get_table()
+            placeholders = ", ".join("?" for _ in paths)
+            return {
+                row["path"]: row["html"] or ""
+                for row in table.rows_where(
+                    f"path in ({placeholders})",
+                    sorted(paths),
+                    select="path, til_decompress(html) as html",
+                )
+            }
+        except Exception as e:
+            raise DatabaseError(f"Failed to fetch feed content: {e}")
+
+    @staticmethod
+    def _fingerprint(entries: list[dict[str, Any]], html: dict[str, str]) -> str:
+        """Digest of the entries and rendered HTML that make up a feed."""
+        inputs = [{**entry, "html": html.get(entry["path"], "")} for entry in entries]
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _render(
+        self,
+        name: str,
+        topic: Optional[str],
+        entries: list[dict[str, Any]],
+        html: dict[str, str],
+    ) -> bytes:
+        """Render a feed as Atom XML.
+
+        The output depends only on the entries, so regenerating an unchanged
+        feed yields identical bytes and therefore an identical ETag.
+        """
+        ET.register_namespace("", ATOM_NAMESPACE)
+
+        feed = ET.Element(f"{{{ATOM_NAMESPACE}}}feed")
+        _element(
+            feed, "title", FEED_TITLE if topic is None else f"{FEED_TITLE}: {topic}"
+        )
+        _element(feed, "id", f"{ATOM_ID_PREFIX}{name}")
+        _element(feed, "link", href=f"{SITE_URL}feeds/{name}", rel="self")
+        _element(feed, "link", href=SITE_URL if topic is None else f"{SITE_URL}{topic}")
+        _element(feed, "updated", max(entry["created_utc"] or "" for entry in entries))
+
+        author = _element(feed, "author")
+        _element(author, "name", AUTHOR_NAME)
+        _element(author, "uri", AUTHOR_URI)
+
+        for entry in entries:
+            item = _element(feed, "entry")
+            _element(item, "id", f"{ATOM_ID_PREFIX}{entry['path']}")
+            _element(item, "title", entry["title"])
+            _element(item, "link", href=f"{SITE_URL}{entry['topic']}/{entry['slug']}")
+            _element(item, "updated", entry["created_utc"])
+            _element(item, "content", html.get(entry["path"], ""), type="html")
+
+        body: bytes = ET.tostring(feed, encoding="utf-8", xml_declaration=False)
+        return b'<?xml version="1.0" encoding="utf-8"?>\n' + body
+
+    def _write(self, name: str, content: bytes) -> None:
+        """Atomically write a file and, for feeds, its gzip variant."""
+        target = self.output_dir / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        variants = [(target, content)]
+        if name != MANIFEST_NAME:
+            # mtime=0 keeps the compressed bytes stable across builds
+            variants.append(
+                (
+                    target.with_name(f"{target.name}.gz"),
+                    gzip.compress(content, 9, mtime=0),
+                )
+            )
+
+        for path, data in variants:
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+
+    def _load_manifest(self) -> dict[str, Any]:
+        """Load the manifest written by the previous run."""
+        manifest_path = self.output_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return {}
+        try:
+            with manifest_path.open() as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable feed manifest: {e}")
+            return {}
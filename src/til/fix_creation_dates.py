@@ -8,11 +8,13 @@ dates from git history and updates the database.
 
 import logging
 import pathlib
-import sqlite3
 import sys
 from datetime import datetime
 from typing import Optional
 
+from .connections import connect
+from .database import TILDatabase
+from .feed_generator import FeedGenerator
 from .repository import GitRepository
 
 
@@ -24,6 +26,7 @@ def fix_creation_dates(
     db_path: pathlib.Path,
     repo_path: Optional[pathlib.Path] = None,
     dry_run: bool = False,
+    feeds_dir: Optional[pathlib.Path] = None,
 ) -> None:
     """Fix creation dates by re-extracting from git history.
 
@@ -31,6 +34,7 @@ def fix_creation_dates(
         db_path: Path to SQLite database
         repo_path: Path to git repository (defaults to current directory)
         dry_run: If True, show what changes would be made without applying them
+        feeds_dir: Directory of the Atom feeds to regenerate after updating
 
     """
     if repo_path is None:
@@ -54,7 +58,7 @@ def fix_creation_dates(
     logger.info(f"Found git history for {len(all_times)} files")
 
     # Connect to database
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     cursor = conn.cursor()
 
     try:
@@ -210,6 +214,13 @@ def fix_creation_dates(
 
                 conn.commit()
                 logger.info(f"Successfully updated {len(updates)} entries")
+
+                # Creation dates feed the materialised recent/latest tables
+                # and the published feeds
+                database = TILDatabase(db_path)
+                database.refresh_aggregates()
+                if feeds_dir is not None:
+                    FeedGenerator(database, feeds_dir).generate()
         else:
             logger.info("No updates needed")
 
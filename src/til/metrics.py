@@ -0,0 +1,235 @@
+"""Build and render metrics written as an OpenMetrics textfile."""
+
+import bisect
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+
+class MetricFamily(NamedTuple):
+    """Type and help text of a metric."""
+
+    type: str
+    help: str
+
+
+METRICS = {
+    "til_files": MetricFamily("counter", "TIL files seen by the build, by result"),
+    "til_render_latency_seconds": MetricFamily(
+        "histogram", "Time to render one file through the markdown API"
+    ),
+    "til_api_retries": MetricFamily("counter", "Markdown API requests retried"),
+    "til_api_rate_limited": MetricFamily(
+        "counter", "Markdown API requests refused by the rate limit"
+    ),
+    "til_api_backoff_sleeps": MetricFamily(
+        "counter", "Sleeps before retrying a markdown API request, by reason"
+    ),
+    "til_api_backoff_seconds": MetricFamily(
+        "counter", "Seconds slept before retrying markdown API requests"
+    ),
+    "til_bytes_written": MetricFamily(
+        "counter", "Bytes of markdown and HTML written to the database"
+    ),
+    "til_fts_rebuild_seconds": MetricFamily(
+        "gauge", "Time taken to rebuild the full-text search index"
+    ),
+    "til_build_duration_seconds": MetricFamily("gauge", "Time taken by the build"),
+    "til_build_success": MetricFamily(
+        "gauge", "Whether the build finished without raising an error"
+    ),
+    "til_build_timestamp_seconds": MetricFamily(
+        "gauge", "Unix time at which the build finished"
+    ),
+}
+
+FILE_RESULTS = ("scanned", "skipped", "rendered", "failed")
+BACKOFF_REASONS = ("rate_limit", "status", "network", "unexpected")
+
+# Upper bounds of the render latency buckets, in seconds
+RENDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Observations counted into cumulative buckets."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        """Initialize Histogram.
+
+        Args:
+            buckets: Sorted upper bounds, without +Inf
+
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Count one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        """Number of observations."""
+        return sum(self.counts)
+
+
+class BuildMetrics:
+    """Counters, gauges and histograms of a build.
+
+    Every metric in METRICS is written, with zero values for anything that
+    did not happen, so alerts can rely on the series existing. Updates are
+    thread-safe, as federated sources are built in worker threads.
+    """
+
+    def __init__(self, render_buckets: tuple[float, ...] = RENDER_BUCKETS):
+        """Initialize BuildMetrics.
+
+        Args:
+            render_buckets: Upper bounds of the render latency buckets
+
+        """
+        self._lock = threading.Lock()
+        self.values: dict[str, dict[Labels, float]] = {
+            name: {(): 0}
+            for name, family in METRICS.items()
+            if family.type != "histogram"
+        }
+        self.values["til_files"] = {(("result", result),): 0 for result in FILE_RESULTS}
+        self.values["til_api_backoff_sleeps"] = {
+            (("reason", reason),): 0 for reason in BACKOFF_REASONS
+        }
+        self.histograms = {"til_render_latency_seconds": Histogram(render_buckets)}
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increase a counter.
+
+        Args:
+            name: Metric name from METRICS
+            amount: Amount to add
+            **labels: Label values of the series
+
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.values[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge.
+
+        Args:
+            name: Metric name from METRICS
+            value: New value
+            **labels: Label values of the series
+
+        """
+        with self._lock:
+            self.values[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Add an observation to a histogram.
+
+        Args:
+            name: Metric name from METRICS
+            value: Observed value
+
+        """
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Set a gauge to the seconds taken by a block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.set(name, time.perf_counter() - started)
+
+    def record_build(self, seconds: float, succeeded: bool) -> None:
+        """Record the outcome of a build.
+
+        Args:
+            seconds: Duration of the build
+            succeeded: Whether it finished without an error
+
+        """
+        self.set("til_build_duration_seconds", seconds)
+        self.set("til_build_success", 1 if succeeded else 0)
+        self.set("til_build_timestamp_seconds", time.time())
+
+    def render(self) -> str:
+        """Metrics in the OpenMetrics text format.
+
+        Returns:
+            The exposition, ending with # EOF
+
+        """
+        lines = []
+        with self._lock:
+            for name, family in METRICS.items():
+                lines.append(f"# TYPE {name} {family.type}")
+                lines.append(f"# HELP {name} {family.help}")
+                if family.type == "histogram":
+                    lines.extend(_histogram_samples(name, self.histograms[name]))
+                    continue
+                suffix = "_total" if family.type == "counter" else ""
+                for labels, value in sorted(self.values[name].items()):
+                    lines.append(
+                        f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+                    )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write the metrics, replacing the file in a single rename.
+
+        A textfile collector scraping at any moment sees either the
+        previous build's metrics or this one's, never a partial file.
+
+        Args:
+            path: Metrics file, usually ending in .prom
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(self.render())
+        tmp_path.replace(path)
+
+
+def _histogram_samples(name: str, histogram: Histogram) -> list[str]:
+    """Bucket, count and sum samples of a histogram."""
+    samples = []
+    cumulative = 0
+    bounds = [*(repr(float(bound)) for bound in histogram.buckets), "+Inf"]
+    for bound, count in zip(bounds, histogram.counts):
+        cumulative += count
+        samples.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+    samples.append(f"{name}_count {histogram.count}")
+    samples.append(f"{name}_sum {_format_value(histogram.sum)}")
+    return samples
+
+
+def _format_labels(labels: Labels) -> str:
+    """Labels as {name="value",...}, or nothing without labels."""
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Sample value, without a fraction when it is a whole number."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,311 @@
+"""Local stand-in for the GitHub markdown API, for load and fault testing."""
+
+import html
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, cast, Optional
+
+from .exceptions import ConfigurationError
+
+
+try:
+    import markdown as markdown_lib
+except ImportError:  # pragma: no cover - exercised only without markdown
+    markdown_lib = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+RENDER_MODES = ("escape", "markdown")
+
+# Bodies GitHub sends with 403s, which the renderer tells apart by "rate limit"
+RATE_LIMIT_MESSAGE = "API rate limit exceeded for 127.0.0.1."
+SECONDARY_RATE_LIMIT_MESSAGE = "You have exceeded a secondary rate limit."
+
+
+@dataclass
+class MockAPIConfig:
+    """Latency, rate limit and faults of the stand-in API."""
+
+    # Mean seconds before each response
+    latency: float = 0.0
+    # Shape of the latency: fixed, uniform, exponential or lognormal
+    distribution: str = "fixed"
+    # Half-width of the uniform range, or sigma of the lognormal, in seconds
+    jitter: float = 0.0
+    # Requests allowed per window; None for no limit
+    rate_limit: Optional[int] = None
+    # Seconds after which the rate limit budget is restored
+    rate_limit_window: float = 3600.0
+    # Fraction of requests answered with error_status
+    error_rate: float = 0.0
+    error_status: int = 502
+    # Fraction of requests refused with a secondary rate limit 403
+    forbidden_rate: float = 0.0
+    # escape wraps paragraphs in <p>; markdown renders with Python-Markdown
+    render: str = "escape"
+    # Seed for latency and fault injection, so runs can be repeated
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        """Validate the configuration.
+
+        Raises:
+            ConfigurationError: If a setting is out of range
+
+        """
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ConfigurationError(
+                f"Unknown latency distribution: {self.distribution} "
+                f"(expected one of {', '.join(LATENCY_DISTRIBUTIONS)})"
+            )
+        if self.render not in RENDER_MODES:
+            raise ConfigurationError(
+                f"Unknown render mode: {self.render} "
+                f"(expected one of {', '.join(RENDER_MODES)})"
+            )
+        if self.latency < 0 or self.jitter < 0:
+            raise ConfigurationError("latency and jitter cannot be negative")
+        if self.rate_limit is not None and self.rate_limit < 0:
+            raise ConfigurationError("rate_limit cannot be negative")
+        if self.rate_limit_window <= 0:
+            raise ConfigurationError("rate_limit_window must be positive")
+        for name in ("error_rate", "forbidden_rate"):
+            if not 0 <= getattr(self, name) <= 1:
+                raise ConfigurationError(f"{name} must be between 0 and 1")
+        if not 500 <= self.error_status <= 599:
+            raise ConfigurationError("error_status must be a 5xx status")
+        if self.render == "markdown" and markdown_lib is None:
+            raise ConfigurationError(
+                "Python-Markdown is required for --render markdown. "
+                "Install it with: uv add markdown"
+            )
+
+
+class MockMarkdownAPI:
+    """HTTP server answering POST /markdown like GitHub's markdown API.
+
+    Responses carry the x-ratelimit-* headers GitHub sends, requests over
+    the rate limit get the same 403 as the real API, and a seeded random
+    source delays responses and injects 403s and 5xx errors, so the
+    renderer's retries and backoff can be exercised offline. Each request
+    is handled in its own thread, so concurrent clients see the latency
+    overlap as they would against the real API.
+    """
+
+    def __init__(
+        self,
+        config: Optional[MockAPIConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """Initialize MockMarkdownAPI and bind its socket.
+
+        Args:
+            config: Latency, rate limit and faults (default: none of them)
+            host: Address to listen on
+            port: Port to listen on (default: any free port)
+
+        """
+        self.config = config or MockAPIConfig()
+        self.stats: Counter[int] = Counter()
+        self._rng = random.Random(self.config.seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._used = 0
+        self._thread: Optional[threading.Thread] = None
+        self.server = _Server((host, port), _Handler)
+        self.server.api = self
+
+    @property
+    def url(self) -> str:
+        """Endpoint to set as markdown_api_url."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host!s}:{port}/markdown"
+
+    def start(self) -> "MockMarkdownAPI":
+        """Serve requests from a background thread.
+
+        Returns:
+            The server, so it can be started and used in one expression
+
+        """
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="til-mock-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+
+    def __enter__(self) -> "MockMarkdownAPI":
+        """Start serving in the background."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop serving."""
+        self.stop()
+
+    def sample_latency(self) -> float:
+        """Seconds to delay the next response by."""
+        config = self.config
+        with self._lock:
+            if config.distribution == "uniform":
+                low = max(config.latency - config.jitter, 0.0)
+                return self._rng.uniform(low, config.latency + config.jitter)
+            if config.distribution == "exponential":
+                return (
+                    self._rng.expovariate(1 / config.latency) if config.latency else 0.0
+                )
+            if config.distribution == "lognormal" and config.latency:
+                # Parameters giving a mean of latency with a sigma of jitter
+                sigma = config.jitter
+                mu = math.log(config.latency) - sigma**2 / 2
+                return self._rng.lognormvariate(mu, sigma)
+            return config.latency
+
+    def respond(self, body: bytes) -> tuple[int, dict[str, str], str]:  # noqa: PLR0911
+        """Answer one POST /markdown request, without the latency.
+
+        The rate limit is applied first, as on GitHub, so refused requests
+        still count against the budget's headers but never reach the
+        injected faults.
+
+        Args:
+            body: Request body, JSON with a text field
+
+        Returns:
+            (status, headers, body) of the response
+
+        """
+        config = self.config
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_started >= config.rate_limit_window:
+                self._window_started = now
+                self._used = 0
+            self._used += 1
+            limited = config.rate_limit is not None and self._used > config.rate_limit
+            roll = self._rng.random()
+            reset = int(
+                time.time() + config.rate_limit_window - (now - self._window_started)
+            )
+            headers = {"x-ratelimit-resource": "core", "x-ratelimit-reset": str(reset)}
+            if config.rate_limit is not None:
+                headers.update(
+                    {
+                        "x-ratelimit-limit": str(config.rate_limit),
+                        "x-ratelimit-remaining": str(
+                            max(config.rate_limit - self._used, 0)
+                        ),
+                        "x-ratelimit-used": str(min(self._used, config.rate_limit)),
+                    }
+                )
+
+        if limited:
+            return 403, headers, _error(RATE_LIMIT_MESSAGE)
+        if roll < config.forbidden_rate:
+            headers["retry-after"] = "1"
+            return 403, headers, _error(SECONDARY_RATE_LIMIT_MESSAGE)
+        if roll < config.forbidden_rate + config.error_rate:
+            return config.error_status, headers, _error("Server Error")
+
+        try:
+            text = json.loads(body)["text"]
+        except (ValueError, TypeError):
+            return 400, headers, _error("Problems parsing JSON")
+        except KeyError:
+            return 422, headers, _error("Invalid request. text wasn't supplied.")
+        if not isinstance(text, str):
+            return 422, headers, _error("Invalid request. text is not a string.")
+
+        headers["content-type"] = "text/html;charset=utf-8"
+        return 200, headers, self.render(text)
+
+    def render(self, text: str) -> str:
+        """Markdown as HTML, in the configured render mode.
+
+        Args:
+            text: Markdown source
+
+        Returns:
+            HTML for the text
+
+        """
+        if self.config.render == "markdown":
+            return cast(str, markdown_lib.markdown(text, extensions=["fenced_code"]))
+        return "\n".join(
+            f"<p>{html.escape(block)}</p>" for block in text.split("\n\n") if block
+        )
+
+    def record(self, status: int) -> None:
+        """Count a response sent with status."""
+        with self._lock:
+            self.stats[status] += 1
+
+
+def _error(message: str) -> str:
+    """JSON error body in GitHub's format."""
+    return json.dumps(
+        {"message": message, "documentation_url": "https://docs.github.com/rest"}
+    )
+
+
+class _Server(ThreadingHTTPServer):
+    """Threaded HTTP server holding the API it serves."""
+
+    daemon_threads = True
+    api: MockMarkdownAPI
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the server's MockMarkdownAPI."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        """Answer POST /markdown."""
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length)
+        if self.path.split("?")[0] != "/markdown":
+            self._send(404, {}, _error("Not Found"))
+            return
+        api = cast(_Server, self.server).api
+        delay = api.sample_latency()
+        if delay:
+            time.sleep(delay)
+        self._send(*api.respond(body))
+
+    def do_GET(self) -> None:
+        """Refuse anything but POST."""
+        self._send(405, {"allow": "POST"}, _error("Method Not Allowed"))
+
+    def _send(self, status: int, headers: dict[str, str], body: str) -> None:
+        """Write a response and count it."""
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        headers.setdefault("content-type", "application/json;charset=utf-8")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        cast(_Server, self.server).api.record(status)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests at debug level instead of writing to stderr."""
+        logger.debug(f"{self.address_string()} {format % args}")
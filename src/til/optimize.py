@@ -0,0 +1,207 @@
+"""Optimize a built database for publishing as an immutable file."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from .connections import connect
+from .exceptions import ConfigurationError, DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+# Page sizes SQLite supports above its 4096 byte default
+PAGE_SIZES = (4096, 8192, 16384, 32768, 65536)
+
+# Bytes of a table b-tree leaf page unavailable to a row's inline payload
+PAGE_OVERHEAD = 35
+
+# Share of TIL rows that should fit on a single page without overflow
+INLINE_PERCENTILE = 0.9
+
+
+class OptimizeResult(NamedTuple):
+    """Outcome of optimizing a database."""
+
+    page_size: int
+    size_before: int
+    size_after: int
+
+
+def choose_page_size(conn: sqlite3.Connection) -> int:
+    """Smallest page size that keeps most TIL rows off overflow pages.
+
+    Rows larger than a page spill into chains of overflow pages, which
+    turns every entry read into several page reads. Entries carry their
+    body and rendered HTML, so the page size is sized to the 90th
+    percentile row.
+
+    Args:
+        conn: Connection to the database
+
+    Returns:
+        Page size in bytes
+
+    """
+    tables = {row[0] for row in conn.execute("select name from sqlite_master")}
+    if "til" not in tables:
+        return PAGE_SIZES[0]
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(til)")]
+    payload = " + ".join(
+        f"coalesce(length(cast([{column}] as blob)), 0)" for column in columns
+    )
+    sizes = sorted(
+        row[0]
+        for row in conn.execute(f"select {payload} from til")  # noqa: S608
+    )
+    if not sizes:
+        return PAGE_SIZES[0]
+    target = sizes[min(len(sizes) - 1, int(len(sizes) * INLINE_PERCENTILE))]
+    for page_size in PAGE_SIZES:
+        if target <= page_size - PAGE_OVERHEAD:
+            return page_size
+    return PAGE_SIZES[-1]
+
+
+def fts_tables(conn: sqlite3.Connection) -> list[str]:
+    """Names of the full-text search virtual tables in a database."""
+    return [
+        row[0]
+        for row in conn.execute(
+            "select name from sqlite_master where type = 'table' "
+            "and sql like 'create virtual table%using fts%'"
+        )
+    ]
+
+
+def optimize_database(db_path: Path, page_size: Optional[int] = None) -> OptimizeResult:
+    """Compact and analyze a database so it can be served immutably.
+
+    Merges each full-text index into a single segment, rewrites the file
+    with VACUUM at the chosen page size in rollback journal mode, then
+    stores planner statistics with ANALYZE and PRAGMA optimize.
+
+    Args:
+        db_path: Path to SQLite database file
+        page_size: Page size in bytes, or None to choose from row sizes
+
+    Returns:
+        OptimizeResult with the page size and file sizes
+
+    Raises:
+        ConfigurationError: If the page size is not supported
+        DatabaseError: If the database cannot be optimized
+
+    """
+    if page_size is not None and page_size not in (512, 1024, 2048, *PAGE_SIZES):
+        raise ConfigurationError(
+            f"page_size must be a power of two from 512 to 65536: {page_size}"
+        )
+    if not db_path.exists():
+        raise DatabaseError(f"Database not found: {db_path}")
+
+    size_before = db_path.stat().st_size
+    conn = connect(db_path, isolation_level=None)
+    try:
+        chosen = page_size or choose_page_size(conn)
+
+        # The page size cannot change in WAL mode, and an immutable file
+        # must not depend on a separate journal
+        conn.execute("PRAGMA journal_mode=DELETE")
+        for table in fts_tables(conn):
+            logger.info(f"Merging full-text index {table}")
+            conn.execute(
+                f"insert into [{table}] ([{table}]) values ('optimize')"  # noqa: S608
+            )
+
+        conn.execute(f"PRAGMA page_size={chosen}")
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+    except Exception as e:
+        raise DatabaseError(f"Failed to optimize {db_path}: {e}")
+    finally:
+        conn.close()
+
+    result = OptimizeResult(chosen, size_before, db_path.stat().st_size)
+    logger.info(
+        f"Optimized {db_path}: {result.size_before} -> {result.size_after} bytes "
+        f"with {result.page_size} byte pages"
+    )
+    return result
+
+
+def inspect_data(db_path: Path) -> dict[str, Any]:
+    """Build the data Datasette reads from --inspect-file.
+
+    Datasette trusts these table counts and hash for immutable databases
+    instead of counting rows and hashing the file at startup.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        Inspect data keyed by database name
+
+    Raises:
+        DatabaseError: If the database cannot be read
+
+    """
+    try:
+        digest = hashlib.sha256()
+        with db_path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?immutable=1", uri=True)
+        try:
+            names = [
+                row[0]
+                for row in conn.execute(
+                    "select name from sqlite_master where type = 'table' order by name"
+                )
+            ]
+            tables = {
+                name: {
+                    "count": conn.execute(
+                        f"select count(*) from [{name}]"  # noqa: S608
+                    ).fetchone()[0]
+                }
+                for name in names
+            }
+        finally:
+            conn.close()
+    except Exception as e:
+        raise DatabaseError(f"Failed to inspect {db_path}: {e}")
+
+    return {
+        db_path.stem: {
+            "hash": digest.hexdigest(),
+            "size": db_path.stat().st_size,
+            "file": db_path.name,
+            "tables": tables,
+        }
+    }
+
+
+def write_inspect_file(db_path: Path, inspect_path: Path) -> dict[str, Any]:
+    """Write Datasette inspect data for a database.
+
+    Args:
+        db_path: Path to SQLite database file
+        inspect_path: File to write the JSON to
+
+    Returns:
+        The inspect data written
+
+    Raises:
+        DatabaseError: If the database cannot be read
+
+    """
+    data = inspect_data(db_path)
+    inspect_path.write_text(json.dumps(data, indent=2))
+    logger.info(f"Wrote inspect data for {db_path} to {inspect_path}")
+    return data
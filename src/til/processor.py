@@ -1,28 +1,69 @@
 """TIL processor orchestrating the entire pipeline."""
 
+import contextlib
 import datetime
 import logging
 import pathlib
-from typing import Any, Optional
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional
 
-from .config import TILConfig
+from . import tracing
+from .config import SourceConfig, TILConfig
 from .database import TILDatabase
-from .exceptions import ConfigurationError, FileProcessingError, RepositoryError
+from .exceptions import (
+    ConfigurationError,
+    DatabaseError,
+    FileProcessingError,
+    RepositoryError,
+)
+from .federation import (
+    build_timestamps,
+    source_files,
+    source_history,
+    source_watermark,
+    SourceBuild,
+)
+from .feed_generator import FeedGenerator
+from .metrics import BuildMetrics
+from .profiling import BuildProfiler, Span
+from .related import RelatedTILs
 from .renderer import MarkdownRenderer
 from .repository import GitRepository
+from .shadow_build import ShadowBuild
+from .sharding import parse_shard
+from .watcher import ContentWatcher, DEFAULT_DEBOUNCE
 
 
 logger = logging.getLogger(__name__)
 
 
+class UpdateSummary(NamedTuple):
+    """Outcome of applying changed files to the database."""
+
+    updated: int
+    deleted: int
+    errors: int
+
+
 class TILProcessor:
     """Orchestrate the TIL processing pipeline."""
 
-    def __init__(self, config: TILConfig):
+    def __init__(
+        self,
+        config: TILConfig,
+        profiler: Optional[BuildProfiler] = None,
+        metrics: Optional[BuildMetrics] = None,
+    ):
         """Initialize TILProcessor with configuration.
 
         Args:
             config: TIL configuration
+            profiler: Records the time spent in each build stage (default:
+                no profiling)
+            metrics: Counts files, renders, API retries and bytes written
+                (default: no metrics)
 
         Raises:
             ConfigurationError: If configuration is invalid
@@ -32,6 +73,9 @@ class TILProcessor:
             raise ConfigurationError(f"Root path does not exist: {config.root_path}")
 
         self.config = config
+        self.profiler = profiler
+        self.metrics = metrics
+        self.shard = parse_shard(config.shard) if config.shard else None
 
         # Initialize components
         self.repository: Optional[GitRepository]
@@ -44,14 +88,42 @@ class TILProcessor:
             logger.error(f"Unexpected error initializing git repository: {e}")
             self.repository = None
 
-        self.renderer = MarkdownRenderer(config)
-        self.database = TILDatabase(config.database_path)
+        self.renderer = MarkdownRenderer(config, metrics=metrics)
+        self.database = TILDatabase(
+            config.database_path, compression=config.storage_compression
+        )
+
+    @contextlib.contextmanager
+    def _stage(self, name: str, path: Optional[str] = None) -> Iterator[Span]:
+        """Time a build stage when profiling, and trace it when tracing."""
+        args = {"path": path} if path else {}
+        with tracing.span(name, "stage", **args):
+            if self.profiler is None:
+                yield Span()
+            else:
+                with self.profiler.stage(name, path) as span:
+                    yield span
+
+    def _count(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increase a metrics counter when collecting metrics."""
+        if self.metrics:
+            self.metrics.inc(name, amount, **labels)
+
+    def _timer(self, name: str) -> contextlib.AbstractContextManager[None]:
+        """Set a metrics gauge to the time taken by a block."""
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.timer(name)
 
-    def process_file(self, filepath: pathlib.Path) -> dict[str, Any]:
+    def process_file(
+        self, filepath: pathlib.Path, source: Optional[SourceConfig] = None
+    ) -> dict[str, Any]:
         """Process a single markdown file.
 
         Args:
             filepath: Path to markdown file
+            source: Federated source the file belongs to (default: the
+                configured root_path and github_repo)
 
         Returns:
             Dictionary containing record data
@@ -86,8 +158,9 @@ class TILProcessor:
         except OSError as e:
             raise FileProcessingError(f"Failed to read file {filepath}: {e}")
 
+        root_path = source.root_path if source else self.config.root_path
         try:
-            path = str(filepath.relative_to(self.config.root_path))
+            path = filepath.relative_to(root_path).as_posix()
         except ValueError as e:
             raise FileProcessingError(f"File {filepath} is not under root path: {e}")
 
@@ -101,10 +174,13 @@ class TILProcessor:
             )
 
         topic = path_parts[1]
-        url = f"{self.config.github_url_base}/blob/main/{path}"
+        if source:
+            url = source.file_url(path)
+        else:
+            url = f"{self.config.github_url_base}/blob/main/{path}"
         path_slug = path.replace("/", "_")
 
-        return {
+        record = {
             "path": path_slug,
             "slug": slug,
             "topic": topic,
@@ -112,6 +188,9 @@ class TILProcessor:
             "url": url,
             "body": body,
         }
+        if source:
+            record["source"] = source.name
+        return record
 
     def should_update_html(self, record: dict[str, Any]) -> bool:
         """Check if HTML needs to be updated for a record.
@@ -135,15 +214,40 @@ class TILProcessor:
             logger.warning(f"Error checking previous record: {e}")
             return True
 
+    def _render(self, body: str, key: str) -> Optional[str]:
+        """Render a file's markdown body, timed as the render stage."""
+        started = time.perf_counter()
+        with self._stage("render", key) as span:
+            html = self.renderer.render(body)
+            span.bytes = len(html.encode("utf-8")) if html else 0
+        if self.metrics and html:
+            self.metrics.observe(
+                "til_render_latency_seconds", time.perf_counter() - started
+            )
+            self.metrics.inc("til_files", result="rendered")
+        return html
+
+    def _upsert(self, record: dict[str, Any], key: str) -> None:
+        """Write a record, timed as the upsert stage."""
+        with self._stage("upsert", key) as span:
+            self.database.upsert_record(record)
+            span.bytes = _record_bytes(record)
+        self._count("til_bytes_written", span.bytes)
+
     def process_all_files(self) -> None:
         """Process all markdown files in the repository."""
+        if self.config.sources:
+            self.process_sources()
+            return
+
         logger.info(f"Processing all files from {self.config.root_path}")
 
         # Get git history if available
         all_times = {}
         if self.repository:
             try:
-                all_times = self.repository.get_file_history()
+                with self._stage("history"):
+                    all_times = self.repository.get_file_history()
             except Exception as e:
                 logger.warning(
                     f"Failed to get git history, continuing without timestamps: {e}"
@@ -151,54 +255,50 @@ class TILProcessor:
 
         # Find all markdown files
         try:
-            markdown_files = list(self.config.root_path.glob("content/*/*.md"))
+            with self._stage("discover"):
+                markdown_files = list(self.config.root_path.glob("content/*/*.md"))
         except Exception as e:
             raise FileProcessingError(f"Failed to find markdown files: {e}")
 
         logger.info(f"Found {len(markdown_files)} markdown files")
 
+        if self.shard:
+            shard = self.shard
+            markdown_files = [
+                filepath
+                for filepath in markdown_files
+                if shard.includes(
+                    str(filepath.relative_to(self.config.root_path)).replace("/", "_")
+                )
+            ]
+            logger.info(f"Building {len(markdown_files)} files in shard {shard}")
+        self._count("til_files", len(markdown_files), result="scanned")
+
         processed_count = 0
         error_count = 0
 
         for filepath in markdown_files:
             logger.info(f"Processing {filepath}")
-
-            try:
-                record = self.process_file(filepath)
-            except FileProcessingError as e:
-                logger.error(f"Failed to process {filepath}: {e}")
-                error_count += 1
-                continue
-
-            if not record:
-                error_count += 1
-                continue
-
             path = str(filepath.relative_to(self.config.root_path))
-
-            # Check if HTML needs updating
-            if self.should_update_html(record):
+            key = path.replace("/", "_")
+            with tracing.span(key, "file"):
                 try:
-                    html = self.renderer.render(record["body"])
-                    if html:
-                        record["html"] = html
-                    else:
-                        logger.error(f"Empty HTML returned for {path}, skipping")
-                        error_count += 1
-                        continue
-                except Exception as e:
-                    logger.error(f"Failed to render HTML for {path}: {e}")
+                    with self._stage("read", key) as span:
+                        record = self.process_file(filepath)
+                        span.bytes = len(record["body"].encode("utf-8"))
+                except FileProcessingError as e:
+                    logger.error(f"Failed to process {filepath}: {e}")
                     error_count += 1
                     continue
-            else:
-                # Get existing HTML from database
-                previous_record = self.database.get_previous_record(record["path"])
-                if previous_record and previous_record.get("html"):
-                    record["html"] = previous_record["html"]
-                else:
-                    logger.warning(f"No existing HTML found for {path}, rendering new")
+
+                if not record:
+                    error_count += 1
+                    continue
+
+                # Check if HTML needs updating
+                if self.should_update_html(record):
                     try:
-                        html = self.renderer.render(record["body"])
+                        html = self._render(record["body"], key)
                         if html:
                             record["html"] = html
                         else:
@@ -209,57 +309,726 @@ class TILProcessor:
                         logger.error(f"Failed to render HTML for {path}: {e}")
                         error_count += 1
                         continue
+                else:
+                    # Get existing HTML from database
+                    previous_record = self.database.get_previous_record(record["path"])
+                    if previous_record and previous_record.get("html"):
+                        record["html"] = previous_record["html"]
+                        self._count("til_files", result="skipped")
+                    else:
+                        logger.warning(
+                            f"No existing HTML found for {path}, rendering new"
+                        )
+                        try:
+                            html = self._render(record["body"], key)
+                            if html:
+                                record["html"] = html
+                            else:
+                                logger.error(
+                                    f"Empty HTML returned for {path}, skipping"
+                                )
+                                error_count += 1
+                                continue
+                        except Exception as e:
+                            logger.error(f"Failed to render HTML for {path}: {e}")
+                            error_count += 1
+                            continue
 
-            # Add timestamps from git history
-            if path in all_times:
-                record.update(all_times[path])
-            else:
-                logger.info(f"No git history found for {path}, using current time")
-                # Add current time as fallback
-                now = datetime.datetime.now()
-                now_utc = now.astimezone(datetime.timezone.utc)
-                record.update(
-                    {
-                        "created": now.isoformat(),
-                        "created_utc": now_utc.isoformat(),
-                        "updated": now.isoformat(),
-                        "updated_utc": now_utc.isoformat(),
-                    }
+                # Add timestamps from git history
+                if path in all_times:
+                    record.update(all_times[path])
+                else:
+                    logger.info(f"No git history found for {path}, using current time")
+                    # Add current time as fallback
+                    now = datetime.datetime.now()
+                    now_utc = now.astimezone(datetime.timezone.utc)
+                    record.update(
+                        {
+                            "created": now.isoformat(),
+                            "created_utc": now_utc.isoformat(),
+                            "updated": now.isoformat(),
+                            "updated_utc": now_utc.isoformat(),
+                        }
+                    )
+
+                # Update database
+                try:
+                    self._upsert(record, key)
+                    processed_count += 1
+                except Exception as e:
+                    logger.error(f"Failed to save record for {path}: {e}")
+                    error_count += 1
+                    continue
+
+        if self.shard:
+            self._finish_shard()
+        else:
+            self.refresh_derived()
+        self._count("til_files", error_count, result="failed")
+
+        logger.info(
+            f"Database build complete. Processed: {processed_count}, Errors: {error_count}"
+        )
+
+        if error_count > 0 and processed_count == 0:
+            raise FileProcessingError("No files were successfully processed")
+
+    def process_sources(self) -> None:
+        """Build every configured source into the database.
+
+        Sources are collected concurrently: reading files and history and
+        rendering changed entries happen in worker threads, and the main
+        thread writes the results. A source whose watermark matches the
+        previous build is skipped and keeps its entries.
+
+        When two sources hold the same topic and slug, the source listed
+        first in the configuration keeps the entry.
+
+        Raises:
+            FileProcessingError: If no files could be processed
+
+        """
+        sources = self.config.sources
+        names = [source.name for source in sources]
+        removed = self.database.delete_other_sources(names)
+        if removed:
+            logger.info(f"Removed {removed} entries from sources no longer configured")
+
+        watermarks = self.database.get_source_watermarks()
+        previous = self.database.get_records(
+            ["source", "body", "html", "created", "created_utc"]
+        )
+
+        workers = min(self.config.source_workers, len(sources))
+        logger.info(f"Collecting {len(sources)} sources with {workers} workers")
+
+        def collect(source: SourceConfig) -> SourceBuild:
+            with tracing.span(source.name, "source"):
+                return self._collect_source(
+                    source, watermarks.get(source.name), previous
                 )
 
-            # Update database
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="til-source"
+        ) as pool:
+            builds = list(pool.map(collect, sources))
+
+        priority = {name: index for index, name in enumerate(names)}
+        owners = {path: record.get("source") for path, record in previous.items()}
+        processed_count = 0
+        error_count = 0
+        for build in builds:
+            error_count += build.errors
+            if build.skipped or build.failed:
+                continue
+
+            written = set()
+            for record in build.records:
+                owner = owners.get(record["path"])
+                if owner in priority and priority[owner] < priority[build.name]:
+                    logger.warning(
+                        f"Skipping {record['path']} from source {build.name}, "
+                        f"already provided by {owner}"
+                    )
+                    continue
+                try:
+                    self._upsert(record, f"{build.name}:{record['path']}")
+                except Exception as e:
+                    logger.error(f"Failed to save record for {record['path']}: {e}")
+                    error_count += 1
+                    continue
+                owners[record["path"]] = build.name
+                written.add(record["path"])
+
+            stale = sorted(
+                path
+                for path, owner in owners.items()
+                if owner == build.name and path not in written
+            )
+            self.database.delete_records(stale)
+            for path in stale:
+                del owners[path]
+
+            # A source with failures is collected again next build
+            self.database.record_source(
+                build.name,
+                build.watermark if build.errors == 0 else None,
+                len(written),
+            )
+            processed_count += len(written)
+            logger.info(
+                f"Built {len(written)} entries from source {build.name}"
+                + (f", removed {len(stale)}" if stale else "")
+            )
+
+        self.refresh_derived()
+        self._count("til_files", error_count, result="failed")
+
+        logger.info(
+            f"Federated build complete. Processed: {processed_count}, "
+            f"Errors: {error_count}"
+        )
+
+        if error_count > 0 and processed_count == 0:
+            raise FileProcessingError("No files were successfully processed")
+
+    def _collect_source(
+        self,
+        source: SourceConfig,
+        watermark: Optional[str],
+        previous: dict[str, dict[str, Any]],
+    ) -> SourceBuild:
+        """Read and render a source's entries in a worker thread.
+
+        Only reads the database state passed in, so it is safe to run
+        alongside other sources.
+
+        Args:
+            source: Source to collect
+            watermark: Watermark stored by the previous build
+            previous: Previous entries keyed by path
+
+        Returns:
+            SourceBuild with the source's records
+
+        """
+        try:
+            with self._stage("discover"):
+                files = source_files(source)
+                current = source_watermark(source, files)
+            self._count("til_files", len(files), result="scanned")
+            if current == watermark:
+                logger.info(f"Source {source.name} is unchanged, skipping")
+                self._count("til_files", len(files), result="skipped")
+                return SourceBuild(source.name, current, [], 0, skipped=True)
+            with self._stage("history"):
+                history = source_history(source, files)
+        except Exception as e:
+            logger.error(f"Failed to read source {source.name}: {e}")
+            return SourceBuild(source.name, None, [], 1, failed=True)
+
+        logger.info(f"Collecting {len(files)} files from source {source.name}")
+        records = []
+        errors = 0
+        for filepath in files:
+            relative = filepath.relative_to(source.root_path).as_posix()
+            key = f"{source.name}:{relative.replace('/', '_')}"
+            with tracing.span(key, "file"):
+                try:
+                    with self._stage("read", key) as span:
+                        record = self.process_file(filepath, source)
+                        span.bytes = len(record["body"].encode("utf-8"))
+                except FileProcessingError as e:
+                    logger.error(f"Failed to process {filepath}: {e}")
+                    errors += 1
+                    continue
+
+                prior = previous.get(record["path"], {})
+                if prior.get("html") and prior.get("body") == record["body"]:
+                    record["html"] = prior["html"]
+                    self._count("til_files", result="skipped")
+                else:
+                    try:
+                        html = self._render(record["body"], key)
+                    except Exception as e:
+                        logger.error(f"Failed to render HTML for {filepath}: {e}")
+                        errors += 1
+                        continue
+                    if not html:
+                        logger.error(f"Empty HTML returned for {filepath}, skipping")
+                        errors += 1
+                        continue
+                    record["html"] = html
+
+                record.update(history.get(relative) or build_timestamps())
+                # Without git history an entry keeps the creation time it was
+                # first built with
+                if (
+                    source.history != "git"
+                    and prior.get("created_utc")
+                    and prior["created_utc"] < record["created_utc"]
+                ):
+                    record["created"] = prior["created"]
+                    record["created_utc"] = prior["created_utc"]
+                records.append(record)
+
+        return SourceBuild(source.name, current, records, errors)
+
+    def update_files(self, paths: Iterable[pathlib.Path]) -> UpdateSummary:
+        """Apply changed files to the database without a full build.
+
+        Changed and new files are processed and upserted, and entries of
+        deleted files are removed. Only entries whose body changed are
+        rendered again. Full-text search follows through its triggers, and
+        aggregates and related entries are refreshed before a new build ID
+        is stamped so caches serve the new pages.
+
+        Edited entries keep their creation time and are marked updated now;
+        the next full build takes both from history again.
+
+        Args:
+            paths: Changed TIL files, existing or deleted
+
+        Returns:
+            UpdateSummary of the changes applied
+
+        """
+        updated = 0
+        deleted: list[str] = []
+        errors = 0
+        for filepath in sorted(set(paths)):
+            source = self._source_for(filepath)
+            root_path = source.root_path if source else self.config.root_path
+            try:
+                relative = filepath.relative_to(root_path).as_posix()
+            except ValueError:
+                logger.warning(f"Ignoring {filepath}, not under {root_path}")
+                continue
+
+            if not filepath.exists():
+                deleted.append(relative.replace("/", "_"))
+                continue
+
             try:
+                record = self.process_file(filepath, source)
+                previous = self.database.get_previous_record(record["path"])
+                if previous and all(
+                    previous.get(key) == value for key, value in record.items()
+                ):
+                    # Saved without changes
+                    continue
+                if (
+                    previous
+                    and previous.get("html")
+                    and (previous.get("body") == record["body"])
+                ):
+                    record["html"] = previous["html"]
+                else:
+                    html = self.renderer.render(record["body"])
+                    if not html:
+                        raise FileProcessingError(f"Empty HTML returned for {relative}")
+                    record["html"] = html
+
+                now = build_timestamps()
+                record.update(now)
+                if previous and previous.get("created_utc"):
+                    record["created"] = previous.get("created")
+                    record["created_utc"] = previous["created_utc"]
                 self.database.upsert_record(record)
-                processed_count += 1
+                updated += 1
+                logger.info(f"Updated {relative}")
             except Exception as e:
-                logger.error(f"Failed to save record for {path}: {e}")
-                error_count += 1
-                continue
+                logger.error(f"Failed to update {filepath}: {e}")
+                errors += 1
+
+        if deleted:
+            existing = self.database.get_records([])
+            deleted = [path for path in deleted if path in existing]
+            self.database.delete_records(deleted)
+            for path in deleted:
+                logger.info(f"Removed {path}")
 
-        # Enable full-text search
+        if updated or deleted:
+            self._refresh_after_update()
+        return UpdateSummary(updated, len(deleted), errors)
+
+    def watch(
+        self,
+        watcher: ContentWatcher,
+        debounce: float = DEFAULT_DEBOUNCE,
+        on_update: Optional[Callable[[UpdateSummary, float], None]] = None,
+        idle_timeout: Optional[float] = None,
+    ) -> None:
+        """Apply changes reported by a watcher until interrupted.
+
+        The database is written in WAL mode so a running server keeps
+        reading it between updates, and is checkpointed back into a single
+        file when watching stops.
+
+        Args:
+            watcher: Watcher over the content roots
+            debounce: Quiet period in seconds that ends a burst of changes
+            on_update: Called with each UpdateSummary and the seconds taken
+            idle_timeout: Stop after this many seconds without changes
+                (default: watch until interrupted)
+
+        """
+        self.database.close()
+        self.database = TILDatabase(
+            self.config.database_path,
+            compression=self.config.storage_compression,
+            profile="build",
+        )
         try:
+            while True:
+                changes = watcher.wait(debounce, timeout=idle_timeout)
+                if not changes:
+                    return
+                started = time.perf_counter()
+                summary = self.update_files(changes)
+                if on_update:
+                    on_update(summary, time.perf_counter() - started)
+        finally:
+            try:
+                self.database.checkpoint()
+            except Exception as e:
+                logger.warning(f"Database left in WAL mode: {e}")
+
+    def _source_for(self, filepath: pathlib.Path) -> Optional[SourceConfig]:
+        """Federated source whose root holds a file, if sources are configured."""
+        for source in self.config.sources:
+            if filepath.is_relative_to(source.root_path):
+                return source
+        return None
+
+    def _refresh_after_update(self) -> None:
+        """Refresh derived tables after a few entries changed.
+
+        Unlike refresh_derived() this leaves the database in WAL mode, so a
+        running server can keep reading while it is updated.
+        """
+        table = self.database.get_table()
+        if (
+            self.database.compression
+            or "til_fts" not in self.database.db.table_names()
+            or table.detect_fts() is None
+        ):
+            # Compressed bodies are indexed without triggers
             self.database.enable_search()
+        for step in (
+            self.database.refresh_aggregates,
+            self.refresh_related,
+            self.database.stamp_build,
+        ):
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Failed to refresh after update: {e}")
+
+    def refresh_derived(self) -> None:
+        """Rebuild search, aggregates and related entries.
+
+        Each step is logged and skipped on failure so one broken table
+        does not fail the whole build.
+        """
+        try:
+            with self._stage("search"), self._timer("til_fts_rebuild_seconds"):
+                self.database.enable_search()
         except Exception as e:
             logger.error(f"Failed to enable full-text search: {e}")
 
-        logger.info(
-            f"Database build complete. Processed: {processed_count}, Errors: {error_count}"
-        )
+        # Refresh indexes and aggregates read by the templates
+        try:
+            with self._stage("aggregates"):
+                self.database.create_indexes()
+                self.database.refresh_aggregates()
+        except Exception as e:
+            logger.error(f"Failed to refresh aggregate tables: {e}")
 
-        if error_count > 0 and processed_count == 0:
-            raise FileProcessingError("No files were successfully processed")
+        try:
+            with self._stage("related"):
+                self.refresh_related()
+        except Exception as e:
+            logger.error(f"Failed to refresh related TILs: {e}")
+
+        # New build ID invalidates HTTP caches keyed on the previous one
+        try:
+            with self._stage("stamp"):
+                self.database.stamp_build()
+        except Exception as e:
+            logger.error(f"Failed to stamp build: {e}")
+
+        try:
+            with self._stage("checkpoint"):
+                self.database.checkpoint()
+        except Exception as e:
+            logger.error(f"Failed to checkpoint database: {e}")
+
+    def _finish_shard(self) -> None:
+        """Keep only this shard's entries and mark the partial database.
+
+        Derived tables need every entry, so they are left to merge-db.
+        """
+        if self.shard is None or "til" not in self.database.db.table_names():
+            return
+        # A database seeded from a full build also holds other shards' entries
+        outside = [
+            row["path"]
+            for row in self.database.get_table().rows_where(select="path")
+            if not self.shard.includes(row["path"])
+        ]
+        self.database.delete_records(outside)
+        self.database.record_shard(self.shard.number, self.shard.total)
+        self.database.checkpoint()
+        logger.info(f"Built shard {self.shard} into {self.database.db_path}")
+
+    def refresh_related(self) -> None:
+        """Recompute related TILs for entries whose content changed.
+
+        The related table is always created so templates can query it; the
+        similarity computation itself is skipped when NumPy is unavailable.
+        """
+        self.database.create_related_tables()
+        try:
+            related = RelatedTILs(self.database)
+        except ConfigurationError as e:
+            logger.warning(f"Skipping related TILs: {e}")
+            return
+        related.refresh()
+
+    def generate_feeds(self) -> None:
+        """Write static Atom feeds for the site and each topic."""
+        FeedGenerator(self.database, self.config.feeds_path).generate()
 
     def build_database(self) -> None:
         """Build complete database from all markdown files.
 
-        This is the main entry point for the processor.
+        This is the main entry point for the processor. With atomic builds
+        enabled the live database is only replaced once the new build has
+        passed validation. A shard build writes its partial database in
+        place; merge-db validates the combined result.
 
         Raises:
             FileProcessingError: If no files could be processed
 
         """
+        started = time.perf_counter()
+        succeeded = False
         try:
-            self.process_all_files()
+            with tracing.span("build", "build"):
+                self._run_build(self.process_all_files, atomic=not self.shard)
+
+            if not self.shard:
+                try:
+                    with self._stage("feeds"):
+                        self.generate_feeds()
+                except Exception as e:
+                    logger.error(f"Failed to generate feeds: {e}")
+            succeeded = True
+        finally:
+            if self.metrics:
+                self.metrics.record_build(time.perf_counter() - started, succeeded)
+
+    def merge_databases(self, parts: list[pathlib.Path]) -> int:
+        """Combine partial databases from shard builds into this database.
+
+        The merged entries replace the database's entries, so entries whose
+        files were deleted disappear. Derived tables and feeds are then
+        rebuilt once for the whole corpus.
+
+        Args:
+            parts: Partial databases written by shard builds
+
+        Returns:
+            Number of entries in the merged database
+
+        Raises:
+            DatabaseError: If the parts cannot be read or do not cover
+                every shard exactly once
+
+        """
+        merged: dict[str, dict[str, Any]] = {}
+
+        def merge() -> None:
+            merged.update(self._merge_parts(parts))
+
+        self._run_build(merge, atomic=True)
+
+        try:
+            self.generate_feeds()
+        except Exception as e:
+            logger.error(f"Failed to generate feeds: {e}")
+        return len(merged)
+
+    def _merge_parts(self, parts: list[pathlib.Path]) -> dict[str, dict[str, Any]]:
+        """Replace this database's entries with those of the parts."""
+        shards: list[tuple[int, int]] = []
+        merged: dict[str, dict[str, Any]] = {}
+        for part in parts:
+            try:
+                database = TILDatabase(part, profile="serve")
+                shard = database.get_shard()
+                rows = (
+                    list(database.get_table().rows)
+                    if "til" in database.db.table_names()
+                    else []
+                )
+                database.close()
+            except Exception as e:
+                raise DatabaseError(f"Failed to read partial database {part}: {e}")
+            if shard:
+                shards.append(shard)
+            for row in rows:
+                previous = merged.get(row["path"])
+                merged[row["path"]] = (
+                    reconcile_records(previous, row) if previous else row
+                )
+            logger.info(f"Read {len(rows)} entries from {part}")
+
+        _check_shard_coverage(shards)
+
+        existing = (
+            {row["path"] for row in self.database.get_table().rows_where(select="path")}
+            if "til" in self.database.db.table_names()
+            else set()
+        )
+        self.database.delete_records(sorted(existing - set(merged)))
+        try:
+            self.database.get_table().insert_all(
+                merged.values(), pk="path", replace=True, alter=True
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to store merged entries: {e}")
+        self.database.clear_shard()
+
+        logger.info(f"Merged {len(merged)} entries from {len(parts)} databases")
+        self.refresh_derived()
+        return merged
+
+    def _run_build(self, build: Callable[[], None], atomic: bool) -> None:
+        """Run a build step against the configured kind of database."""
+        if self.config.in_memory_build:
+            self._build_in_memory(build, atomic=atomic and self.config.atomic_builds)
+        elif atomic and self.config.atomic_builds:
+            self._build_shadow(build)
+        else:
+            self.database.close()
+            self.database = TILDatabase(
+                self.config.database_path,
+                compression=self.config.storage_compression,
+                profile="build",
+            )
+            try:
+                build()
+            except Exception as e:
+                logger.error(f"Database build failed: {e}")
+                raise
+
+    def _build_shadow(self, build: Callable[[], None]) -> None:
+        """Build into a shadow copy and swap it in once validated.
+
+        Raises:
+            DatabaseError: If the shadow cannot be created, validated or
+                swapped in; the live database is left unchanged
+
+        """
+        live = self.database
+        shadow = ShadowBuild(self.config.database_path)
+        try:
+            self.database = TILDatabase(
+                shadow.prepare(),
+                compression=self.config.storage_compression,
+                profile="build",
+            )
+            build()
+            self.database.close()
+            with self._stage("validate"):
+                shadow.validate()
+                shadow.commit()
+        except Exception as e:
+            logger.error(f"Database build failed: {e}")
+            self.database = live
+            shadow.discard()
+            raise
+
+        live.close()
+        self.database = TILDatabase(
+            self.config.database_path, compression=self.config.storage_compression
+        )
+
+    def _build_in_memory(self, build: Callable[[], None], atomic: bool) -> None:
+        """Build in memory and write the result to disk in a single backup.
+
+        With atomic set the result is written to a shadow that is validated
+        and swapped in; otherwise it replaces the database directly.
+
+        Raises:
+            DatabaseError: If the build cannot be written, validated or
+                swapped in; the live database is left unchanged
+
+        """
+        live = self.database
+        shadow = ShadowBuild(self.config.database_path) if atomic else None
+        try:
+            self.database = TILDatabase.in_memory(
+                seed=self.config.database_path,
+                compression=self.config.storage_compression,
+            )
+            build()
+            if shadow:
+                shadow.discard()
+                with self._stage("flush"):
+                    self.database.flush(shadow.path)
+                self.database.close()
+                with self._stage("validate"):
+                    shadow.validate()
+                    shadow.commit()
+            else:
+                with self._stage("flush"):
+                    self.database.flush(self.config.database_path)
+                self.database.close()
         except Exception as e:
             logger.error(f"Database build failed: {e}")
+            self.database = live
+            if shadow:
+                shadow.discard()
             raise
+
+        live.close()
+        self.database = TILDatabase(
+            self.config.database_path, compression=self.config.storage_compression
+        )
+
+
+def _record_bytes(record: dict[str, Any]) -> int:
+    """Bytes of a record's markdown and HTML."""
+    return sum(
+        len(record[field].encode("utf-8"))
+        for field in ("body", "html")
+        if isinstance(record.get(field), str)
+    )
+
+
+def reconcile_records(first: dict[str, Any], second: dict[str, Any]) -> dict[str, Any]:
+    """Combine two builds of the same entry.
+
+    Content comes from the more recently updated record, and the creation
+    time from whichever saw the file first.
+
+    Args:
+        first: Record from one partial database
+        second: Record for the same path from another
+
+    Returns:
+        The reconciled record
+
+    """
+    newer, older = (
+        (second, first)
+        if (second.get("updated_utc") or "") > (first.get("updated_utc") or "")
+        else (first, second)
+    )
+    record = dict(newer)
+    if older.get("created_utc") and (
+        not record.get("created_utc") or older["created_utc"] < record["created_utc"]
+    ):
+        record["created"] = older.get("created")
+        record["created_utc"] = older["created_utc"]
+    return record
+
+
+def _check_shard_coverage(shards: list[tuple[int, int]]) -> None:
+    """Ensure shard parts cover every shard of one split exactly once."""
+    if not shards:
+        return
+    counts = {count for _, count in shards}
+    if len(counts) != 1:
+        raise DatabaseError(
+            f"Partial databases come from different shard counts: {sorted(counts)}"
+        )
+    (count,) = counts
+    indexes = sorted(index for index, _ in shards)
+    if indexes != list(range(1, count + 1)):
+        raise DatabaseError(
+            f"Partial databases cover shards {indexes} but {count} are expected"
+        )
@@ -0,0 +1,189 @@
+"""Wall time, call counts and bytes for each stage of a build."""
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+
+PROFILE_VERSION = 1
+
+
+class Span:
+    """One timed call of a stage, noting the bytes it handled."""
+
+    __slots__ = ("bytes",)
+
+    def __init__(self) -> None:
+        """Initialize Span."""
+        self.bytes = 0
+
+
+@dataclass
+class StageStats:
+    """Totals for a stage, over the whole build or one file."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+
+
+class BuildProfiler:
+    """Collects time spent in each stage of a build, overall and per file.
+
+    Stages are recorded by name, for example history, read, render, upsert
+    or search. Calls that belong to a file are also recorded under the
+    file's path, so the slowest files can be found. Stages may run in
+    worker threads, in which case their times add up to more than the
+    build's wall time.
+    """
+
+    def __init__(self) -> None:
+        """Initialize BuildProfiler."""
+        self.stages: dict[str, StageStats] = {}
+        self.files: dict[str, dict[str, StageStats]] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str, path: Optional[str] = None) -> Iterator[Span]:
+        """Time a block as one call of a stage.
+
+        Args:
+            name: Stage name
+            path: File the call works on, if any
+
+        Yields:
+            Span whose bytes attribute can be set to the bytes handled
+
+        """
+        span = Span()
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            self.record(name, time.perf_counter() - started, span.bytes, path)
+
+    def record(
+        self, name: str, seconds: float, nbytes: int = 0, path: Optional[str] = None
+    ) -> None:
+        """Add one call of a stage.
+
+        Args:
+            name: Stage name
+            seconds: Wall time of the call
+            nbytes: Bytes handled by the call
+            path: File the call worked on, if any
+
+        """
+        with self._lock:
+            totals = [self.stages.setdefault(name, StageStats())]
+            if path is not None:
+                totals.append(
+                    self.files.setdefault(path, {}).setdefault(name, StageStats())
+                )
+            for stats in totals:
+                stats.calls += 1
+                stats.seconds += seconds
+                stats.bytes += nbytes
+
+    def finish(self) -> None:
+        """Stop the build's wall clock."""
+        if self._finished is None:
+            self._finished = time.perf_counter()
+
+    @property
+    def wall_seconds(self) -> float:
+        """Seconds from creation until finish(), or until now."""
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    def slowest_files(self, count: int = 10) -> list[tuple[str, float]]:
+        """Files that took longest over all their stages.
+
+        Args:
+            count: Number of files to return
+
+        Returns:
+            (path, seconds) pairs, slowest first
+
+        """
+        totals = [
+            (path, sum(stats.seconds for stats in stages.values()))
+            for path, stages in self.files.items()
+        ]
+        return sorted(totals, key=lambda item: (-item[1], item[0]))[:count]
+
+    def report(self) -> dict[str, Any]:
+        """Profile as a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with the wall time, totals per stage and totals per
+            stage for each file
+
+        """
+        with self._lock:
+            return {
+                "version": PROFILE_VERSION,
+                "wall_seconds": round(self.wall_seconds, 6),
+                "stages": {
+                    name: _stats_dict(stats) for name, stats in self.stages.items()
+                },
+                "files": {
+                    path: {name: _stats_dict(stats) for name, stats in stages.items()}
+                    for path, stages in sorted(self.files.items())
+                },
+            }
+
+    def write_report(self, path: Path) -> None:
+        """Write the JSON report, replacing any previous one in a single step.
+
+        Args:
+            path: Report file
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.report(), indent=2) + "\n")
+        tmp_path.replace(path)
+
+    def format_table(self, slowest: int = 5) -> str:
+        """Summary of the stages and slowest files as a text table.
+
+        Args:
+            slowest: Number of slowest files to list
+
+        Returns:
+            The table, one row per line
+
+        """
+        wall = self.wall_seconds
+        rows = [f"{'Stage':<16}{'Calls':>8}{'Seconds':>11}{'% wall':>8}{'Bytes':>13}"]
+        for name, stats in sorted(
+            self.stages.items(), key=lambda item: -item[1].seconds
+        ):
+            share = 100 * stats.seconds / wall if wall else 0.0
+            rows.append(
+                f"{name:<16}{stats.calls:>8}{stats.seconds:>11.3f}"
+                f"{share:>7.1f}%{stats.bytes:>13}"
+            )
+        rows.append(f"{'wall':<16}{'':>8}{wall:>11.3f}")
+
+        files = self.slowest_files(slowest)
+        if files:
+            rows.append("")
+            rows.append("Slowest files")
+            rows.extend(f"{seconds:>10.3f}s  {path}" for path, seconds in files)
+        return "\n".join(rows)
+
+
+def _stats_dict(stats: StageStats) -> dict[str, Any]:
+    """Stage totals with the time rounded to microseconds."""
+    data = asdict(stats)
+    data["seconds"] = round(stats.seconds, 6)
+    return data
@@ -0,0 +1,313 @@
+"""Content similarity between TIL entries for related links."""
+
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+from typing import Any
+
+from .database import TILDatabase
+from .exceptions import ConfigurationError, DatabaseError
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger(__name__)
+
+# Number of neighbours stored per entry
+DEFAULT_TOP_K = 5
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9_+#-]+")
+
+STOPWORDS = frozenset(
+    """
+    a about after all also an and any are as at be because been but by can
+    could do does for from has have how if in into is it its just like may
+    more most not of on one only or other our out so some such than that the
+    their them then there these they this to too up use used using was we
+    were what when which while will with would you your
+    """.split()  # noqa: SIM905
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase terms, dropping stopwords.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms in document order
+
+    """
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def content_digest(title: str, body: str) -> str:
+    """Digest of the fields that feed the similarity model."""
+    return hashlib.sha1(f"{title}\0{body}".encode()).hexdigest()  # noqa: S324
+
+
+class RelatedTILs:
+    """Compute and store TF-IDF nearest neighbours for each TIL entry."""
+
+    def __init__(self, database: TILDatabase, top_k: int = DEFAULT_TOP_K):
+        """Initialize RelatedTILs.
+
+        Args:
+            database: TIL database instance
+            top_k: Number of related entries to keep per entry
+
+        Raises:
+            ConfigurationError: If NumPy is not installed
+
+        """
+        if np is None:
+            raise ConfigurationError(
+                "NumPy is required to compute related TILs. "
+                "Install it with: uv add numpy"
+            )
+        self.database = database
+        self.top_k = top_k
+
+    def refresh(self, full: bool = False) -> int:
+        """Recompute neighbours for changed entries and the entries they touch.
+
+        Adding or removing entries changes every term's IDF weight, so it
+        recomputes all entries. When entries were only edited, an entry is
+        recomputed if its title or body changed, if one of its stored
+        neighbours changed, or if a changed entry now scores at least as
+        high as its weakest stored neighbour. Other entries keep scores
+        computed with the previous IDF weights until the next full refresh.
+
+        Args:
+            full: Recompute every entry regardless of what changed
+
+        Returns:
+            Number of entries whose neighbours were recomputed
+
+        Raises:
+            DatabaseError: If related entries cannot be read or stored
+
+        """
+        self.database.create_related_tables()
+        db = self.database.db
+
+        try:
+            documents = [
+                (row["path"], row["title"] or "", row["body"] or "")
+                for row in self.database.get_table().rows_where(
+                    select="path, title, til_decompress(body) as body", order_by="path"
+                )
+            ]
+            stored_digests = {
+                row["path"]: row["digest"] for row in db["til_related_state"].rows
+            }
+            stored_neighbours: dict[str, dict[str, float]] = {}
+            for row in db["til_related"].rows:
+                stored_neighbours.setdefault(row["path"], {})[row["related_path"]] = (
+                    row["score"]
+                )
+        except Exception as e:
+            raise DatabaseError(f"Failed to read entries for related TILs: {e}")
+
+        paths = [path for path, _, _ in documents]
+        index = {path: i for i, path in enumerate(paths)}
+        digests = {path: content_digest(title, body) for path, title, body in documents}
+
+        changed = {path for path in paths if stored_digests.get(path) != digests[path]}
+        removed = set(stored_digests) - set(index)
+
+        if not changed and not removed and not full and stored_digests:
+            logger.info("Related TILs are up to date")
+            return 0
+
+        neighbours: dict[str, list[tuple[str, float]]] = {}
+        if documents:
+            matrix = self._build_matrix(documents)
+            if full or set(index) != set(stored_digests):
+                affected = set(paths)
+            else:
+                affected = set(changed)
+                for path, stored in stored_neighbours.items():
+                    if path in index and changed & set(stored):
+                        affected.add(path)
+                # Cosine similarity is symmetric, so a changed entry's scores
+                # against every entry show whose neighbours it may now join
+                for path in sorted(changed):
+                    scores = self._scores(matrix, index[path])
+                    for other in paths:
+                        if other in affected:
+                            continue
+                        stored = stored_neighbours.get(other, {})
+                        score = scores[index[other]]
+                        if (
+                            score >= min(stored.values())
+                            if len(stored) >= self.top_k
+                            else score > 0
+                        ):
+                            affected.add(other)
+            for path in sorted(affected):
+                neighbours[path] = self._top_k(matrix, index[path], paths)
+
+        self._store(neighbours, digests, removed)
+        logger.info(f"Recomputed related TILs for {len(neighbours)} entries")
+        return len(neighbours)
+
+    def _build_matrix(self, documents: list[tuple[str, str, str]]) -> dict[str, Any]:
+        """Build an L2-normalised sparse TF-IDF matrix.
+
+        Args:
+            documents: List of (path, title, body) tuples
+
+        Returns:
+            Dictionary holding the matrix in both row-major (CSR) and
+            column-major (CSC) layouts
+
+        """
+        vocabulary: dict[str, int] = {}
+        rows: list[int] = []
+        cols: list[int] = []
+        counts: list[int] = []
+
+        for i, (_, title, body) in enumerate(documents):
+            # Titles are short and descriptive, so weight them twice
+            terms = Counter(tokenize(title) * 2 + tokenize(body))
+            for term, count in terms.items():
+                rows.append(i)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+
+        n_docs = len(documents)
+        row_idx = np.asarray(rows, dtype=np.int64)
+        col_idx = np.asarray(cols, dtype=np.int64)
+        tf = 1.0 + np.log(np.asarray(counts, dtype=np.float64))
+
+        doc_freq = np.bincount(col_idx, minlength=len(vocabulary))
+        idf = np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0
+        weights = tf * idf[col_idx]
+
+        norms = np.sqrt(np.bincount(row_idx, weights=weights**2, minlength=n_docs))
+        norms[norms == 0] = 1.0
+        weights = weights / norms[row_idx]
+
+        # Entries are generated row by row, so row_idx is already sorted
+        row_ptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(row_idx, minlength=n_docs)))
+        )
+
+        order = np.argsort(col_idx, kind="stable")
+        col_ptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(col_idx, minlength=len(vocabulary))))
+        )
+
+        return {
+            "n_docs": n_docs,
+            "row_ptr": row_ptr,
+            "row_cols": col_idx,
+            "row_vals": weights,
+            "col_ptr": col_ptr,
+            "col_rows": row_idx[order],
+            "col_vals": weights[order],
+        }
+
+    def _scores(self, matrix: dict[str, Any], i: int) -> Any:
+        """Cosine similarity of row i with every row, zero for itself.
+
+        Computes one sparse row of X @ X.T by gathering the postings of every
+        term in row i and summing their products with np.bincount.
+
+        Args:
+            matrix: Matrix built by _build_matrix
+            i: Row index of the query entry
+
+        Returns:
+            Array of scores indexed by row
+
+        """
+        start, end = matrix["row_ptr"][i], matrix["row_ptr"][i + 1]
+        terms = matrix["row_cols"][start:end]
+        query = matrix["row_vals"][start:end]
+        if len(terms) == 0:
+            return np.zeros(matrix["n_docs"])
+
+        starts = matrix["col_ptr"][terms]
+        lengths = matrix["col_ptr"][terms + 1] - starts
+        total = int(lengths.sum())
+
+        # Flat indices of every posting for the query terms
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        postings = offsets + np.arange(total)
+
+        scores = np.bincount(
+            matrix["col_rows"][postings],
+            weights=matrix["col_vals"][postings] * np.repeat(query, lengths),
+            minlength=matrix["n_docs"],
+        )
+        scores[i] = 0.0
+        return scores
+
+    def _top_k(
+        self, matrix: dict[str, Any], i: int, paths: list[str]
+    ) -> list[tuple[str, float]]:
+        """Find the entries most similar to row i by cosine similarity.
+
+        Args:
+            matrix: Matrix built by _build_matrix
+            i: Row index of the query entry
+            paths: Row index to path mapping
+
+        Returns:
+            List of (related_path, score) tuples, best first
+
+        """
+        scores = self._scores(matrix, i)
+        k = min(self.top_k, len(scores) - 1)
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [
+            (paths[j], round(float(scores[j]), 6))
+            for j in candidates
+            if scores[j] > 0 and not math.isnan(scores[j])
+        ]
+
+    def _store(
+        self,
+        neighbours: dict[str, list[tuple[str, float]]],
+        digests: dict[str, str],
+        removed: set[str],
+    ) -> None:
+        """Replace stored neighbours and digests in a single transaction."""
+        conn = self.database.db.conn
+        try:
+            conn.execute("begin")
+            for path in list(neighbours) + sorted(removed):
+                conn.execute("delete from til_related where path = ?", [path])
+            for path in removed:
+                conn.execute("delete from til_related_state where path = ?", [path])
+            conn.executemany(
+                "insert into til_related (path, rank, related_path, score) "
+                "values (?, ?, ?, ?)",
+                [
+                    (path, rank, related_path, score)
+                    for path, related in neighbours.items()
+                    for rank, (related_path, score) in enumerate(related, start=1)
+                ],
+            )
+            conn.executemany(
+                "insert or replace into til_related_state (path, digest) values (?, ?)",
+                list(digests.items()),
+            )
+            conn.execute("commit")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("rollback")
+            raise DatabaseError(f"Failed to store related TILs: {e}")
@@ -6,8 +6,10 @@ from typing import Optional, Union
 
 import httpx
 
+from . import tracing
 from .config import TILConfig
 from .exceptions import APIError, RenderingError
+from .metrics import BuildMetrics
 
 
 logger = logging.getLogger(__name__)
@@ -16,15 +18,26 @@ logger = logging.getLogger(__name__)
 class MarkdownRenderer:
     """Handle markdown to HTML conversion."""
 
-    def __init__(self, config: TILConfig):
+    def __init__(
+        self,
+        config: TILConfig,
+        client: Optional[httpx.Client] = None,
+        metrics: Optional[BuildMetrics] = None,
+    ):
         """Initialize MarkdownRenderer with configuration.
 
         Args:
             config: TIL configuration containing API settings
+            client: HTTP client whose connection pool is reused across
+                renders (default: a new connection per request)
+            metrics: Counts retries, rate limits and backoff sleeps
+                (default: not counted)
 
         """
         self.config = config
-        self.api_url = "https://api.github.com/markdown"
+        self.client = client
+        self.metrics = metrics
+        self.api_url = config.markdown_api_url
 
     def render(self, markdown: str) -> Optional[str]:
         """Render markdown to HTML via GitHub API.
@@ -52,16 +65,23 @@ class MarkdownRenderer:
 
         last_error: Optional[Union[APIError, RenderingError]] = None
         for attempt in range(self.config.max_retries):
+            if attempt and self.metrics:
+                self.metrics.inc("til_api_retries")
             try:
                 logger.debug(
                     f"Attempting to render markdown (attempt {attempt + 1}/{self.config.max_retries})"
                 )
-                response = httpx.post(
-                    self.api_url,
-                    json={"mode": "markdown", "text": markdown},
-                    headers=headers,
-                    timeout=30.0,
-                )
+                post = self.client.post if self.client else httpx.post
+                with tracing.span(
+                    "POST markdown", "http", attempt=attempt + 1
+                ) as span_args:
+                    response = post(
+                        self.api_url,
+                        json={"mode": "markdown", "text": markdown},
+                        headers=headers,
+                        timeout=30.0,
+                    )
+                    span_args["status"] = response.status_code
 
                 if response.status_code == 200:
                     logger.debug("Successfully rendered markdown")
@@ -76,12 +96,28 @@ class MarkdownRenderer:
                     )
                 if response.status_code == 403:
                     if "rate limit" in response.text.lower():
+                        tracing.instant(
+                            "rate limited",
+                            "wait",
+                            remaining=response.headers.get("x-ratelimit-remaining"),
+                            reset=response.headers.get("x-ratelimit-reset"),
+                        )
                         logger.warning(
                             f"Rate limit exceeded (attempt {attempt + 1}/{self.config.max_retries})"
                         )
+                        if self.metrics:
+                            self.metrics.inc("til_api_rate_limited")
                         last_error = APIError(
                             "GitHub API rate limit exceeded", status_code=403
                         )
+
+                        # Retrying at once would only spend more of the budget
+                        if attempt < self.config.max_retries - 1:
+                            wait_time = self._calculate_backoff(attempt)
+                            logger.info(
+                                f"Sleeping for {wait_time} seconds before retry..."
+                            )
+                            self._sleep(wait_time, attempt, "rate_limit")
                     else:
                         raise APIError(
                             "GitHub API returned 403 Forbidden", status_code=403
@@ -101,7 +137,7 @@ class MarkdownRenderer:
                     if attempt < self.config.max_retries - 1:
                         wait_time = self._calculate_backoff(attempt)
                         logger.info(f"Sleeping for {wait_time} seconds before retry...")
-                        time.sleep(wait_time)
+                        self._sleep(wait_time, attempt, "status")
 
             except httpx.HTTPError as e:
                 logger.error(f"HTTP error during request: {e}")
@@ -110,7 +146,7 @@ class MarkdownRenderer:
                 if attempt < self.config.max_retries - 1:
                     wait_time = self._calculate_backoff(attempt)
                     logger.info(f"Sleeping for {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
+                    self._sleep(wait_time, attempt, "network")
             except (APIError, RenderingError):
                 # Re-raise our custom exceptions without wrapping
                 raise
@@ -121,7 +157,7 @@ class MarkdownRenderer:
                 if attempt < self.config.max_retries - 1:
                     wait_time = self._calculate_backoff(attempt)
                     logger.info(f"Sleeping for {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
+                    self._sleep(wait_time, attempt, "unexpected")
 
         # All retries exhausted
         error_msg = (
@@ -131,6 +167,16 @@ class MarkdownRenderer:
             error_msg += f": {last_error}"
         raise RenderingError(error_msg)
 
+    def _sleep(self, wait_time: int, attempt: int, reason: str) -> None:
+        """Wait before a retry, traced and counted so stalls stand out."""
+        if self.metrics:
+            self.metrics.inc("til_api_backoff_sleeps", reason=reason)
+            self.metrics.inc("til_api_backoff_seconds", wait_time)
+        with tracing.span(
+            "backoff", "wait", seconds=wait_time, attempt=attempt + 1, reason=reason
+        ):
+            time.sleep(wait_time)
+
     def _calculate_backoff(self, attempt: int) -> int:
         """Calculate exponential backoff time.
 
@@ -8,6 +8,7 @@ from typing import Optional
 import git
 
 from .exceptions import RepositoryError
+from .tracing import traced
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,9 @@ class GitRepository:
 
         """
         self.path = path
+        # Commit and history of the last get_file_history() call, extended
+        # with new commits by later calls
+        self._history: Optional[tuple[str, dict[str, dict[str, str]]]] = None
         if not path.exists():
             raise RepositoryError(f"Path does not exist: {path}")
 
@@ -56,9 +60,24 @@ class GitRepository:
         except Exception as e:
             raise RepositoryError(f"Failed to get current branch: {e}")
 
+    def _is_ancestor(self, ancestor: str, commit: str) -> bool:
+        """Whether one commit is an ancestor of another."""
+        try:
+            return self.repo.is_ancestor(
+                self.repo.commit(ancestor), self.repo.commit(commit)
+            )
+        except Exception:
+            # The cached commit may have been rewritten away
+            return False
+
+    @traced("git history", "repository")
     def get_file_history(self, ref: Optional[str] = None) -> dict[str, dict[str, str]]:
         """Extract created/changed times from git history.
 
+        The result is cached for the repository handle. A later call for the
+        same commit reuses it, and one for a descendant of it only reads
+        the new commits.
+
         Args:
             ref: Git reference to use (default: None to use current branch)
 
@@ -80,7 +99,25 @@ class GitRepository:
                 ref = "HEAD"
 
         try:
-            commits = list(self.repo.iter_commits(ref))
+            head: Optional[str] = self.repo.commit(ref).hexsha
+        except Exception:
+            # Reported by iter_commits below
+            head = None
+
+        rev = ref
+        if head and self._history:
+            cached_head, cached = self._history
+            if cached_head == head:
+                logger.debug(f"Reusing cached history for {head[:12]}")
+                return {path: dict(times) for path, times in cached.items()}
+            if self._is_ancestor(cached_head, head):
+                rev = f"{cached_head}..{head}"
+                created_changed_times = {
+                    path: dict(times) for path, times in cached.items()
+                }
+
+        try:
+            commits = list(self.repo.iter_commits(rev))
             if not commits:
                 logger.warning(f"No commits found for ref {ref}")
                 return created_changed_times
@@ -122,4 +159,9 @@ class GitRepository:
         logger.info(
             f"Processed {processed_count} commits, found history for {len(created_changed_times)} files"
         )
+        if head:
+            self._history = (
+                head,
+                {path: dict(times) for path, times in created_changed_times.items()},
+            )
         return created_changed_times
@@ -0,0 +1,186 @@
+"""Build into a shadow copy of the database and swap it in atomically."""
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+from .connections import connect
+from .database_validator import DatabaseValidator
+from .exceptions import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowBuild:
+    """Shadow copy of a database that replaces it only once validated.
+
+    The copy is taken with SQLite's backup API, so it is consistent even
+    while the live database is being read. After the build the shadow is
+    validated and renamed over the live file, which readers see as a
+    single switch from the old database to the new one. A failed build or
+    validation leaves the live database untouched.
+    """
+
+    def __init__(self, db_path: Path):
+        """Initialize ShadowBuild.
+
+        Args:
+            db_path: Path of the live database
+
+        """
+        self.db_path = db_path
+        # Same directory, so the final rename stays on one filesystem
+        self.path = db_path.with_name(f".{db_path.name}.shadow")
+
+    def prepare(self) -> Path:
+        """Create the shadow as a copy of the live database.
+
+        Returns:
+            Path of the shadow database to build into
+
+        Raises:
+            DatabaseError: If the copy cannot be made
+
+        """
+        self.discard()
+        if not self.db_path.exists():
+            logger.info(f"No existing database, building {self.path} from scratch")
+            return self.path
+
+        try:
+            source = connect(self.db_path, "serve")
+            target = sqlite3.connect(self.path)
+            try:
+                source.backup(target)
+                # A single file without a WAL can be renamed into place safely
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+                source.close()
+        except Exception as e:
+            self.discard()
+            raise DatabaseError(f"Failed to copy {self.db_path} to shadow: {e}")
+
+        logger.info(f"Copied {self.db_path} to shadow {self.path}")
+        return self.path
+
+    def validate(self) -> None:
+        """Check the shadow is fit to serve.
+
+        Structural checks block the swap. The content and creation date
+        checks are heuristics for rendering and history bugs, so their
+        failures are logged without blocking it.
+
+        Raises:
+            DatabaseError: If any blocking validation fails
+
+        """
+        validator = DatabaseValidator(self.path)
+        checks = [validator.validate_sqlite_integrity]
+        if _has_table(self.path, "til"):
+            # A build that found no entries has no schema to check yet
+            checks += [validator.validate_schema, validator.validate_full_text_search]
+            warnings = [
+                validator.validate_content_integrity,
+                validator.validate_creation_dates,
+            ]
+        else:
+            warnings = []
+
+        failed = [
+            result.message
+            for result in (check() for check in checks)
+            if not result.is_valid
+        ]
+        if failed:
+            raise DatabaseError(
+                f"Shadow database failed validation: {'; '.join(failed)}"
+            )
+
+        for check in warnings:
+            result = check()
+            if not result.is_valid:
+                logger.warning(f"Shadow database: {result.message}")
+
+    def commit(self) -> None:
+        """Atomically replace the live database with the shadow.
+
+        Raises:
+            DatabaseError: If the shadow cannot be swapped in
+
+        """
+        try:
+            # Fold the build's WAL into the shadow so it is a single file
+            conn = connect(self.path)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                mode = conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0]
+            finally:
+                conn.close()
+            if mode != "delete":
+                raise DatabaseError(f"shadow is still in {mode} journal mode")
+            self._empty_live_wal()
+            _fsync(self.path)
+            self.path.replace(self.db_path)
+            _fsync(self.db_path.parent)
+        except Exception as e:
+            raise DatabaseError(f"Failed to swap shadow into {self.db_path}: {e}")
+
+        # The replaced database's -wal and -shm are left in place for readers
+        # that still have it open; the emptied WAL holds nothing to replay
+        logger.info(f"Swapped shadow build into {self.db_path}")
+
+    def _empty_live_wal(self) -> None:
+        """Checkpoint the live database's WAL into it and truncate the WAL.
+
+        The WAL keeps the live file's name, so frames left in it would be
+        read as pages of the new database by connections opened after the
+        swap.
+
+        Raises:
+            DatabaseError: If readers keep the WAL from being emptied
+
+        """
+        wal = self.db_path.with_name(self.db_path.name + "-wal")
+        if not wal.exists():
+            return
+        conn = connect(self.db_path)
+        try:
+            busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        finally:
+            conn.close()
+        if busy:
+            raise DatabaseError(f"readers kept the WAL of {self.db_path} in use")
+
+    def discard(self) -> None:
+        """Remove the shadow and any journal files it left behind."""
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
+
+
+def _has_table(db_path: Path, name: str) -> bool:
+    """Whether a database contains the named table."""
+    conn = connect(db_path, "validate")
+    try:
+        row = conn.execute(
+            "select 1 from sqlite_master where type = 'table' and name = ?", [name]
+        ).fetchone()
+    finally:
+        conn.close()
+    return row is not None
+
+
+def _fsync(path: Path) -> None:
+    """Flush a file or directory to disk where the platform allows it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
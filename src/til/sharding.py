@@ -0,0 +1,67 @@
+"""Deterministic partitioning of TIL files across build shards."""
+
+import hashlib
+import re
+from typing import NamedTuple
+
+from .exceptions import ConfigurationError
+
+
+SHARD_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+
+def shard_number(path: str, count: int) -> int:
+    """Shard, from 1 to count, that a TIL path belongs to.
+
+    The path is hashed rather than sorted, so adding or removing a file
+    only changes the shard of that file.
+
+    Args:
+        path: TIL path as stored in the database, e.g. content_python_lists.md
+        count: Number of shards
+
+    Returns:
+        1-based shard number
+
+    """
+    digest = hashlib.sha1(path.encode("utf-8")).digest()  # noqa: S324
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+class Shard(NamedTuple):
+    """One of total partitions of the TIL files, numbered from 1."""
+
+    number: int
+    total: int
+
+    def includes(self, path: str) -> bool:
+        """Whether a TIL path belongs to this shard."""
+        return shard_number(path, self.total) == self.number
+
+    def __str__(self) -> str:
+        """Return the shard as i/N."""
+        return f"{self.number}/{self.total}"
+
+
+def parse_shard(value: str) -> Shard:
+    """Parse a shard given as i/N, for example 2/4.
+
+    Args:
+        value: Shard specification
+
+    Returns:
+        The parsed Shard
+
+    Raises:
+        ConfigurationError: If the value is not i/N with 1 <= i <= N
+
+    """
+    match = SHARD_RE.match(value)
+    if not match:
+        raise ConfigurationError(f"Invalid shard: '{value}'. Expected format: i/N")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ConfigurationError(
+            f"Invalid shard: '{value}'. Shard index must be between 1 and {count}"
+        )
+    return Shard(index, count)
@@ -0,0 +1,333 @@
+"""Export the Datasette-rendered site as static HTML files."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import shutil
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .compression import available_encodings, encode, SUFFIXES
+from .database import TILDatabase
+from .exceptions import ConfigurationError, DatabaseError, RenderingError
+from .feed_generator import FeedGenerator, SITE_URL
+
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+MANIFEST_NAME = ".export-manifest.json"
+
+# Pages rendered concurrently
+DEFAULT_JOBS = 8
+
+
+class ExportResult(NamedTuple):
+    """Pages written, skipped and removed by an export."""
+
+    written: list[str]
+    unchanged: int
+    removed: list[str]
+
+
+def page_file(page: str) -> str:
+    """Relative file a page path is written to, as a directory index."""
+    return "/".join([*page.strip("/").split("/"), "index.html"]).lstrip("/")
+
+
+def _digest(*parts: Any) -> str:
+    """Stable digest of JSON-serialisable parts."""
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class StaticExporter:
+    """Render every site page through Datasette into a directory of files."""
+
+    def __init__(
+        self,
+        database: TILDatabase,
+        output_dir: Path,
+        site_dir: Path,
+        jobs: int = DEFAULT_JOBS,
+    ):
+        """Initialize StaticExporter.
+
+        Args:
+            database: TIL database instance; the file must be named til.db
+                because the templates query the "til" database
+            output_dir: Directory the site is written to
+            site_dir: Directory holding metadata.yaml and src/templates,
+                src/static and src/plugins
+            jobs: Number of pages rendered concurrently
+
+        Raises:
+            ConfigurationError: If the database name or site layout is wrong
+
+        """
+        if database.db_path.stem != "til":
+            raise ConfigurationError(
+                f"Static export requires a database named til.db: {database.db_path}"
+            )
+        if jobs < 1:
+            raise ConfigurationError(f"jobs must be positive: {jobs}")
+
+        self.database = database
+        self.output_dir = output_dir
+        self.templates_dir = site_dir / "src" / "templates"
+        self.static_dir = site_dir / "src" / "static"
+        self.plugins_dir = site_dir / "src" / "plugins"
+        self.metadata_path = site_dir / "metadata.yaml"
+        self.jobs = jobs
+
+        if not self.templates_dir.is_dir():
+            raise ConfigurationError(f"Templates not found: {self.templates_dir}")
+
+    def export(self, force: bool = False) -> ExportResult:
+        """Render pages whose inputs changed and copy assets, feeds and sitemap.
+
+        Each page has a fingerprint of the templates, plugins, metadata and
+        the rows it displays. Pages whose fingerprint matches the manifest
+        from the previous export are not rendered again.
+
+        Args:
+            force: Render every page regardless of fingerprints
+
+        Returns:
+            ExportResult describing the pages written and removed
+
+        Raises:
+            DatabaseError: If page inputs cannot be read
+            RenderingError: If any page fails to render
+
+        """
+        pages = self._page_fingerprints()
+        manifest = self._load_manifest()
+
+        stale = sorted(
+            page
+            for page, fingerprint in pages.items()
+            if force
+            or manifest.get(page) != fingerprint
+            or not (self.output_dir / page_file(page)).exists()
+        )
+
+        rendered = asyncio.run(self._render(stale)) if stale else {}
+        for page in stale:
+            self._write_page(page_file(page), rendered[page])
+            manifest[page] = pages[page]
+
+        removed = sorted(set(manifest) - set(pages))
+        for page in removed:
+            self._remove(page_file(page))
+            del manifest[page]
+
+        self._copy_static()
+        FeedGenerator(self.database, self.output_dir / "feeds").generate(force=force)
+        self._write("sitemap.xml", self._sitemap(sorted(pages)))
+        self._write(
+            MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode()
+        )
+
+        logger.info(
+            f"Exported {len(stale)} of {len(pages)} pages to {self.output_dir} "
+            f"({len(removed)} removed)"
+        )
+        return ExportResult(stale, len(pages) - len(stale), removed)
+
+    def _site_digest(self) -> str:
+        """Digest of the templates, plugins and metadata every page uses."""
+        files = sorted(self.templates_dir.rglob("*.html"))
+        files += sorted(self.plugins_dir.glob("*.py"))
+        if self.metadata_path.exists():
+            files.append(self.metadata_path)
+        digest = hashlib.sha256()
+        for path in files:
+            digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes())
+        return digest.hexdigest()
+
+    def _query(self, table: str, sql: str) -> list[tuple]:
+        """Rows of an aggregate table, or none if it was never built."""
+        if table not in self.database.db.table_names():
+            return []
+        return self.database.db.execute(sql).fetchall()
+
+    def _page_fingerprints(self) -> dict[str, str]:
+        """Fingerprint the inputs of every page keyed by page path."""
+        site = self._site_digest()
+
+        try:
+            if "til" not in self.database.db.table_names():
+                return {}
+            rows = {
+                row["path"]: row
+                for row in self.database.get_table().rows_where(order_by="path")
+            }
+            related: dict[str, list[str]] = {}
+            for path, related_path in self._query(
+                "til_related",
+                "select path, related_path from til_related order by path, rank",
+            ):
+                related.setdefault(path, []).append(related_path)
+            topics = _digest(
+                self._query("til_topics", "select * from til_topics order by topic")
+            )
+            # Topic and entry pages only show the other topics and their counts
+            topic_counts = _digest(
+                self._query(
+                    "til_topics", "select topic, count from til_topics order by topic"
+                )
+            )
+            stats = _digest(self._query("til_stats", "select * from til_stats"))
+            recent = _digest(
+                self._query("til_recent", "select * from til_recent order by rank")
+            )
+        except Exception as e:
+            raise DatabaseError(f"Failed to read export inputs: {e}")
+
+        row_digests = {path: _digest(row) for path, row in rows.items()}
+        by_topic: dict[str, list[str]] = {}
+        for path, row in rows.items():
+            by_topic.setdefault(row["topic"], []).append(row_digests[path])
+        topic_digests = {topic: _digest(digests) for topic, digests in by_topic.items()}
+
+        pages = {
+            "/": _digest(site, stats, topics, recent),
+            "/all": _digest(site, stats, sorted(row_digests.values())),
+        }
+        for topic, digest in topic_digests.items():
+            pages[f"/{topic}"] = _digest(site, digest, topic_counts)
+        for path, row in rows.items():
+            neighbours = [
+                row_digests.get(related_path, "")
+                for related_path in related.get(path, [])
+            ]
+            # Entries without stored neighbours fall back to their topic
+            context = neighbours or topic_digests[row["topic"]]
+            pages[f"/{row['topic']}/{row['slug']}"] = _digest(
+                site, row_digests[path], context, topic_counts
+            )
+        return pages
+
+    async def _render(self, pages: list[str]) -> dict[str, bytes]:
+        """Render pages through an in-process Datasette instance."""
+        from datasette.app import Datasette  # noqa: PLC0415
+
+        metadata = self._load_metadata()
+        # Rendered pages are written to disk, not kept in memory
+        metadata.setdefault("plugins", {})["page_cache"] = {
+            "max_bytes": 0,
+            "warm": False,
+        }
+
+        datasette = Datasette(
+            immutables=[str(self.database.db_path)],
+            metadata=metadata,
+            template_dir=str(self.templates_dir),
+            plugins_dir=str(self.plugins_dir) if self.plugins_dir.is_dir() else None,
+            settings={"num_sql_threads": self.jobs},
+        )
+        await datasette.invoke_startup()
+
+        semaphore = asyncio.Semaphore(self.jobs)
+
+        async def render(page: str) -> tuple[str, Any]:
+            async with semaphore:
+                return page, await datasette.client.get(page)
+
+        responses = await asyncio.gather(*(render(page) for page in pages))
+
+        failed = [
+            f"{page} ({response.status_code})"
+            for page, response in responses
+            if response.status_code != 200
+        ]
+        if failed:
+            raise RenderingError(
+                f"Failed to render {len(failed)} pages: {', '.join(failed[:5])}"
+            )
+        return {page: response.content for page, response in responses}
+
+    def _load_metadata(self) -> dict[str, Any]:
+        """Load the Datasette metadata used when serving the site."""
+        if not self.metadata_path.exists():
+            return {}
+        import yaml  # noqa: PLC0415
+
+        with self.metadata_path.open() as f:
+            return yaml.safe_load(f) or {}
+
+    def _sitemap(self, pages: list[str]) -> bytes:
+        """Render a sitemap listing every exported page."""
+        ET.register_namespace("", SITEMAP_NAMESPACE)
+        urlset = ET.Element(f"{{{SITEMAP_NAMESPACE}}}urlset")
+        for page in pages:
+            url = ET.SubElement(urlset, f"{{{SITEMAP_NAMESPACE}}}url")
+            loc = ET.SubElement(url, f"{{{SITEMAP_NAMESPACE}}}loc")
+            loc.text = SITE_URL + page.lstrip("/")
+        body: bytes = ET.tostring(urlset, encoding="utf-8", xml_declaration=False)
+        return b'<?xml version="1.0" encoding="utf-8"?>\n' + body
+
+    def _copy_static(self) -> None:
+        """Copy static assets whose content differs from the exported copy."""
+        if not self.static_dir.is_dir():
+            return
+        for source in sorted(self.static_dir.rglob("*")):
+            if not source.is_file():
+                continue
+            target = self.output_dir / "static" / source.relative_to(self.static_dir)
+            if target.exists() and target.read_bytes() == source.read_bytes():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+
+    def _write(self, name: str, content: bytes) -> None:
+        """Atomically write a file below the output directory."""
+        target = self.output_dir / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        tmp_path.write_bytes(content)
+        tmp_path.replace(target)
+
+    def _write_page(self, name: str, content: bytes) -> None:
+        """Write a page with a precompressed variant for each encoding.
+
+        Variants for encodings that are no longer available are removed so a
+        file server never sends stale compressed bytes.
+        """
+        self._write(name, content)
+        encodings = available_encodings()
+        for encoding, suffix in SUFFIXES.items():
+            if encoding in encodings:
+                self._write(f"{name}{suffix}", encode(content, encoding))
+            else:
+                (self.output_dir / f"{name}{suffix}").unlink(missing_ok=True)
+
+    def _remove(self, name: str) -> None:
+        """Delete an exported page, its variants and emptied directories."""
+        target = self.output_dir / name
+        for suffix in ("", *SUFFIXES.values()):
+            target.with_name(f"{target.name}{suffix}").unlink(missing_ok=True)
+        parent = target.parent
+        while (
+            parent != self.output_dir and parent.is_dir() and not any(parent.iterdir())
+        ):
+            parent.rmdir()
+            parent = parent.parent
+
+    def _load_manifest(self) -> dict[str, str]:
+        """Load page fingerprints written by the previous export."""
+        manifest_path = self.output_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return {}
+        try:
+            with manifest_path.open() as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable export manifest: {e}")
+            return {}
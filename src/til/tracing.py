@@ -0,0 +1,302 @@
+"""Timeline spans of a build, exported as Chrome traces and flamegraph stacks."""
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from .logging_config import ContextFilter
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# File spans taking longer than this are highlighted, in seconds
+DEFAULT_SLOW_FILE = 1.0
+
+# Reserved colour names understood by Chrome's trace viewer
+SLOW_COLOR = "bad"
+WAIT_COLOR = "terrible"
+
+
+def _request_id() -> str:
+    """Request ID of the root logger's ContextFilter, or a new one."""
+    for log_filter in logging.getLogger().filters:
+        if isinstance(log_filter, ContextFilter):
+            return log_filter.request_id
+    return str(uuid.uuid4())
+
+
+class Tracer:
+    """Records nested, timestamped spans from every thread of a build.
+
+    Each span becomes a complete event in the Chrome trace-event format,
+    so a trace opens in Perfetto or chrome://tracing with one track per
+    thread and shows where work overlaps or stalls. The same spans are
+    folded into collapsed stacks for flamegraph tools.
+    """
+
+    def __init__(
+        self, request_id: Optional[str] = None, slow_file: float = DEFAULT_SLOW_FILE
+    ):
+        """Initialize Tracer.
+
+        Args:
+            request_id: ID tagging every event (default: the request_id of
+                the logging ContextFilter, so traces match the logs)
+            slow_file: Seconds after which a file span is marked slow
+
+        """
+        self.request_id = request_id or _request_id()
+        self.slow_file = slow_file
+        self.events: list[dict[str, Any]] = []
+        self.stacks: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._threads: dict[int, str] = {}
+        self._started = time.perf_counter_ns()
+
+    def _now(self) -> float:
+        """Microseconds since the tracer was created."""
+        return (time.perf_counter_ns() - self._started) / 1000
+
+    def _stack(self) -> list[list[Any]]:
+        """Open spans of the current thread as [frame, child microseconds]."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _event(self, event: dict[str, Any]) -> None:
+        """Add an event from the current thread."""
+        thread = threading.current_thread()
+        event.update(pid=os.getpid(), tid=thread.ident)
+        event.setdefault("args", {})["request_id"] = self.request_id
+        with self._lock:
+            self._threads.setdefault(thread.ident or 0, thread.name)
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[dict[str, Any]]:
+        """Record a block as a span.
+
+        Args:
+            name: Span name, shown on the timeline and as a flamegraph frame
+            category: Kind of operation, e.g. repository, render or database
+            **args: Details shown with the span
+
+        Yields:
+            The span's args, to which details found inside the block can be
+            added
+
+        """
+        stack = self._stack()
+        stack.append([name, 0.0])
+        started = self._now()
+        try:
+            yield args
+        finally:
+            duration = self._now() - started
+            _, children = stack.pop()
+            frames = ";".join(frame for frame, _ in stack)
+            if stack:
+                stack[-1][1] += duration
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": started,
+                "dur": duration,
+                "args": args,
+            }
+            if category == "file" and duration >= self.slow_file * 1_000_000:
+                args["slow"] = True
+                event["cname"] = SLOW_COLOR
+            elif category == "wait":
+                event["cname"] = WAIT_COLOR
+            self._event(event)
+            # Flamegraphs weigh each stack by the time spent in it, not in
+            # its children
+            stack_key = f"{frames};{name}" if frames else name
+            with self._lock:
+                self.stacks[stack_key] += max(round(duration - children), 0)
+
+    def instant(self, name: str, category: str, **args: Any) -> None:
+        """Record a point in time, such as hitting a rate limit.
+
+        Args:
+            name: Event name
+            category: Kind of event
+            **args: Details shown with the event
+
+        """
+        self._event(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "i",
+                "s": "t",
+                "ts": self._now(),
+                "args": args,
+            }
+        )
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Spans as a Chrome trace-event document.
+
+        Returns:
+            Trace with thread names, for Perfetto or chrome://tracing
+
+        """
+        pid = os.getpid()
+        with self._lock:
+            names = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            events = sorted(self.events, key=lambda event: event["ts"])
+        return {
+            "traceEvents": names + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"request_id": self.request_id},
+        }
+
+    def collapsed_stacks(self) -> list[str]:
+        """Spans as collapsed stacks, one "frame;frame;frame microseconds" each.
+
+        Returns:
+            Lines for flamegraph.pl, speedscope or inferno
+
+        """
+        with self._lock:
+            return [
+                f"{stack} {weight}"
+                for stack, weight in sorted(self.stacks.items())
+                if weight > 0
+            ]
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Write the Chrome trace JSON.
+
+        Args:
+            path: Trace file
+
+        """
+        _write_atomic(path, json.dumps(self.chrome_trace()) + "\n")
+
+    def write_collapsed_stacks(self, path: Path) -> None:
+        """Write the collapsed stacks.
+
+        Args:
+            path: Stacks file
+
+        """
+        _write_atomic(path, "".join(f"{line}\n" for line in self.collapsed_stacks()))
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Replace a file with text in a single rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(text)
+    tmp_path.replace(path)
+
+
+_active: Optional[Tracer] = None
+
+
+def start_tracing(tracer: Optional[Tracer] = None) -> Tracer:
+    """Send spans from every module to a tracer until stop_tracing().
+
+    Args:
+        tracer: Tracer to record into (default: a new one)
+
+    Returns:
+        The active tracer
+
+    """
+    global _active  # noqa: PLW0603
+    _active = tracer or Tracer()
+    return _active
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Stop recording spans.
+
+    Returns:
+        The tracer that was active, if any
+
+    """
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+def span(
+    name: str, category: str, **args: Any
+) -> contextlib.AbstractContextManager[dict[str, Any]]:
+    """Record a block as a span if tracing is active.
+
+    Args:
+        name: Span name
+        category: Kind of operation
+        **args: Details shown with the span
+
+    Returns:
+        Context manager yielding the span's args
+
+    """
+    if _active is None:
+        return contextlib.nullcontext(args)
+    return _active.span(name, category, **args)
+
+
+def instant(name: str, category: str, **args: Any) -> None:
+    """Record a point in time if tracing is active.
+
+    Args:
+        name: Event name
+        category: Kind of event
+        **args: Details shown with the event
+
+    """
+    if _active is not None:
+        _active.instant(name, category, **args)
+
+
+def traced(name: str, category: str) -> Callable[[F], F]:
+    """Record every call of a function as a span while tracing is active.
+
+    Args:
+        name: Span name
+        category: Kind of operation
+
+    Returns:
+        Decorator
+
+    """
+
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _active is None:
+                return function(*args, **kwargs)
+            with _active.span(name, category):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
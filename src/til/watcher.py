@@ -0,0 +1,322 @@
+"""Watch content directories for changed TIL files."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event flags
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# A file is reported once its writer closes it or renames it into place,
+# so a half-written file is never read
+FILE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+DIR_EVENTS = FILE_EVENTS | IN_CREATE | IN_DELETE_SELF
+# Topic directories added to or removed from content/
+CONTENT_EVENTS = IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+# Quiet period that ends a burst of changes, in seconds
+DEFAULT_DEBOUNCE = 0.05
+
+# Interval between scans when inotify is unavailable, in seconds
+DEFAULT_POLL_INTERVAL = 0.25
+
+
+def content_dirs(root: Path) -> list[Path]:
+    """Topic directories holding a root's TIL files."""
+    content = root / "content"
+    if not content.is_dir():
+        return []
+    return sorted(path for path in content.iterdir() if path.is_dir())
+
+
+def is_til_file(path: Path, roots: list[Path]) -> bool:
+    """Whether a path has the content/<topic>/<slug>.md layout of a TIL."""
+    return path.suffix == ".md" and any(
+        path.parent.parent == root / "content" for root in roots
+    )
+
+
+class ContentWatcher(ABC):
+    """Reports TIL files created, changed or deleted under content roots."""
+
+    def __init__(self, roots: list[Path]):
+        """Initialize ContentWatcher.
+
+        Args:
+            roots: Directories containing content/<topic>/<slug>.md files
+
+        """
+        self.roots = roots
+
+    @abstractmethod
+    def poll(self, timeout: Optional[float]) -> set[Path]:
+        """Wait for changes.
+
+        Args:
+            timeout: Seconds to wait, or None to wait until something changes
+
+        Returns:
+            Paths of changed TIL files, empty if none changed in time
+
+        """
+
+    def wait(
+        self, debounce: float = DEFAULT_DEBOUNCE, timeout: Optional[float] = None
+    ) -> set[Path]:
+        """Wait for a burst of changes to finish.
+
+        Editors and git checkouts touch several files, or one file several
+        times, in quick succession. Changes are collected until none arrive
+        for the debounce period so they are applied together.
+
+        Args:
+            debounce: Quiet period in seconds that ends the burst
+            timeout: Seconds to wait for the first change, or None to wait
+                indefinitely
+
+        Returns:
+            Paths of changed TIL files, empty if none changed in time
+
+        """
+        changes = self.poll(timeout)
+        while changes:
+            more = self.poll(debounce)
+            if not more:
+                break
+            changes |= more
+        return changes
+
+    def close(self) -> None:  # noqa: B027
+        """Release any resources held by the watcher."""
+
+    def __enter__(self) -> "ContentWatcher":
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the watcher on exit."""
+        self.close()
+
+
+class PollingWatcher(ContentWatcher):
+    """Detects changes by comparing file sizes and modification times."""
+
+    def __init__(self, roots: list[Path], interval: float = DEFAULT_POLL_INTERVAL):
+        """Initialize PollingWatcher.
+
+        Args:
+            roots: Directories containing content/<topic>/<slug>.md files
+            interval: Seconds between scans
+
+        """
+        super().__init__(roots)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        """Size and modification time of every TIL file."""
+        snapshot = {}
+        for root in self.roots:
+            for path in root.glob("content/*/*.md"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: Optional[float]) -> set[Path]:
+        """Scan for changes until one is found or the timeout passes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {
+                path
+                for path in current.keys() | self._snapshot.keys()
+                if current.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0))
+            time.sleep(wait)
+
+
+class InotifyWatcher(ContentWatcher):
+    """Receives change events from the Linux kernel through inotify."""
+
+    def __init__(self, roots: list[Path]):
+        """Initialize InotifyWatcher.
+
+        Args:
+            roots: Directories containing content/<topic>/<slug>.md files
+
+        Raises:
+            OSError: If inotify is unavailable
+
+        """
+        super().__init__(roots)
+        library = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(library, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._watches: dict[int, Path] = {}
+        # TIL files known to exist, reported as deleted if their topic
+        # directory is moved away, which sends no event per file
+        self._files: set[Path] = set()
+        try:
+            for root in roots:
+                content = root / "content"
+                if content.is_dir():
+                    self._add_watch(content, CONTENT_EVENTS)
+                for directory in content_dirs(root):
+                    self._add_watch(directory, DIR_EVENTS)
+                    self._files.update(directory.glob("*.md"))
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: Path, mask: int) -> None:
+        """Watch a directory for the events in mask."""
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), ctypes.c_uint32(mask)
+        )
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"Cannot watch {directory}: {os.strerror(errno)}")
+        self._watches[wd] = directory
+
+    def _remove_topic(self, directory: Path) -> set[Path]:
+        """Stop watching a topic directory that left content/.
+
+        Returns:
+            TIL files that were in it, now deleted from the content root
+
+        """
+        for wd, watched in list(self._watches.items()):
+            if watched == directory:
+                # The watch follows the directory to wherever it was moved
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+        removed = {path for path in self._files if path.parent == directory}
+        self._files -= removed
+        return removed
+
+    def _read_events(self) -> set[Path]:
+        """Read pending events and turn them into changed TIL files."""
+        changed: set[Path] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            directory = self._watches.get(wd)
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+
+            if mask & IN_ISDIR:
+                if directory.name != "content":
+                    continue
+                if mask & (IN_MOVED_FROM | IN_DELETE):
+                    changed |= self._remove_topic(path)
+                elif path.is_dir():
+                    # A new topic: watch it and pick up files already in it
+                    self._add_watch(path, DIR_EVENTS)
+                    files = set(path.glob("*.md"))
+                    self._files |= files
+                    changed |= files
+                continue
+            if is_til_file(path, self.roots):
+                if path.exists():
+                    self._files.add(path)
+                else:
+                    self._files.discard(path)
+                changed.add(path)
+        return changed
+
+    def poll(self, timeout: Optional[float]) -> set[Path]:
+        """Wait for inotify events until a TIL file changes or the timeout passes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if readable:
+                changed = self._read_events()
+                if changed:
+                    return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(
+    roots: list[Path], poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> ContentWatcher:
+    """Create the most efficient watcher available on this platform.
+
+    Args:
+        roots: Directories containing content/<topic>/<slug>.md files
+        poll_interval: Seconds between scans if polling is needed
+
+    Returns:
+        An InotifyWatcher on Linux, otherwise a PollingWatcher
+
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable, polling for changes: {e}")
+    return PollingWatcher(roots, interval=poll_interval)
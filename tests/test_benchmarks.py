@@ -0,0 +1,123 @@
+"""Tests for the benchmark suite and its synthetic corpus."""
+
+import json
+from pathlib import Path
+
+import click.testing
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from benchmarks.run import compare, main, run_benchmarks, stand_in_client
+
+
+SMALL = CorpusSpec(topics=3, files=12, body_bytes=300, commits=5, renames=2)
+
+
+def test_generate_corpus(tmp_path: Path) -> None:
+    """Test the corpus has the requested files, commits and renames."""
+    repo = generate_corpus(tmp_path / "corpus", SMALL)
+
+    files = sorted((tmp_path / "corpus").glob("content/*/*.md"))
+    assert len(files) == 12
+    assert len({path.parent.name for path in files}) == 3
+    assert len(list(repo.iter_commits())) == 5
+    assert sum("-renamed-" in path.name for path in files) == 2
+    assert all(len(path.read_text()) > 300 for path in files)
+    assert not repo.is_dirty(untracked_files=True)
+
+
+def test_generate_corpus_is_deterministic(tmp_path: Path) -> None:
+    """Test a spec always produces the same files."""
+    generate_corpus(tmp_path / "a", SMALL)
+    generate_corpus(tmp_path / "b", SMALL)
+
+    def contents(root: Path) -> dict[str, str]:
+        return {
+            path.relative_to(root).as_posix(): path.read_text()
+            for path in root.glob("content/*/*.md")
+        }
+
+    assert contents(tmp_path / "a") == contents(tmp_path / "b")
+
+
+def test_corpus_spec_validation() -> None:
+    """Test impossible specs are rejected."""
+    with pytest.raises(ValueError, match="renames"):
+        CorpusSpec(files=2, renames=3)
+
+
+def test_stand_in_client_renders_paragraphs() -> None:
+    """Test the stand-in API answers like the markdown endpoint."""
+    with stand_in_client() as client:
+        response = client.post(
+            "https://api.github.com/markdown",
+            json={"mode": "markdown", "text": "One <b>\n\nTwo"},
+        )
+
+    assert response.status_code == 200
+    assert response.text == "<p>One &lt;b&gt;</p>\n<p>Two</p>"
+
+
+def test_run_benchmarks() -> None:
+    """Test every benchmark runs and reports its timings."""
+    results = run_benchmarks(SMALL, repeats=2)
+
+    assert results["corpus"]["files"] == 12
+    assert set(results["benchmarks"]) == {
+        "get_file_history",
+        "process_all_files",
+        "upsert_record",
+        "enable_search",
+        "generate_index",
+        "validate",
+    }
+    for result in results["benchmarks"].values():
+        assert result["repeats"] == 2
+        assert 0 < result["min"] <= result["median"]
+    assert results["benchmarks"]["process_all_files"]["items"] == 12
+
+
+def test_run_benchmarks_with_api_server() -> None:
+    """Test the build benchmarks can render through a local HTTP server."""
+    results = run_benchmarks(
+        SMALL, repeats=1, only={"process_all_files"}, api_server=True
+    )
+
+    assert results["api_server"] is True
+    assert results["benchmarks"]["process_all_files"]["items"] == 12
+
+
+def test_compare_flags_regressions() -> None:
+    """Test medians growing past the threshold are regressions."""
+    baseline = {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}}}
+    current = {
+        "benchmarks": {"a": {"median": 1.1}, "b": {"median": 1.5}, "c": {"median": 1}}
+    }
+
+    assert compare(baseline, current, max_regression=0.25) == [
+        ("a", 1.0, 1.1, False),
+        ("b", 1.0, 1.5, True),
+    ]
+
+
+def test_main_writes_results_and_compares(tmp_path: Path) -> None:
+    """Test the command writes JSON and fails on a regression."""
+    runner = click.testing.CliRunner()
+    output = tmp_path / "results.json"
+    args = ["--topics", "2", "--files", "6", "--commits", "3", "--renames", "1"]
+    args += ["--repeats", "1", "--only", "generate_index"]
+
+    result = runner.invoke(main, [*args, "-o", str(output)])
+    assert result.exit_code == 0, result.output
+    assert "generate_index" in result.output
+
+    # A baseline ten times faster makes the current run a regression
+    results = json.loads(output.read_text())
+    for timings in results["benchmarks"].values():
+        timings["median"] /= 10
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(results))
+
+    result = runner.invoke(main, [*args, "--compare", str(baseline)])
+    assert result.exit_code == 1
+    assert "REGRESSION" in result.output
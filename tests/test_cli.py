@@ -1,18 +1,24 @@
 """Test CLI interface."""
 
+import importlib
+import json
+import subprocess
 import sys
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import click.testing
 
-# Import the module and cli separately to fix CI issues
-from til.cli import cli
+from til import tracing
+from til.cli import cli, COMMANDS
+from til.exceptions import TILError
 from til.logging_config import LogConfig, LogFormat, LogLevel
+from til.tracing import span
 
 
-# Get the actual module for patching
-cli_module = sys.modules["til.cli"]
+# Command modules, for patching what each command uses
+build_module = importlib.import_module("til.commands.build")
+readme_module = importlib.import_module("til.commands.readme")
 
 
 class TestCLI:
@@ -39,6 +45,8 @@ class TestCLI:
         assert "--github-token" in result.output
         assert "--repo" in result.output
         assert "--db" in result.output
+        assert "--in-memory" in result.output
+        assert "--shard" in result.output
 
     def test_update_readme_command_help(self) -> None:
         """Test update-readme command help."""
@@ -51,8 +59,8 @@ class TestCLI:
         assert "--db" in result.output
         assert "--output" in result.output
 
-    @patch.object(cli_module, "TILProcessor")
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
     def test_build_command(
         self, mock_loader_class: Mock, mock_processor_class: Mock
     ) -> None:
@@ -86,14 +94,18 @@ class TestCLI:
             github_token=None,
             github_repo="jthodge/til",
             database_name="til.db",
+            in_memory_build=None,
+            shard=None,
         )
 
         # Verify processor was used
-        mock_processor_class.assert_called_once_with(mock_config)
+        mock_processor_class.assert_called_once_with(
+            mock_config, profiler=None, metrics=None
+        )
         mock_processor.build_database.assert_called_once()
 
-    @patch.object(cli_module, "TILProcessor")
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
     def test_build_command_with_options(
         self, mock_loader_class: Mock, mock_processor_class: Mock
     ) -> None:
@@ -137,10 +149,99 @@ class TestCLI:
             github_token="token123",
             github_repo="user/repo",
             database_name="custom.db",
+            in_memory_build=None,
+            shard=None,
+        )
+
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
+    def test_build_command_profile(
+        self, mock_loader_class: Mock, mock_processor_class: Mock, tmp_path: Path
+    ) -> None:
+        """Test build --profile prints a table and writes the report."""
+        runner = click.testing.CliRunner()
+        mock_config = Mock()
+        mock_config.log_config = LogConfig()
+        mock_loader_class.load_config.return_value = mock_config
+
+        def build_database() -> None:
+            profiler = mock_processor_class.call_args.kwargs["profiler"]
+            profiler.record("render", 0.5, 100, "content_python_a.md")
+
+        mock_processor_class.return_value.build_database.side_effect = build_database
+        report_path = tmp_path / "profile.json"
+
+        result = runner.invoke(
+            cli, ["build", "--profile", "--profile-report", str(report_path)]
+        )
+
+        assert result.exit_code == 0
+        assert "render" in result.output
+        assert f"Profile written to {report_path}" in result.output
+        assert "content_python_a.md" in json.loads(report_path.read_text())["files"]
+
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
+    def test_build_command_trace(
+        self, mock_loader_class: Mock, mock_processor_class: Mock, tmp_path: Path
+    ) -> None:
+        """Test build --trace and --flamegraph write the build's spans."""
+        runner = click.testing.CliRunner()
+        mock_config = Mock()
+        mock_config.log_config = LogConfig(request_id="ci-run")
+        mock_loader_class.load_config.return_value = mock_config
+
+        def build_database() -> None:
+            with span("build", "build"):
+                pass
+
+        mock_processor_class.return_value.build_database.side_effect = build_database
+        trace_path = tmp_path / "trace.json"
+        stacks_path = tmp_path / "build.folded"
+
+        result = runner.invoke(
+            cli,
+            ["build", "--trace", str(trace_path), "--flamegraph", str(stacks_path)],
         )
 
-    @patch.object(cli_module, "TILProcessor")
-    @patch.object(cli_module, "ConfigLoader")
+        assert result.exit_code == 0
+        trace = json.loads(trace_path.read_text())
+        assert trace["otherData"]["request_id"] == "ci-run"
+        assert [
+            event["name"] for event in trace["traceEvents"] if event["ph"] == "X"
+        ] == ["build"]
+        assert stacks_path.read_text().startswith("build ")
+        # Tracing stops with the build
+        assert tracing._active is None
+
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
+    def test_build_command_metrics_file_on_failure(
+        self, mock_loader_class: Mock, mock_processor_class: Mock, tmp_path: Path
+    ) -> None:
+        """Test build --metrics-file writes metrics even when the build fails."""
+        runner = click.testing.CliRunner()
+        mock_config = Mock()
+        mock_config.log_config = LogConfig()
+        mock_loader_class.load_config.return_value = mock_config
+
+        def build_database() -> None:
+            metrics = mock_processor_class.call_args.kwargs["metrics"]
+            metrics.record_build(1.0, succeeded=False)
+            raise TILError("API down")
+
+        mock_processor_class.return_value.build_database.side_effect = build_database
+        metrics_path = tmp_path / "til.prom"
+
+        result = runner.invoke(cli, ["build", "--metrics-file", str(metrics_path)])
+
+        assert result.exit_code == 1
+        text = metrics_path.read_text()
+        assert "til_build_success 0\n" in text
+        assert text.endswith("# EOF\n")
+
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
     def test_build_command_verbose(
         self, mock_loader_class: Mock, mock_processor_class: Mock
     ) -> None:
@@ -171,8 +272,8 @@ class TestCLI:
         assert "Building database: /tmp/til.db" in result.output
         assert "Repository: user/repo" in result.output
 
-    @patch.object(cli_module, "TILProcessor")
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
     def test_build_command_quiet(
         self, mock_loader_class: Mock, mock_processor_class: Mock
     ) -> None:
@@ -200,8 +301,19 @@ class TestCLI:
         assert result.exit_code == 0
         assert "Database built successfully!" not in result.output
 
-    @patch.object(cli_module, "TILProcessor")
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(build_module, "TILProcessor")
+    def test_build_command_shard_needs_db(self, mock_processor_class: Mock) -> None:
+        """Test a shard build is refused without a database of its own."""
+        runner = click.testing.CliRunner()
+
+        result = runner.invoke(cli, ["build", "--shard", "1/4"])
+
+        assert result.exit_code == 1
+        assert "needs its own database" in result.output
+        mock_processor_class.assert_not_called()
+
+    @patch.object(build_module, "TILProcessor")
+    @patch.object(build_module, "ConfigLoader")
     def test_build_command_error_handling(
         self, mock_loader_class: Mock, mock_processor_class: Mock
     ) -> None:
@@ -230,9 +342,9 @@ class TestCLI:
         assert result.exit_code == 1
         assert "Unexpected error: Test error" in result.output
 
-    @patch.object(cli_module, "ReadmeGenerator")
-    @patch.object(cli_module, "TILDatabase")
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(readme_module, "ReadmeGenerator")
+    @patch.object(readme_module, "TILDatabase")
+    @patch.object(readme_module, "ConfigLoader")
     def test_update_readme_command(
         self, mock_loader_class: Mock, mock_db_class: Mock, mock_generator_class: Mock
     ) -> None:
@@ -267,9 +379,9 @@ class TestCLI:
         assert result.exit_code == 0
         assert "# Index" in result.output
 
-    @patch.object(cli_module, "ReadmeGenerator")
-    @patch.object(cli_module, "TILDatabase")
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(readme_module, "ReadmeGenerator")
+    @patch.object(readme_module, "TILDatabase")
+    @patch.object(readme_module, "ConfigLoader")
     def test_update_readme_with_rewrite(
         self, mock_loader_class: Mock, mock_db_class: Mock, mock_generator_class: Mock
     ) -> None:
@@ -304,9 +416,9 @@ class TestCLI:
         assert "README updated successfully!" in result.output
         mock_generator.update_readme.assert_called_once()
 
-    @patch.object(cli_module, "ReadmeGenerator")
-    @patch.object(cli_module, "TILDatabase")
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(readme_module, "ReadmeGenerator")
+    @patch.object(readme_module, "TILDatabase")
+    @patch.object(readme_module, "ConfigLoader")
     def test_update_readme_with_output(
         self, mock_loader_class: Mock, mock_db_class: Mock, mock_generator_class: Mock
     ) -> None:
@@ -342,7 +454,7 @@ class TestCLI:
             assert Path("output.md").exists()
             assert Path("output.md").read_text() == "# Index\ncontent"
 
-    @patch.object(cli_module, "ConfigLoader")
+    @patch.object(readme_module, "ConfigLoader")
     def test_update_readme_no_database(self, mock_loader_class: Mock) -> None:
         """Test update-readme command when database doesn't exist."""
         runner = click.testing.CliRunner()
@@ -366,3 +478,150 @@ class TestCLI:
         assert result.exit_code == 1
         assert "Database not found" in result.output
         assert "Run 'til build' to create the database first" in result.output
+
+    def test_export_static_command_help(self) -> None:
+        """Test export-static command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["export-static", "--help"])
+
+        assert result.exit_code == 0
+        assert "Export the site as static HTML files" in result.output
+        assert "--output" in result.output
+        assert "--jobs" in result.output
+        assert "--force" in result.output
+
+    def test_diff_db_command_help(self) -> None:
+        """Test diff-db command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["diff-db", "--help"])
+
+        assert result.exit_code == 0
+        assert "row-level changes between two database builds" in result.output
+        assert "--output" in result.output
+
+    def test_apply_db_command_help(self) -> None:
+        """Test apply-db command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["apply-db", "--help"])
+
+        assert result.exit_code == 0
+        assert "Apply a delta written by diff-db" in result.output
+        assert "--no-rebuild" in result.output
+
+    def test_optimize_command_help(self) -> None:
+        """Test optimize command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["optimize", "--help"])
+
+        assert result.exit_code == 0
+        assert "Optimize the database for publishing" in result.output
+        assert "--page-size" in result.output
+        assert "--inspect-file" in result.output
+
+    def test_merge_db_command_help(self) -> None:
+        """Test merge-db command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["merge-db", "--help"])
+
+        assert result.exit_code == 0
+        assert "Merge partial databases" in result.output
+        assert "--db" in result.output
+
+    def test_watch_command_help(self) -> None:
+        """Test watch command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["watch", "--help"])
+
+        assert result.exit_code == 0
+        assert "Update the database as TIL files are edited" in result.output
+        assert "--debounce" in result.output
+        assert "--poll-interval" in result.output
+
+    def test_mock_api_command_help(self) -> None:
+        """Test mock-api command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["mock-api", "--help"])
+
+        assert result.exit_code == 0
+        assert "stand-in for the GitHub markdown API" in result.output
+        for option in ("--latency", "--distribution", "--rate-limit", "--error-rate"):
+            assert option in result.output
+
+    def test_daemon_command_help(self) -> None:
+        """Test daemon command help."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(cli, ["daemon", "--help"])
+
+        assert result.exit_code == 0
+        assert "long-running daemon" in result.output
+        for command in ("start", "send", "stop"):
+            assert command in result.output
+
+    def test_daemon_send_without_daemon(self, tmp_path: Path) -> None:
+        """Test sending to a missing daemon fails cleanly."""
+        runner = click.testing.CliRunner()
+        result = runner.invoke(
+            cli, ["daemon", "send", "ping", "--socket", str(tmp_path / "none.sock")]
+        )
+
+        assert result.exit_code == 1
+        assert "Cannot reach daemon" in result.output
+
+
+# Modules that make startup slow, which `til --help` must not import
+HEAVY_MODULES = ("git", "httpx", "sqlite_utils", "til.processor", "til.database")
+
+# Cumulative import time of til.cli, in microseconds
+IMPORT_BUDGET_US = 150_000
+
+
+class TestLazyCommands:
+    """Test subcommands load only when they run."""
+
+    def test_summaries_match_commands(self) -> None:
+        """Test the summaries shown by --help match each command's docstring."""
+        ctx = click.Context(cli)
+        for name, (_, summary) in COMMANDS.items():
+            command = cli.get_command(ctx, name)
+            assert command is not None
+            assert command.get_short_help_str(limit=200) == summary
+
+    def test_help_imports_no_commands(self) -> None:
+        """Test listing commands imports no command modules."""
+        script = (
+            "import sys\n"
+            "from click.testing import CliRunner\n"
+            "from til.cli import cli\n"
+            "CliRunner().invoke(cli, ['--help'])\n"
+            "CliRunner().invoke(cli, ['list-backups', '--help'])\n"
+            "print(' '.join(sorted(sys.modules)))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        loaded = set(result.stdout.split())
+
+        assert "til.commands.backup" in loaded
+        assert "til.commands.build" not in loaded
+        assert not loaded & set(HEAVY_MODULES)
+
+    def test_import_time_budget(self) -> None:
+        """Test importing the CLI stays within its start-up budget."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import til.cli"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        cumulative = {
+            line.split("|")[2].strip(): int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:")
+            and line.count("|") == 2
+            and line.split("|")[1].strip().isdigit()
+        }
+
+        assert cumulative["til"] < IMPORT_BUDGET_US
@@ -0,0 +1,78 @@
+"""Tests for content encodings."""
+
+import gzip
+
+import pytest
+
+from til.compression import (
+    available_encodings,
+    BROTLI,
+    compress_text,
+    decompress_text,
+    encode,
+    GZIP,
+    ZLIB,
+    ZSTD,
+)
+from til.exceptions import ConfigurationError
+
+
+def test_gzip_always_available() -> None:
+    """Test gzip is available without optional dependencies."""
+    assert GZIP in available_encodings()
+
+
+def test_encode_gzip_roundtrip() -> None:
+    """Test gzip output decompresses and is deterministic."""
+    content = b"<p>Hello</p>" * 50
+
+    encoded = encode(content, GZIP)
+
+    assert gzip.decompress(encoded) == content
+    assert encode(content, GZIP) == encoded
+    assert len(encoded) < len(content)
+
+
+def test_encode_brotli_roundtrip() -> None:
+    """Test brotli output decompresses when brotli is installed."""
+    brotli = pytest.importorskip("brotli")
+    content = b"<p>Hello</p>" * 50
+
+    assert brotli.decompress(encode(content, BROTLI)) == content
+
+
+def test_encode_unknown_encoding() -> None:
+    """Test unknown encodings are rejected."""
+    with pytest.raises(ConfigurationError, match="Unsupported content encoding"):
+        encode(b"content", "compress")
+
+
+def test_compress_text_zlib_roundtrip() -> None:
+    """Test zlib storage compression roundtrips unicode text."""
+    text = "Café — naïve résumé " * 20
+
+    compressed = compress_text(text, ZLIB)
+
+    assert isinstance(compressed, bytes)
+    assert len(compressed) < len(text.encode("utf-8"))
+    assert decompress_text(compressed) == text
+
+
+def test_compress_text_zstd_roundtrip() -> None:
+    """Test zstd storage compression when zstandard is installed."""
+    pytest.importorskip("zstandard")
+    text = "<p>zstd</p>" * 20
+
+    assert decompress_text(compress_text(text, ZSTD)) == text
+
+
+def test_decompress_text_passes_through_plain_values() -> None:
+    """Test uncompressed column values are returned unchanged."""
+    assert decompress_text("plain") == "plain"
+    assert decompress_text(None) is None
+
+
+def test_compress_text_unknown_codec() -> None:
+    """Test unknown storage codecs are rejected."""
+    with pytest.raises(ConfigurationError, match="Unsupported storage compression"):
+        compress_text("text", "lzma")
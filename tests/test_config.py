@@ -39,6 +39,10 @@ class TestTILConfig:
         assert isinstance(config.database_path, Path)
         assert config.database_path.name == "til.db"
         assert config.github_url_base == "https://github.com/jthodge/til"
+        assert config.feeds_path == config.root_path / "feeds"
+
+        config = TILConfig(feeds_dir=Path("/tmp/feeds"))
+        assert config.feeds_path == Path("/tmp/feeds")
 
     def test_custom_config_values(self) -> None:
         """Test creating config with custom values."""
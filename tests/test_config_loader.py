@@ -65,6 +65,59 @@ retry-delay = 30
             assert config.max_retries == 5
             assert config.retry_delay == 30
 
+    def test_load_toml_sources(self) -> None:
+        """Test loading federated sources from a TOML file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "wiki").mkdir()
+            config_file = Path(tmpdir) / "til.toml"
+            config_file.write_text(
+                """
+[til]
+source-workers = 2
+
+[[til.sources]]
+name = "wiki"
+root-path = "wiki"
+url-base = "https://wiki.example/pages"
+history = "mtime"
+
+[[til.sources]]
+name = "personal"
+root-path = "."
+github-repo = "someone/til"
+"""
+            )
+
+            config = ConfigLoader.load_config(
+                config_file=config_file,
+                root_path=Path(tmpdir),
+            )
+
+            assert config.source_workers == 2
+            assert [source.name for source in config.sources] == ["wiki", "personal"]
+            assert config.sources[0].root_path == Path(tmpdir) / "wiki"
+            assert config.sources[0].history == "mtime"
+            assert config.sources[1].github_repo == "someone/til"
+
+    def test_invalid_source(self) -> None:
+        """Test unknown source keys raise error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = Path(tmpdir) / "til.toml"
+            config_file.write_text(
+                """
+[[til.sources]]
+name = "wiki"
+root-path = "."
+repo = "acme/wiki"
+"""
+            )
+
+            with pytest.raises(ConfigurationError, match="Invalid source 'wiki'"):
+                ConfigLoader.load_config(
+                    config_file=config_file,
+                    root_path=Path(tmpdir),
+                )
+
     def test_cli_overrides_file(self) -> None:
         """Test CLI arguments override file configuration."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -108,6 +161,15 @@ database-name: file.db
             assert config.github_repo == "env/repo"
             assert config.database_name == "env.db"
 
+    def test_markdown_api_url_from_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the markdown API endpoint can point at a local server."""
+        monkeypatch.setenv("TIL_MARKDOWN_API_URL", "http://127.0.0.1:8766/markdown")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = ConfigLoader.load_config(root_path=Path(tmpdir))
+
+        assert config.markdown_api_url == "http://127.0.0.1:8766/markdown"
+
     def test_cli_overrides_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test CLI arguments override environment variables."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -114,6 +114,31 @@ class TestConfigValidation:
                     root_path=Path(tmpdir),
                 )
 
+    def test_invalid_storage_compression(self) -> None:
+        """Test unknown storage compression codec raises error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(ConfigurationError, match="Invalid storage_compression"):
+                TILConfig(
+                    storage_compression="lzma",
+                    root_path=Path(tmpdir),
+                )
+
+    def test_invalid_shard(self) -> None:
+        """Test malformed shard raises error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(ConfigurationError, match="Invalid shard"):
+                TILConfig(
+                    shard="3/2",
+                    database_name="shard-3.db",
+                    root_path=Path(tmpdir),
+                )
+
+    def test_shard_needs_own_database(self) -> None:
+        """Test a shard build is refused on the live database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(ConfigurationError, match="needs its own database"):
+                TILConfig(shard="1/4", root_path=Path(tmpdir))
+
     def test_non_existent_root_path(self) -> None:
         """Test non-existent root path raises error."""
         with pytest.raises(ConfigurationError, match="Root path does not exist"):
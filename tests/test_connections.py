@@ -0,0 +1,65 @@
+"""Tests for SQLite connection profiles."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from til.connections import connect, get_profile, PROFILES
+from til.exceptions import ConfigurationError
+
+
+def pragma(conn: sqlite3.Connection, name: str) -> object:
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_build_profile(temp_dir: Path) -> None:
+    """Test build connections use WAL with relaxed syncing."""
+    conn = connect(temp_dir / "til.db", "build")
+
+    assert pragma(conn, "journal_mode") == "wal"
+    assert pragma(conn, "synchronous") == 1  # NORMAL
+    assert pragma(conn, "cache_size") < 0
+    conn.close()
+
+
+def test_maintenance_profile(temp_dir: Path) -> None:
+    """Test the default profile keeps durable rollback journalling."""
+    conn = connect(temp_dir / "til.db")
+
+    assert pragma(conn, "journal_mode") == "delete"
+    assert pragma(conn, "synchronous") == 2  # FULL
+    # Every connection can read compressed columns
+    assert conn.execute("select til_decompress('text')").fetchone() == ("text",)
+    conn.close()
+
+
+@pytest.mark.parametrize("profile", ["serve", "validate"])
+def test_read_only_profiles(temp_dir: Path, profile: str) -> None:
+    """Test read profiles are query-only and memory mapped."""
+    db_path = temp_dir / "til.db"
+    with sqlite3.connect(db_path) as setup:
+        setup.execute("create table til (path text)")
+    setup.close()
+
+    conn = connect(db_path, profile)
+
+    assert pragma(conn, "query_only") == 1
+    assert pragma(conn, "mmap_size") > 0
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("insert into til values ('a')")
+    conn.close()
+
+
+def test_read_only_profile_missing_database(temp_dir: Path) -> None:
+    """Test read profiles do not create a missing database."""
+    with pytest.raises(sqlite3.OperationalError):
+        connect(temp_dir / "missing.db", "serve")
+    assert not (temp_dir / "missing.db").exists()
+
+
+def test_unknown_profile() -> None:
+    """Test unknown profiles are rejected."""
+    assert set(PROFILES) == {"build", "maintenance", "serve", "validate"}
+    with pytest.raises(ConfigurationError, match="Unknown connection profile"):
+        get_profile("fast")
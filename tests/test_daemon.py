@@ -0,0 +1,101 @@
+"""Tests for the build daemon."""
+
+import json
+import socket
+import threading
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+import httpx
+import pytest
+from git import Repo
+
+from til.config import TILConfig
+from til.daemon import BuildDaemon, send_request
+from til.exceptions import TILError
+
+
+@pytest.fixture
+def daemon(
+    temp_git_repo: Repo, mock_github_api: None, monkeypatch: pytest.MonkeyPatch
+) -> Generator[BuildDaemon, None, None]:
+    """Daemon serving the sample repository from a background thread."""
+    # Route the pooled client through the mocked API
+    monkeypatch.setattr(
+        httpx.Client, "post", lambda self, *args, **kwargs: httpx.post(*args, **kwargs)
+    )
+    root = Path(temp_git_repo.working_dir)
+    daemon = BuildDaemon(TILConfig(root_path=root), root / ".til.sock")
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if daemon.socket_path.exists():
+            break
+        time.sleep(0.01)
+    yield daemon
+    if thread.is_alive():
+        send_request("shutdown", socket_path=daemon.socket_path, timeout=5)
+        thread.join(5)
+
+
+def test_daemon_requests(daemon: BuildDaemon) -> None:
+    """Test build, README and validate requests share one warm processor."""
+    socket_path = daemon.socket_path
+
+    assert send_request("ping", socket_path=socket_path)["ok"] is True
+
+    first = send_request("build", socket_path=socket_path, timeout=30)
+    assert first["ok"] is True
+    assert first["result"] == {"entries": 3}
+    repository = daemon.processor.repository
+    assert repository is not None
+    assert repository._history is not None
+
+    second = send_request("build", socket_path=socket_path, timeout=30)
+    assert second["result"] == {"entries": 3}
+    assert daemon.processor.repository is repository
+
+    readme = send_request("update-readme", socket_path=socket_path)
+    assert "[Bash Test]" in readme["result"]["index"]
+
+    validate = send_request("validate", socket_path=socket_path)
+    assert validate["ok"] is True
+    assert validate["result"]["checks"]
+
+
+def test_daemon_rejects_bad_requests(daemon: BuildDaemon) -> None:
+    """Test malformed and unknown requests get errors, not a dead daemon."""
+    response = send_request("compile", socket_path=daemon.socket_path)
+    assert response["ok"] is False
+    assert "Unknown command" in response["error"]
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(daemon.socket_path))
+        sock.sendall(b"not json\n[1]\n")
+        with sock.makefile("rb") as stream:
+            assert "Invalid request" in json.loads(stream.readline())["error"]
+            assert "Invalid request" in json.loads(stream.readline())["error"]
+
+    assert send_request("ping", socket_path=daemon.socket_path)["ok"] is True
+
+
+def test_daemon_shutdown(daemon: BuildDaemon) -> None:
+    """Test shutdown stops the daemon and removes its socket."""
+    response = send_request("shutdown", socket_path=daemon.socket_path, timeout=5)
+    assert response["result"] == {"stopping": True}
+
+    for _ in range(100):
+        if not daemon.socket_path.exists():
+            break
+        time.sleep(0.01)
+    assert not daemon.socket_path.exists()
+    with pytest.raises(TILError, match="Cannot reach daemon"):
+        send_request("ping", socket_path=daemon.socket_path, timeout=1)
+
+
+def test_daemon_refuses_second_instance(daemon: BuildDaemon) -> None:
+    """Test a socket with a live daemon is not taken over."""
+    second = BuildDaemon(daemon.config, daemon.socket_path)
+    with pytest.raises(TILError, match="already listening"):
+        second.serve_forever()
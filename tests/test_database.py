@@ -7,7 +7,7 @@ import pytest
 import sqlite_utils
 
 from til.database import TILDatabase
-from til.exceptions import DatabaseError
+from til.exceptions import ConfigurationError, DatabaseError
 
 
 def test_til_database_initialization(temp_dir: Path) -> None:
@@ -177,6 +177,71 @@ def test_get_all_by_topic(temp_dir: Path) -> None:
     assert by_topic["python"][0]["title"] == "Python Test 1"
 
 
+def test_create_indexes(temp_dir: Path) -> None:
+    """Test creating the topic listing index."""
+    db_path = temp_dir / "test.db"
+    til_db = TILDatabase(db_path)
+
+    # No til table yet (should skip)
+    til_db.create_indexes()
+
+    record = create_test_record()
+    record["created_utc"] = "2023-01-01T00:00:00+00:00"
+    til_db.upsert_record(record)
+
+    til_db.create_indexes()
+    til_db.create_indexes()  # Idempotent
+
+    index_names = {index.name for index in til_db.get_table().indexes}
+    assert "til_topic_created" in index_names
+
+
+def test_refresh_aggregates(temp_dir: Path) -> None:
+    """Test materialising topic counts, totals and recent entries."""
+    db_path = temp_dir / "test.db"
+    til_db = TILDatabase(db_path)
+
+    # No til table yet (should skip)
+    til_db.refresh_aggregates()
+    assert "til_stats" not in til_db.db.table_names()
+
+    for i, (topic, day) in enumerate(
+        [("python", "01"), ("python", "03"), ("javascript", "02")]
+    ):
+        record = create_test_record(f"{topic}/test{i}.md")
+        record.update(
+            {
+                "title": f"Test {i}",
+                "slug": f"test{i}",
+                "topic": topic,
+                "created": f"2023-01-{day}T00:00:00",
+                "created_utc": f"2023-01-{day}T00:00:00+00:00",
+            }
+        )
+        til_db.upsert_record(record)
+
+    til_db.refresh_aggregates(recent_limit=2)
+
+    assert list(til_db.db["til_stats"].rows) == [{"total": 3, "topics": 2}]
+
+    topics = {row["topic"]: row for row in til_db.db["til_topics"].rows}
+    assert topics["python"]["count"] == 2
+    assert topics["python"]["latest_title"] == "Test 1"
+    assert topics["javascript"]["count"] == 1
+
+    recent = list(til_db.db["til_recent"].rows_where(order_by="rank"))
+    assert [row["title"] for row in recent] == ["Test 1", "Test 2"]
+
+    random_ids = [row["id"] for row in til_db.db["til_random"].rows]
+    assert random_ids == [1, 2, 3]
+
+    # Refreshing again replaces rather than appends
+    til_db.refresh_aggregates()
+    assert til_db.db["til_recent"].count == 3
+    assert til_db.db["til_random"].count == 3
+    assert til_db.db["til_stats"].count == 1
+
+
 def test_count(temp_dir: Path) -> None:
     """Test counting records."""
     db_path = temp_dir / "test.db"
@@ -224,3 +289,130 @@ def test_close(temp_dir: Path) -> None:
 
     # Verify database file still exists
     assert db_path.exists()
+
+
+def test_stamp_build(temp_dir: Path) -> None:
+    """Test stamping replaces the previous build ID."""
+    til_db = TILDatabase(temp_dir / "test.db")
+
+    first = til_db.stamp_build()
+    assert len(first) == 32
+    assert til_db.stamp_build("build-2") == "build-2"
+
+    rows = list(til_db.db["til_build"].rows)
+    assert len(rows) == 1
+    assert rows[0]["build_id"] == "build-2"
+    assert rows[0]["built_utc"].endswith("+00:00")
+
+
+def test_compressed_storage(temp_dir: Path) -> None:
+    """Test body and html are stored compressed and read back as text."""
+    til_db = TILDatabase(temp_dir / "test.db", compression="zlib")
+    til_db.upsert_record(
+        {
+            "path": "a.md",
+            "slug": "a",
+            "topic": "python",
+            "title": "Generators",
+            "body": "Lazy iteration with generators",
+            "html": "<p>Lazy iteration with generators</p>",
+            "created_utc": "2023-01-01T00:00:00+00:00",
+        }
+    )
+
+    stored = til_db.db.execute("select typeof(body), typeof(html) from til").fetchone()
+    assert stored == ("blob", "blob")
+
+    record = til_db.get_previous_record("a.md")
+    assert record is not None
+    assert record["body"] == "Lazy iteration with generators"
+    assert til_db.get_all_by_topic()["python"][0]["html"] == (
+        "<p>Lazy iteration with generators</p>"
+    )
+    assert til_db.db.execute("select til_decompress(html) from til").fetchone() == (
+        "<p>Lazy iteration with generators</p>",
+    )
+
+
+def test_compressed_storage_search(temp_dir: Path) -> None:
+    """Test search indexes decompressed bodies and survives switching modes."""
+    til_db = TILDatabase(temp_dir / "test.db", compression="zlib")
+    record = {
+        "path": "a.md",
+        "slug": "a",
+        "topic": "python",
+        "title": "Generators",
+        "body": "Lazy iteration",
+    }
+    til_db.upsert_record(record)
+    til_db.enable_search()
+
+    query = "select rowid from til_fts where til_fts match 'iteration'"
+    assert til_db.db.execute(query).fetchall() == [(1,)]
+
+    # Rewriting the rows as text restores the external-content index
+    TILDatabase(til_db.db_path).upsert_record(record)
+    til_db.enable_search()
+
+    assert til_db.get_table().detect_fts() == "til_fts"
+    assert til_db.db.execute(query).fetchall() == [(1,)]
+
+
+def test_invalid_compression(temp_dir: Path) -> None:
+    """Test unknown storage codecs are rejected."""
+    with pytest.raises(ConfigurationError, match="Unsupported storage compression"):
+        TILDatabase(temp_dir / "test.db", compression="lzma")
+
+
+def test_checkpoint_leaves_single_file(temp_dir: Path) -> None:
+    """Test a build database is folded back into one rollback-journal file."""
+    til_db = TILDatabase(temp_dir / "til.db", profile="build")
+    til_db.upsert_record(
+        {
+            "path": "content_python_a.md",
+            "slug": "a",
+            "topic": "python",
+            "title": "A",
+            "body": "About A",
+        }
+    )
+    assert (temp_dir / "til.db-wal").exists()
+
+    til_db.checkpoint()
+
+    assert til_db.db.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    assert not (temp_dir / "til.db-wal").exists()
+
+
+def test_in_memory_flush(temp_dir: Path) -> None:
+    """Test an in-memory database seeded from disk is written back whole."""
+    seed = TILDatabase(temp_dir / "til.db")
+    seed.upsert_record(
+        {
+            "path": "content_python_a.md",
+            "slug": "a",
+            "topic": "python",
+            "title": "A",
+            "body": "About A",
+        }
+    )
+    seed.db.execute("PRAGMA page_size=8192")
+    seed.db.execute("VACUUM")
+    seed.close()
+
+    memory = TILDatabase.in_memory(seed=temp_dir / "til.db")
+    memory.upsert_record(
+        {
+            "path": "content_python_b.md",
+            "slug": "b",
+            "topic": "python",
+            "title": "B",
+            "body": "About B",
+        }
+    )
+    memory.flush(temp_dir / "out.db")
+
+    flushed = TILDatabase(temp_dir / "out.db")
+    assert [row["title"] for row in flushed.get_table().rows] == ["A", "B"]
+    # The seed file itself is untouched
+    assert TILDatabase(temp_dir / "til.db").count() == 1
@@ -0,0 +1,168 @@
+"""Tests for row-level database deltas."""
+
+import gzip
+import json
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from til.database import TILDatabase
+from til.db_delta import apply_delta, create_delta, table_checksum
+from til.exceptions import DatabaseError
+
+
+def make_record(slug: str, title: str) -> dict:
+    """Build a TIL record in the python topic."""
+    return {
+        "path": f"content_python_{slug}.md",
+        "slug": slug,
+        "topic": "python",
+        "title": title,
+        "body": f"# {title}\n\nAbout {title}.",
+        "html": f"<p>About {title}.</p>",
+        "created": "2023-01-01T00:00:00",
+        "created_utc": "2023-01-01T00:00:00+00:00",
+        "updated": "2023-01-01T00:00:00",
+        "updated_utc": "2023-01-01T00:00:00+00:00",
+    }
+
+
+def build(
+    db_path: Path, records: list[dict], compression: Optional[str] = None
+) -> TILDatabase:
+    """Build a database holding the given records."""
+    til_db = TILDatabase(db_path, compression=compression)
+    for record in records:
+        til_db.upsert_record(record)
+    til_db.enable_search()
+    til_db.refresh_aggregates()
+    til_db.stamp_build(db_path.stem)
+    return til_db
+
+
+def test_round_trip(temp_dir: Path) -> None:
+    """Test applying a delta turns the base into the target."""
+    build(temp_dir / "base.db", [make_record("a", "Alpha"), make_record("b", "Beta")])
+    build(
+        temp_dir / "target.db",
+        [make_record("a", "Alpha v2"), make_record("c", "Gamma")],
+    )
+
+    summary = create_delta(
+        temp_dir / "base.db", temp_dir / "target.db", temp_dir / "til.delta.gz"
+    )
+    assert (summary.upserts, summary.deletes) == (2, 1)
+
+    shutil.copy(temp_dir / "base.db", temp_dir / "deployed.db")
+    deployed = TILDatabase(temp_dir / "deployed.db")
+    apply_delta(deployed, temp_dir / "til.delta.gz")
+
+    assert table_checksum(temp_dir / "deployed.db") == table_checksum(
+        temp_dir / "target.db"
+    )
+    assert {row["title"] for row in deployed.get_table().rows} == {
+        "Alpha v2",
+        "Gamma",
+    }
+    # Derived tables are rebuilt and the target's build ID stamped
+    assert deployed.db.execute(
+        "select count(*) from til_fts where til_fts match 'Gamma'"
+    ).fetchone() == (1,)
+    assert deployed.db.execute("select build_id from til_build").fetchone() == (
+        "target",
+    )
+
+
+def test_unchanged_delta_is_empty(temp_dir: Path) -> None:
+    """Test identical builds produce an empty, byte-identical delta."""
+    records = [make_record("a", "Alpha")]
+    build(temp_dir / "base.db", records)
+    build(temp_dir / "target.db", records)
+
+    first = create_delta(
+        temp_dir / "base.db", temp_dir / "target.db", temp_dir / "one.delta.gz"
+    )
+    create_delta(
+        temp_dir / "base.db", temp_dir / "target.db", temp_dir / "two.delta.gz"
+    )
+
+    assert (first.upserts, first.deletes) == (0, 0)
+    assert (temp_dir / "one.delta.gz").read_bytes() == (
+        temp_dir / "two.delta.gz"
+    ).read_bytes()
+
+
+def test_empty_base(temp_dir: Path) -> None:
+    """Test a delta from no base creates the tables it needs."""
+    build(temp_dir / "target.db", [make_record("a", "Alpha")])
+
+    summary = create_delta(None, temp_dir / "target.db", temp_dir / "til.delta.gz")
+    assert summary.upserts == 1
+
+    fresh = TILDatabase(temp_dir / "fresh.db")
+    apply_delta(fresh, temp_dir / "til.delta.gz")
+
+    assert table_checksum(temp_dir / "fresh.db") == table_checksum(
+        temp_dir / "target.db"
+    )
+
+
+def test_compressed_rows(temp_dir: Path) -> None:
+    """Test compressed blob columns survive the round trip."""
+    build(temp_dir / "base.db", [make_record("a", "Alpha")], compression="zlib")
+    build(
+        temp_dir / "target.db",
+        [make_record("a", "Alpha"), make_record("b", "Beta")],
+        compression="zlib",
+    )
+    create_delta(temp_dir / "base.db", temp_dir / "target.db", temp_dir / "d.gz")
+
+    shutil.copy(temp_dir / "base.db", temp_dir / "deployed.db")
+    deployed = TILDatabase(temp_dir / "deployed.db")
+    apply_delta(deployed, temp_dir / "d.gz")
+
+    record = deployed.get_previous_record("content_python_b.md")
+    assert record["body"] == "# Beta\n\nAbout Beta."
+
+
+def test_base_mismatch(temp_dir: Path) -> None:
+    """Test a delta is refused by a database it was not made from."""
+    build(temp_dir / "base.db", [make_record("a", "Alpha")])
+    build(temp_dir / "target.db", [make_record("b", "Beta")])
+    create_delta(temp_dir / "base.db", temp_dir / "target.db", temp_dir / "d.gz")
+
+    other = build(temp_dir / "other.db", [make_record("c", "Gamma")])
+    with pytest.raises(DatabaseError, match="base checksum"):
+        apply_delta(other, temp_dir / "d.gz")
+    assert [row["slug"] for row in other.get_table().rows] == ["c"]
+
+
+def test_target_mismatch_rolls_back(temp_dir: Path) -> None:
+    """Test a delta not producing its target leaves the database unchanged."""
+    build(temp_dir / "base.db", [make_record("a", "Alpha")])
+    build(temp_dir / "target.db", [make_record("b", "Beta")])
+    create_delta(temp_dir / "base.db", temp_dir / "target.db", temp_dir / "d.gz")
+    lines = gzip.decompress((temp_dir / "d.gz").read_bytes()).decode().splitlines()
+    header = json.loads(lines[0])
+    header["target_checksum"] = "0" * 64
+    lines[0] = json.dumps(header)
+    (temp_dir / "d.gz").write_bytes(gzip.compress("\n".join(lines).encode()))
+
+    shutil.copy(temp_dir / "base.db", temp_dir / "deployed.db")
+    deployed = TILDatabase(temp_dir / "deployed.db")
+    with pytest.raises(DatabaseError, match="delta target"):
+        apply_delta(deployed, temp_dir / "d.gz")
+
+    assert table_checksum(temp_dir / "deployed.db") == table_checksum(
+        temp_dir / "base.db"
+    )
+
+
+def test_not_a_delta(temp_dir: Path) -> None:
+    """Test reading a file that is not a delta fails."""
+    bad = temp_dir / "bad.gz"
+    bad.write_bytes(b"not gzip")
+    with pytest.raises(DatabaseError, match="Failed to read delta"):
+        apply_delta(TILDatabase(temp_dir / "til.db"), bad)
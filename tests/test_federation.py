@@ -0,0 +1,109 @@
+"""Tests for federated sources."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from til.config import SourceConfig, TILConfig
+from til.exceptions import ConfigurationError
+from til.federation import source_files, source_history, source_watermark
+
+
+def _write(root: Path, relative: str, text: str) -> Path:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_source_file_url(temp_dir: Path) -> None:
+    """Test entry URLs come from the repository or URL base."""
+    github = SourceConfig("team", temp_dir, github_repo="acme/wiki", branch="trunk")
+    hosted = SourceConfig("notes", temp_dir, url_base="https://notes.example/raw/")
+
+    assert (
+        github.file_url("content/python/a.md")
+        == "https://github.com/acme/wiki/blob/trunk/content/python/a.md"
+    )
+    assert hosted.file_url("content/python/a.md") == (
+        "https://notes.example/raw/content/python/a.md"
+    )
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"name": "Team Wiki", "github_repo": "acme/wiki"}, "Invalid source name"),
+        ({"name": "team", "github_repo": "acme"}, "Invalid GitHub repository"),
+        ({"name": "team"}, "needs a github_repo or url_base"),
+        (
+            {"name": "team", "github_repo": "acme/wiki", "history": "svn"},
+            "Invalid history",
+        ),
+    ],
+)
+def test_source_validation(temp_dir: Path, kwargs: dict, message: str) -> None:
+    """Test malformed sources are rejected."""
+    with pytest.raises(ConfigurationError, match=message):
+        SourceConfig(root_path=temp_dir, **kwargs)
+
+
+def test_sources_resolved_against_root(temp_dir: Path) -> None:
+    """Test relative source roots are resolved and must be unique and exist."""
+    (temp_dir / "wiki").mkdir()
+    config = TILConfig(
+        root_path=temp_dir,
+        sources=[SourceConfig("wiki", Path("wiki"), url_base="https://w")],
+    )
+    assert config.sources[0].root_path == temp_dir / "wiki"
+
+    with pytest.raises(ConfigurationError, match="Duplicate source names"):
+        TILConfig(
+            root_path=temp_dir,
+            sources=[
+                SourceConfig("wiki", temp_dir, url_base="https://a"),
+                SourceConfig("wiki", temp_dir, url_base="https://b"),
+            ],
+        )
+    with pytest.raises(ConfigurationError, match="not a directory"):
+        TILConfig(
+            root_path=temp_dir,
+            sources=[SourceConfig("gone", Path("gone"), url_base="https://g")],
+        )
+
+
+def test_source_watermark_tracks_content(temp_dir: Path) -> None:
+    """Test the watermark changes with files and link settings only."""
+    source = SourceConfig("notes", temp_dir, url_base="https://n", history="mtime")
+    note = _write(temp_dir, "content/python/a.md", "# A\n\nBody")
+    first = source_watermark(source, source_files(source))
+
+    assert source_watermark(source, source_files(source)) == first
+
+    os.utime(note, ns=(1, 1))
+    touched = source_watermark(source, source_files(source))
+    assert touched != first
+
+    _write(temp_dir, "content/python/b.md", "# B\n\nBody")
+    assert source_watermark(source, source_files(source)) != touched
+
+    moved = SourceConfig("notes", temp_dir, url_base="https://m", history="mtime")
+    assert source_watermark(moved, source_files(moved)) != source_watermark(
+        source, source_files(source)
+    )
+
+
+def test_source_history_backends(temp_dir: Path) -> None:
+    """Test mtime history reads file times and none falls back to build time."""
+    note = _write(temp_dir, "content/python/a.md", "# A\n\nBody")
+    os.utime(note, (1_600_000_000, 1_600_000_000))
+
+    mtime = SourceConfig("notes", temp_dir, url_base="https://n", history="mtime")
+    history = source_history(mtime, source_files(mtime))
+    assert history["content/python/a.md"]["created_utc"] == (
+        "2020-09-13T12:26:40+00:00"
+    )
+
+    none = SourceConfig("notes", temp_dir, url_base="https://n", history="none")
+    assert source_history(none, source_files(none)) == {}
@@ -0,0 +1,134 @@
+"""Tests for FeedGenerator class."""
+
+import gzip
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from til.database import TILDatabase
+from til.feed_generator import ATOM_NAMESPACE, FeedGenerator
+
+
+def add_til(til_db: TILDatabase, topic: str, slug: str, day: int) -> None:
+    """Insert a TIL created on the given day of January 2023."""
+    til_db.upsert_record(
+        {
+            "path": f"content_{topic}_{slug}.md",
+            "slug": slug,
+            "topic": topic,
+            "title": f"{topic} {slug}",
+            "body": f"About {slug}",
+            "html": f"<p>About {slug}</p>",
+            "created_utc": f"2023-01-{day:02d}T00:00:00+00:00",
+            "updated_utc": f"2023-01-{day:02d}T00:00:00+00:00",
+        }
+    )
+
+
+@pytest.fixture
+def til_db(temp_dir: Path) -> TILDatabase:
+    """Database with TILs in two topics."""
+    til_db = TILDatabase(temp_dir / "test.db")
+    add_til(til_db, "python", "lists", 1)
+    add_til(til_db, "python", "dicts", 2)
+    add_til(til_db, "bash", "loops", 3)
+    return til_db
+
+
+def entry_titles(path: Path) -> list[str]:
+    """Titles of the entries in an Atom feed, in document order."""
+    root = ET.fromstring(path.read_bytes())  # noqa: S314
+    return [
+        entry.findtext(f"{{{ATOM_NAMESPACE}}}title") or ""
+        for entry in root.iter(f"{{{ATOM_NAMESPACE}}}entry")
+    ]
+
+
+def test_generate_writes_feeds(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test writing the global and per-topic feeds."""
+    output_dir = temp_dir / "feeds"
+    written = FeedGenerator(til_db, output_dir).generate()
+
+    assert written == ["feed.atom", "topics/bash.atom", "topics/python.atom"]
+    assert entry_titles(output_dir / "feed.atom") == [
+        "bash loops",
+        "python dicts",
+        "python lists",
+    ]
+    assert entry_titles(output_dir / "topics/python.atom") == [
+        "python dicts",
+        "python lists",
+    ]
+
+    # Precompressed variant matches the feed
+    feed = (output_dir / "feed.atom").read_bytes()
+    assert gzip.decompress((output_dir / "feed.atom.gz").read_bytes()) == feed
+    assert b"&lt;p&gt;About loops&lt;/p&gt;" in feed
+
+
+def test_generate_limit(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test each feed keeps only the most recent entries."""
+    output_dir = temp_dir / "feeds"
+    FeedGenerator(til_db, output_dir, limit=1).generate()
+
+    assert entry_titles(output_dir / "feed.atom") == ["bash loops"]
+    assert entry_titles(output_dir / "topics/python.atom") == ["python dicts"]
+
+
+def test_generate_only_changed_topics(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test unchanged feeds are skipped and ETags stay stable."""
+    output_dir = temp_dir / "feeds"
+    generator = FeedGenerator(til_db, output_dir)
+    generator.generate()
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+
+    assert generator.generate() == []
+
+    add_til(til_db, "bash", "traps", 4)
+    assert generator.generate() == ["feed.atom", "topics/bash.atom"]
+
+    updated = json.loads((output_dir / "manifest.json").read_text())
+    assert (
+        updated["topics/python.atom"]["etag"] == manifest["topics/python.atom"]["etag"]
+    )
+    assert updated["topics/bash.atom"]["etag"] != manifest["topics/bash.atom"]["etag"]
+
+
+def test_generate_content_change(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test a feed is rewritten with a new ETag when only an entry's HTML changes."""
+    output_dir = temp_dir / "feeds"
+    generator = FeedGenerator(til_db, output_dir)
+    generator.generate()
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+
+    til_db.get_table().update(
+        "content_bash_loops.md", {"html": "<p>About loops, revised</p>"}
+    )
+    assert generator.generate() == ["feed.atom", "topics/bash.atom"]
+
+    updated = json.loads((output_dir / "manifest.json").read_text())
+    assert updated["topics/bash.atom"]["etag"] != manifest["topics/bash.atom"]["etag"]
+    assert b"revised" in (output_dir / "topics/bash.atom").read_bytes()
+
+
+def test_generate_removes_stale_topics(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test feeds for topics without entries are deleted."""
+    output_dir = temp_dir / "feeds"
+    generator = FeedGenerator(til_db, output_dir)
+    generator.generate()
+
+    til_db.get_table().delete("content_bash_loops.md")
+    generator.generate()
+
+    assert not (output_dir / "topics/bash.atom").exists()
+    assert not (output_dir / "topics/bash.atom.gz").exists()
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+    assert "topics/bash.atom" not in manifest
+
+
+def test_generate_empty_database(temp_dir: Path) -> None:
+    """Test generating feeds before any TILs exist."""
+    til_db = TILDatabase(temp_dir / "test.db")
+    assert FeedGenerator(til_db, temp_dir / "feeds").generate() == []
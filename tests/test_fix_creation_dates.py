@@ -0,0 +1,42 @@
+"""Tests for re-extracting creation dates from git history."""
+
+from pathlib import Path
+
+from git import Repo
+
+from til.database import TILDatabase
+from til.feed_generator import FeedGenerator
+from til.fix_creation_dates import fix_creation_dates
+
+
+def test_fix_regenerates_feeds(temp_git_repo: Repo, temp_dir: Path) -> None:
+    """Test fixed creation dates reach feeds written before the fix."""
+    til_db = TILDatabase(temp_dir / "til.db")
+    for slug in ("test-til-1", "test-til-2"):
+        til_db.upsert_record(
+            {
+                "path": f"content_python_{slug}.md",
+                "slug": slug,
+                "topic": "python",
+                "title": slug,
+                "body": f"About {slug}",
+                "html": f"<p>About {slug}</p>",
+                "created": "2025-05-18T00:00:00",
+                "created_utc": "2025-05-18T00:00:00+00:00",
+                "updated": "2025-05-18T00:00:00",
+                "updated_utc": "2025-05-18T00:00:00+00:00",
+            }
+        )
+    feeds_dir = temp_dir / "feeds"
+    FeedGenerator(til_db, feeds_dir).generate()
+    assert "2025-05-18" in (feeds_dir / "feed.atom").read_text()
+
+    fix_creation_dates(
+        til_db.db_path, Path(temp_git_repo.working_dir), feeds_dir=feeds_dir
+    )
+
+    created = {row["created_utc"] for row in til_db.get_table().rows}
+    assert "2025-05-18T00:00:00+00:00" not in created
+    feed = (feeds_dir / "feed.atom").read_text()
+    assert "2025-05-18" not in feed
+    assert all(value[:10] in feed for value in created)
@@ -3,13 +3,16 @@
 import subprocess
 from pathlib import Path
 
+import httpx
 import pytest
 import sqlite_utils
 from git import Repo
 
 from til.build_db import build_database
-from til.config import TILConfig
+from til.config import SourceConfig, TILConfig
 from til.database import TILDatabase
+from til.exceptions import DatabaseError
+from til.processor import TILProcessor
 from til.readme_generator import ReadmeGenerator
 
 
@@ -147,6 +150,142 @@ class TestFullPipeline:
         titles = {row["title"] for row in db["til"].rows}
         assert titles == {"First TIL", "Second TIL"}
 
+    @pytest.mark.parametrize("atomic_builds", [True, False])
+    def test_in_memory_build(
+        self, temp_git_repo: Repo, mock_github_api: None, atomic_builds: bool
+    ) -> None:
+        """Test an in-memory build writes the same database to disk once."""
+        root = Path(temp_git_repo.working_dir)
+        on_disk = TILConfig(root_path=root, database_name="disk.db")
+        in_memory = TILConfig(
+            root_path=root,
+            database_name="til.db",
+            atomic_builds=atomic_builds,
+            in_memory_build=True,
+        )
+
+        build_database(on_disk)
+        build_database(in_memory)
+        # A rebuild starts from the previous database
+        build_database(in_memory)
+
+        expected = sqlite_utils.Database(on_disk.database_path)
+        built = sqlite_utils.Database(in_memory.database_path)
+        assert [row["title"] for row in built["til"].rows_where(order_by="path")] == [
+            row["title"] for row in expected["til"].rows_where(order_by="path")
+        ]
+        assert (
+            built.execute(
+                "select count(*) from til_fts where til_fts match 'Python'"
+            ).fetchone()[0]
+            > 0
+        )
+        assert "til_topics" in built.table_names()
+        assert not (root / "til.db-wal").exists()
+        assert not (root / ".til.db.shadow").exists()
+
+    def test_sharded_build_and_merge(
+        self, temp_git_repo: Repo, mock_github_api: None
+    ) -> None:
+        """Test merging shard builds gives the same entries as a full build."""
+        root = Path(temp_git_repo.working_dir)
+        build_database(TILConfig(root_path=root, database_name="full.db"))
+        for number in (1, 2):
+            build_database(
+                TILConfig(
+                    root_path=root,
+                    database_name=f"shard-{number}.db",
+                    shard=f"{number}/2",
+                )
+            )
+
+        parts = [root / "shard-1.db", root / "shard-2.db"]
+        config = TILConfig(root_path=root, database_name="til.db")
+
+        # Merging one shard alone is refused
+        with pytest.raises(DatabaseError, match="cover shards"):
+            TILProcessor(config).merge_databases(parts[:1])
+
+        assert TILProcessor(config).merge_databases(parts) == 3
+
+        full = sqlite_utils.Database(root / "full.db")
+        merged = sqlite_utils.Database(config.database_path)
+        shard_paths = [
+            {row["path"] for row in sqlite_utils.Database(part)["til"].rows}
+            for part in parts
+        ]
+        assert not shard_paths[0] & shard_paths[1]
+        assert {row["path"] for row in merged["til"].rows} == {
+            row["path"] for row in full["til"].rows
+        }
+        assert "til_fts" in merged.table_names()
+        assert "til_topics" in merged.table_names()
+        assert "til_shard" not in merged.table_names()
+
+    def test_federated_build(
+        self,
+        temp_git_repo: Repo,
+        mock_github_api: None,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test several sources build into one database incrementally."""
+        root = Path(temp_git_repo.working_dir)
+        wiki = root / "wiki" / "content"
+        (wiki / "ops").mkdir(parents=True)
+        (wiki / "python").mkdir()
+        (wiki / "ops" / "deploy.md").write_text("# Deploys\n\nRoll forward.")
+        # Same topic and slug as an entry in the personal repository
+        (wiki / "python" / "test-til-1.md").write_text("# Wiki copy\n\nShadowed.")
+
+        renders = []
+        post = httpx.post
+        monkeypatch.setattr(
+            httpx,
+            "post",
+            lambda *args, **kwargs: renders.append(1) or post(*args, **kwargs),
+        )
+
+        personal = SourceConfig("personal", root, github_repo="someone/til")
+        team = SourceConfig(
+            "wiki", Path("wiki"), url_base="https://wiki.example", history="mtime"
+        )
+        config = TILConfig(root_path=root, sources=[personal, team])
+        build_database(config)
+
+        db = sqlite_utils.Database(config.database_path)
+        entries = {row["path"]: row for row in db["til"].rows}
+        assert len(entries) == 4
+        assert entries["content_python_test-til-1.md"]["source"] == "personal"
+        assert entries["content_ops_deploy.md"]["source"] == "wiki"
+        assert (
+            entries["content_ops_deploy.md"]["url"]
+            == "https://wiki.example/content/ops/deploy.md"
+        )
+        assert {row["source"] for row in db["til_sources"].rows} == {
+            "personal",
+            "wiki",
+        }
+
+        # Unchanged sources are skipped without rendering
+        renders.clear()
+        build_database(config)
+        assert renders == []
+        assert sqlite_utils.Database(config.database_path)["til"].count == 4
+
+        # Only the changed source is collected again
+        (wiki / "ops" / "backups.md").write_text("# Backups\n\nTest restores.")
+        build_database(config)
+        # The new entry and the shadowed copy, which is never stored
+        assert len(renders) == 2
+        db = sqlite_utils.Database(config.database_path)
+        assert db["til"].count == 5
+
+        # Entries of a source that is no longer configured are removed
+        build_database(TILConfig(root_path=root, sources=[personal]))
+        db = sqlite_utils.Database(config.database_path)
+        assert {row["source"] for row in db["til"].rows} == {"personal"}
+        assert db["til"].count == 3
+
     def test_cli_commands(
         self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch, mock_github_api: None
     ) -> None:
@@ -0,0 +1,81 @@
+"""Tests for build metrics."""
+
+from pathlib import Path
+
+from git import Repo
+
+from til.config import TILConfig
+from til.metrics import BuildMetrics, METRICS
+from til.processor import TILProcessor
+
+
+def samples(text: str) -> dict[str, float]:
+    """Sample values of an OpenMetrics exposition by series."""
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            values[series] = float(value)
+    return values
+
+
+def test_render_openmetrics() -> None:
+    """Test the exposition declares every metric and ends with EOF."""
+    metrics = BuildMetrics(render_buckets=(0.1, 1.0))
+    metrics.inc("til_files", 3, result="scanned")
+    metrics.inc("til_bytes_written", 120)
+    metrics.observe("til_render_latency_seconds", 0.1)
+    metrics.observe("til_render_latency_seconds", 0.5)
+    metrics.record_build(2.5, succeeded=True)
+
+    text = metrics.render()
+
+    assert text.endswith("# EOF\n")
+    for name, family in METRICS.items():
+        assert f"# TYPE {name} {family.type}\n" in text
+    values = samples(text)
+    assert values['til_files_total{result="scanned"}'] == 3
+    assert values['til_files_total{result="failed"}'] == 0
+    assert values["til_bytes_written_total"] == 120
+    assert values['til_render_latency_seconds_bucket{le="0.1"}'] == 1
+    assert values['til_render_latency_seconds_bucket{le="1.0"}'] == 2
+    assert values['til_render_latency_seconds_bucket{le="+Inf"}'] == 2
+    assert values["til_render_latency_seconds_count"] == 2
+    assert values["til_render_latency_seconds_sum"] == 0.6
+    assert values["til_build_duration_seconds"] == 2.5
+    assert values["til_build_success"] == 1
+
+
+def test_write_replaces_file(tmp_path: Path) -> None:
+    """Test metrics are written through a temporary file."""
+    path = tmp_path / "textfile" / "til.prom"
+    path.parent.mkdir()
+    path.write_text("stale\n")
+
+    BuildMetrics().write(path)
+
+    assert path.read_text().startswith("# TYPE til_files counter\n")
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_build_metrics(temp_git_repo: Repo, mock_github_api: None) -> None:
+    """Test a build counts its files, renders and writes."""
+    config = TILConfig(root_path=Path(temp_git_repo.working_dir))
+    metrics = BuildMetrics()
+    TILProcessor(config, metrics=metrics).build_database()
+
+    values = samples(metrics.render())
+    assert values['til_files_total{result="scanned"}'] == 3
+    assert values['til_files_total{result="rendered"}'] == 3
+    assert values['til_files_total{result="failed"}'] == 0
+    assert values["til_render_latency_seconds_count"] == 3
+    assert values["til_bytes_written_total"] > 0
+    assert values["til_fts_rebuild_seconds"] > 0
+    assert values["til_build_success"] == 1
+
+    # A rebuild reuses the stored HTML
+    metrics = BuildMetrics()
+    TILProcessor(config, metrics=metrics).build_database()
+    values = samples(metrics.render())
+    assert values['til_files_total{result="skipped"}'] == 3
+    assert values['til_files_total{result="rendered"}'] == 0
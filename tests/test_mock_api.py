@@ -0,0 +1,161 @@
+"""Tests for the stand-in markdown API server."""
+
+from collections.abc import Iterator
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from til.config import TILConfig
+from til.exceptions import APIError, ConfigurationError, RenderingError
+from til.metrics import BuildMetrics
+from til.mock_api import MockAPIConfig, MockMarkdownAPI
+from til.renderer import MarkdownRenderer
+
+
+@pytest.fixture
+def api() -> Iterator[MockMarkdownAPI]:
+    """Stand-in API with no latency or faults."""
+    with MockMarkdownAPI() as server:
+        yield server
+
+
+def renderer_for(api: MockMarkdownAPI, **kwargs: int) -> MarkdownRenderer:
+    """Renderer sending requests to the stand-in API."""
+    config = TILConfig(github_token="test_token", markdown_api_url=api.url, **kwargs)
+    return MarkdownRenderer(config, metrics=BuildMetrics())
+
+
+def test_renders_through_markdown_api_url(api: MockMarkdownAPI) -> None:
+    """Test the renderer uses the configured endpoint."""
+    renderer = renderer_for(api)
+
+    assert renderer.render("One <b>\n\nTwo") == "<p>One &lt;b&gt;</p>\n<p>Two</p>"
+    assert api.stats == {200: 1}
+
+
+def test_rate_limit_headers(api: MockMarkdownAPI) -> None:
+    """Test responses carry GitHub's rate limit headers."""
+    api.config.rate_limit = 2
+    with httpx.Client() as client:
+        responses = [client.post(api.url, json={"text": "Hi"}) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 403]
+    assert [r.headers["x-ratelimit-remaining"] for r in responses] == ["1", "0", "0"]
+    assert responses[0].headers["x-ratelimit-limit"] == "2"
+    assert int(responses[0].headers["x-ratelimit-reset"]) > 0
+    assert "API rate limit exceeded" in responses[2].json()["message"]
+
+
+def test_rate_limit_window_restores_budget() -> None:
+    """Test the budget is restored once the window has passed."""
+    api = MockMarkdownAPI(MockAPIConfig(rate_limit=1, rate_limit_window=60))
+    api.stop()
+
+    with patch("til.mock_api.time.monotonic", side_effect=[0, 1, 61]):
+        api._window_started = 0
+        statuses = [api.respond(b'{"text": "Hi"}')[0] for _ in range(3)]
+
+    assert statuses == [200, 403, 200]
+
+
+@patch("time.sleep")
+def test_renderer_backs_off_when_rate_limited(
+    mock_sleep: Mock, api: MockMarkdownAPI
+) -> None:
+    """Test the renderer retries rate limited requests after backing off."""
+    api.config.rate_limit = 0
+    renderer = renderer_for(api, max_retries=3, retry_delay=1)
+
+    with pytest.raises(RenderingError, match="rate limit"):
+        renderer.render("# Test")
+
+    assert api.stats == {403: 3}
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+    assert renderer.metrics is not None
+    assert renderer.metrics.values["til_api_rate_limited"][()] == 3
+
+
+@patch("time.sleep")
+def test_injected_server_errors_are_retried(
+    mock_sleep: Mock, api: MockMarkdownAPI
+) -> None:
+    """Test injected 5xx responses exhaust the renderer's retries."""
+    api.config.error_rate = 1.0
+    api.config.error_status = 503
+    renderer = renderer_for(api, max_retries=2, retry_delay=1)
+
+    with pytest.raises(RenderingError, match="503"):
+        renderer.render("# Test")
+
+    assert api.stats == {503: 2}
+    assert renderer.metrics is not None
+    sleeps = renderer.metrics.values["til_api_backoff_sleeps"]
+    assert sleeps[(("reason", "status"),)] == 1
+
+
+def test_injected_faults_are_seeded() -> None:
+    """Test a seed gives the same faults on every run."""
+
+    def statuses() -> list[int]:
+        api = MockMarkdownAPI(MockAPIConfig(error_rate=0.3, forbidden_rate=0.2, seed=7))
+        api.stop()
+        return [api.respond(b'{"text": "Hi"}')[0] for _ in range(50)]
+
+    first = statuses()
+    assert first == statuses()
+    assert {200, 403, 502} <= set(first)
+
+
+def test_secondary_rate_limit_is_retryable(api: MockMarkdownAPI) -> None:
+    """Test injected 403s are ones the renderer retries, not fatal errors."""
+    api.config.forbidden_rate = 1.0
+    renderer = renderer_for(api, max_retries=1)
+
+    with pytest.raises(RenderingError, match="rate limit") as excinfo:
+        renderer.render("# Test")
+
+    assert not isinstance(excinfo.value, APIError)
+    assert api.stats == {403: 1}
+
+
+@pytest.mark.parametrize(
+    ("distribution", "jitter"),
+    [("fixed", 0.0), ("uniform", 0.05), ("exponential", 0.0), ("lognormal", 0.5)],
+)
+def test_latency_distributions(distribution: str, jitter: float) -> None:
+    """Test sampled latencies are positive and centred on the mean."""
+    api = MockMarkdownAPI(
+        MockAPIConfig(latency=0.1, distribution=distribution, jitter=jitter, seed=1)
+    )
+    api.stop()
+
+    samples = [api.sample_latency() for _ in range(2000)]
+
+    assert min(samples) >= 0
+    assert sum(samples) / len(samples) == pytest.approx(0.1, rel=0.15)
+
+
+def test_bad_requests(api: MockMarkdownAPI) -> None:
+    """Test malformed requests get GitHub's error statuses."""
+    with httpx.Client() as client:
+        assert client.post(api.url, content=b"not json").status_code == 400
+        assert client.post(api.url, json={"mode": "gfm"}).status_code == 422
+        assert client.post(api.url.replace("markdown", "other")).status_code == 404
+        assert client.get(api.url).status_code == 405
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"distribution": "pareto"},
+        {"render": "commonmark"},
+        {"error_rate": 1.5},
+        {"error_status": 404},
+        {"latency": -1.0},
+    ],
+)
+def test_config_validation(settings: dict[str, object]) -> None:
+    """Test impossible settings are rejected."""
+    with pytest.raises(ConfigurationError):
+        MockAPIConfig(**settings)  # type: ignore[arg-type]
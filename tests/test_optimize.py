@@ -0,0 +1,81 @@
+"""Tests for database optimization."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from til.database import TILDatabase
+from til.exceptions import ConfigurationError
+from til.optimize import (
+    choose_page_size,
+    optimize_database,
+    PAGE_SIZES,
+    write_inspect_file,
+)
+
+
+@pytest.fixture
+def db_path(temp_dir: Path) -> Path:
+    """Database with searchable TILs of about 6KB each."""
+    db_path = temp_dir / "til.db"
+    til_db = TILDatabase(db_path)
+    for i in range(20):
+        body = f"# Entry {i}\n\n" + "word " * 600
+        til_db.upsert_record(
+            {
+                "path": f"content_python_{i}.md",
+                "slug": str(i),
+                "topic": "python",
+                "title": f"Entry {i}",
+                "body": body,
+                "html": f"<p>{body}</p>",
+            }
+        )
+    til_db.enable_search()
+    til_db.close()
+    return db_path
+
+
+def test_choose_page_size(db_path: Path) -> None:
+    """Test the page size fits a typical entry on one page."""
+    conn = sqlite3.connect(db_path)
+    assert choose_page_size(conn) == 8192
+    conn.close()
+
+    empty = sqlite3.connect(":memory:")
+    assert choose_page_size(empty) == PAGE_SIZES[0]
+
+
+def test_optimize_database(db_path: Path) -> None:
+    """Test optimizing rewrites the file and keeps search working."""
+    result = optimize_database(db_path)
+
+    assert result.page_size == 8192
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA page_size").fetchone() == (8192,)
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    assert conn.execute("select count(*) from sqlite_stat1").fetchone()[0] > 0
+    assert conn.execute(
+        "select count(*) from til_fts where til_fts match 'word'"
+    ).fetchone() == (20,)
+    conn.close()
+
+
+def test_optimize_database_invalid_page_size(db_path: Path) -> None:
+    """Test unsupported page sizes are rejected."""
+    with pytest.raises(ConfigurationError, match="page_size"):
+        optimize_database(db_path, page_size=3000)
+
+
+def test_write_inspect_file(db_path: Path, temp_dir: Path) -> None:
+    """Test inspect data matches the format Datasette reads."""
+    inspect_path = temp_dir / "inspect-data.json"
+    write_inspect_file(db_path, inspect_path)
+
+    data = json.loads(inspect_path.read_text())
+    assert data["til"]["file"] == "til.db"
+    assert data["til"]["size"] == db_path.stat().st_size
+    assert data["til"]["tables"]["til"] == {"count": 20}
+    assert len(data["til"]["hash"]) == 64
@@ -0,0 +1,350 @@
+"""Tests for the Datasette plugins in src/plugins."""
+
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from datasette.app import Datasette
+from datasette.plugins import pm
+
+from til.database import TILDatabase
+from til.feed_generator import FeedGenerator
+
+
+PLUGINS_DIR = Path(__file__).parent.parent / "src" / "plugins"
+TEMPLATES_DIR = Path(__file__).parent.parent / "src" / "templates"
+
+
+def load_plugin(name: str) -> Any:
+    """Plugin module as registered by Datasette from the plugins directory."""
+    Datasette(plugins_dir=str(PLUGINS_DIR))
+    return pm.get_plugin(f"{name}.py")
+
+
+@pytest.fixture
+def til_db(temp_dir: Path) -> TILDatabase:
+    """Stamped database named til.db, as the plugins expect."""
+    til_db = TILDatabase(temp_dir / "til.db")
+    til_db.upsert_record(
+        {
+            "path": "content_python_lists.md",
+            "slug": "lists",
+            "topic": "python",
+            "title": "Lists",
+            "body": "About lists",
+            "html": "<p>About lists</p>",
+            "created": "2023-01-01T00:00:00",
+            "created_utc": "2023-01-01T00:00:00+00:00",
+            "updated": "2023-01-01T00:00:00",
+            "updated_utc": "2023-01-01T00:00:00+00:00",
+        }
+    )
+    til_db.refresh_aggregates()
+    til_db.create_related_tables()
+    til_db.stamp_build("build-1")
+    return til_db
+
+
+def serve(
+    til_db: TILDatabase, mutable: bool = False, plugins: Optional[dict] = None
+) -> Datasette:
+    """Datasette instance serving the database with the site templates."""
+    files = [str(til_db.db_path)]
+    return Datasette(
+        files=files if mutable else [],
+        immutables=[] if mutable else files,
+        plugins_dir=str(PLUGINS_DIR),
+        template_dir=str(TEMPLATES_DIR),
+        metadata={"plugins": plugins or {}},
+    )
+
+
+def get(til_db: TILDatabase, path: str, **headers: str) -> Any:
+    """Request a path from an immutable Datasette instance."""
+    return asyncio.run(serve(til_db).client.get(path, headers=headers))
+
+
+def get_all(datasette: Datasette, *requests: tuple[str, dict[str, str]]) -> list:
+    """Make several requests against one Datasette instance, in order."""
+
+    async def run() -> list:
+        return [
+            await datasette.client.get(path, headers=headers)
+            for path, headers in requests
+        ]
+
+    return asyncio.run(run())
+
+
+def test_http_cache_headers(til_db: TILDatabase) -> None:
+    """Test successful responses carry the build validators."""
+    response = get(til_db, "/til/til.json")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == 'W/"build-1"'
+    assert response.headers["last-modified"].endswith(" GMT")
+    assert response.headers["cache-control"].startswith("public")
+
+
+@pytest.mark.parametrize(
+    "if_none_match", ['W/"build-1"', '"build-1"', '"other", W/"build-1"', "*"]
+)
+def test_http_cache_if_none_match(til_db: TILDatabase, if_none_match: str) -> None:
+    """Test a matching If-None-Match is answered with 304."""
+    response = get(til_db, "/til/til.json", **{"if-none-match": if_none_match})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == 'W/"build-1"'
+
+
+def test_http_cache_stale_etag(til_db: TILDatabase) -> None:
+    """Test an ETag from a previous build gets a full response."""
+    response = get(til_db, "/til/til.json", **{"if-none-match": 'W/"build-0"'})
+
+    assert response.status_code == 200
+
+
+def test_http_cache_if_modified_since(til_db: TILDatabase) -> None:
+    """Test If-Modified-Since is compared with the build time."""
+    last_modified = get(til_db, "/til/til.json").headers["last-modified"]
+
+    response = get(til_db, "/til/til.json", **{"if-modified-since": last_modified})
+    assert response.status_code == 304
+
+    response = get(
+        til_db,
+        "/til/til.json",
+        **{"if-modified-since": "Thu, 01 Jan 1970 00:00:00 GMT"},
+    )
+    assert response.status_code == 200
+
+
+def test_http_cache_skips_ad_hoc_queries(til_db: TILDatabase) -> None:
+    """Test random SQL results are neither revalidated nor stored."""
+    path = "/til.json?sql=select+random()+as+value&_shape=array"
+    first, second, page, page_again = get_all(
+        serve(til_db),
+        (path, {}),
+        (path, {"if-none-match": 'W/"build-1"'}),
+        ("/til?sql=select+random()", {}),
+        ("/til?sql=select+random()", {}),
+    )
+
+    for response in (first, second, page, page_again):
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "no-store"
+        assert "x-page-cache" not in response.headers
+    assert first.json()[0]["value"] != second.json()[0]["value"]
+
+
+def test_http_cache_skips_unstamped_database(temp_dir: Path) -> None:
+    """Test databases without a build stamp are served uncached."""
+    til_db = TILDatabase(temp_dir / "til.db")
+    til_db.db["til"].insert({"path": "a.md"}, pk="path")
+
+    response = get(til_db, "/til/til.json")
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_redirects(til_db: TILDatabase) -> None:
+    """Test legacy URLs redirect to their current location."""
+    response = get(til_db, "/til/til/python_lists.md")
+    assert response.status_code == 301
+    assert response.headers["location"] == "/python/lists"
+
+    response = get(til_db, "/til/feed.atom")
+    assert response.status_code == 301
+    assert response.headers["location"] == "/feeds/feed.atom"
+
+    response = get(til_db, "/tils/feed_by_topic.atom?topic=python")
+    assert response.status_code == 301
+    assert response.headers["location"] == "/feeds/topics/python.atom"
+
+
+def test_feeds_served_with_manifest_etags(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test feeds carry their own ETag and gzip variant, not the build ID."""
+    feeds_dir = temp_dir / "feeds"
+    FeedGenerator(til_db, feeds_dir).generate()
+    etag = json.loads((feeds_dir / "manifest.json").read_text())["feed.atom"]["etag"]
+    datasette = Datasette(
+        immutables=[str(til_db.db_path)],
+        plugins_dir=str(PLUGINS_DIR),
+        static_mounts=[("feeds", str(feeds_dir))],
+    )
+
+    gzipped, identity, revalidated, missing = get_all(
+        datasette,
+        ("/feeds/feed.atom", {"accept-encoding": "gzip"}),
+        ("/feeds/feed.atom", {"accept-encoding": "identity"}),
+        ("/feeds/feed.atom", {"if-none-match": etag}),
+        ("/feeds/topics/missing.atom", {}),
+    )
+
+    feed = (feeds_dir / "feed.atom").read_bytes()
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == f'{etag[:-1]}-gzip"'
+    assert gzipped.content == feed
+    assert identity.headers["etag"] == etag
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["content-type"].startswith("application/atom+xml")
+    assert identity.content == feed
+    assert revalidated.status_code == 304
+    assert missing.status_code == 404
+    # The build ID of http_cache would invalidate every feed on each deploy
+    assert all(r.headers.get("etag") != 'W/"build-1"' for r in (gzipped, identity))
+
+
+def test_page_cache_hit(til_db: TILDatabase) -> None:
+    """Test a template page is rendered once and then served from memory."""
+    first, second = get_all(serve(til_db), ("/python", {}), ("/python", {}))
+
+    assert first.status_code == 200
+    assert first.headers["x-page-cache"] == "miss"
+    assert second.headers["x-page-cache"] == "hit"
+    assert second.text == first.text
+    assert second.headers["etag"] == 'W/"build-1"'
+
+
+def test_page_cache_encodings(til_db: TILDatabase) -> None:
+    """Test detail pages are compressed once and served by Accept-Encoding."""
+    miss, hit, identity = get_all(
+        serve(til_db),
+        ("/python/lists", {"accept-encoding": "gzip"}),
+        ("/python/lists", {"accept-encoding": "br;q=0, gzip"}),
+        ("/python/lists", {"accept-encoding": "identity"}),
+    )
+
+    for response in (miss, hit):
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert "About lists" in response.text
+    assert hit.headers["x-page-cache"] == "hit"
+    assert "content-encoding" not in identity.headers
+    assert identity.text == miss.text
+
+
+def test_page_cache_skips_cookies_and_json(til_db: TILDatabase) -> None:
+    """Test requests with cookies and non-HTML responses are not cached."""
+    responses = get_all(
+        serve(til_db),
+        ("/python", {"cookie": "ds_actor=x"}),
+        ("/python", {"cookie": "ds_actor=x"}),
+        ("/til/til.json", {}),
+        ("/til/til.json", {}),
+    )
+
+    assert all("x-page-cache" not in r.headers for r in responses)
+
+
+def test_page_cache_keyed_by_build(til_db: TILDatabase) -> None:
+    """Test a new build stamp bypasses pages cached for the previous build."""
+    datasette = serve(til_db, mutable=True)
+    get_all(datasette, ("/python", {}))
+
+    til_db.stamp_build("build-2")
+    (response,) = get_all(datasette, ("/python", {}))
+
+    assert response.headers["x-page-cache"] == "miss"
+
+
+def test_page_cache_warm(til_db: TILDatabase) -> None:
+    """Test warming renders the index, topic and recent entry pages."""
+    datasette = serve(til_db)
+
+    async def run() -> tuple[int, Any]:
+        warmed = await load_plugin("page_cache").warm_page_cache(datasette)
+        return warmed, await datasette.client.get("/python/lists")
+
+    warmed, response = asyncio.run(run())
+
+    # /, /all, /python and /python/lists
+    assert warmed == 4
+    assert response.headers["x-page-cache"] == "hit"
+
+
+def test_page_cache_lru_eviction() -> None:
+    """Test least recently used pages are evicted to stay within budget."""
+    cache = load_plugin("page_cache").PageCache(max_bytes=25)
+    cache.put(("/a", b"", "1"), [], b"a" * 10)
+    cache.put(("/b", b"", "1"), [], b"b" * 10)
+    cache.get(("/a", b"", "1"))
+    cache.put(("/c", b"", "1"), [], b"c" * 10)
+
+    assert set(cache.entries) == {("/a", b"", "1"), ("/c", b"", "1")}
+    assert cache.size == 20
+
+    # Pages larger than the whole budget are never stored
+    cache.put(("/d", b"", "1"), [], b"d" * 30)
+    assert ("/d", b"", "1") not in cache.entries
+
+
+def test_precompressed_static_pages(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test exported pages are served from disk with their encoded variant."""
+    static_dir = temp_dir / "site"
+    (static_dir / "python").mkdir(parents=True)
+    (static_dir / "python/index.html").write_bytes(b"<h1>static</h1>")
+    (static_dir / "python/index.html.gz").write_bytes(gzip.compress(b"<h1>static</h1>"))
+
+    datasette = serve(
+        til_db, plugins={"precompressed": {"static_dir": str(static_dir)}}
+    )
+    encoded, plain, dynamic = get_all(
+        datasette,
+        ("/python", {"accept-encoding": "gzip, deflate"}),
+        ("/python", {"accept-encoding": "identity"}),
+        ("/python/lists", {"accept-encoding": "gzip"}),
+    )
+
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.content == b"<h1>static</h1>"
+    assert plain.content == b"<h1>static</h1>"
+    assert "content-encoding" not in plain.headers
+    # Pages missing from the export fall through to Datasette
+    assert "About lists" in dynamic.text
+
+
+def test_decompress_compressed_entry(temp_dir: Path) -> None:
+    """Test detail pages render HTML stored compressed."""
+    til_db = TILDatabase(temp_dir / "til.db", compression="zlib")
+    til_db.upsert_record(
+        {
+            "path": "content_python_lists.md",
+            "slug": "lists",
+            "topic": "python",
+            "title": "Lists",
+            "body": "About lists",
+            "html": "<p>Compressed lists</p>",
+            "created": "2023-01-01T00:00:00",
+            "created_utc": "2023-01-01T00:00:00+00:00",
+        }
+    )
+    til_db.refresh_aggregates()
+    til_db.create_related_tables()
+
+    (response,) = get_all(serve(til_db), ("/python/lists", {}))
+
+    assert response.status_code == 200
+    assert "<p>Compressed lists</p>" in response.text
+
+
+def test_sqlite_tuning_read_only_til(til_db: TILDatabase) -> None:
+    """Test til.db connections are memory mapped and query-only."""
+    datasette = serve(til_db, mutable=True)
+
+    async def pragmas() -> tuple:
+        db = datasette.get_database("til")
+        query_only = (await db.execute("PRAGMA query_only")).first()[0]
+        mmap_size = (await db.execute("PRAGMA mmap_size")).first()[0]
+        return query_only, mmap_size
+
+    query_only, mmap_size = asyncio.run(pragmas())
+
+    assert query_only == 1
+    assert mmap_size == load_plugin("sqlite_tuning").MMAP_SIZE
@@ -4,10 +4,13 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+from git import Repo
 
+from til.build_db import build_database
 from til.config import TILConfig
 from til.exceptions import FileProcessingError, RepositoryError
-from til.processor import TILProcessor
+from til.processor import TILProcessor, UpdateSummary
+from til.profiling import BuildProfiler
 
 
 def test_til_processor_initialization(temp_dir: Path) -> None:
@@ -23,8 +26,8 @@ def test_til_processor_initialization(temp_dir: Path) -> None:
 
         assert processor.config == config
         mock_git.assert_called_once_with(config.root_path)
-        mock_renderer.assert_called_once_with(config)
-        mock_db.assert_called_once_with(config.database_path)
+        mock_renderer.assert_called_once_with(config, metrics=None)
+        mock_db.assert_called_once_with(config.database_path, compression=None)
 
 
 def test_til_processor_initialization_git_failure(temp_dir: Path) -> None:
@@ -220,6 +223,7 @@ def test_process_all_files(temp_dir: Path) -> None:
         # Verify all files were processed
         assert mock_db.upsert_record.call_count == 3
         assert mock_db.enable_search.called
+        assert mock_db.refresh_aggregates.called
 
         # Check logging
         mock_logger.info.assert_any_call("Found 3 markdown files")
@@ -265,9 +269,126 @@ def test_build_database(temp_dir: Path) -> None:
         patch("til.processor.GitRepository"),
         patch("til.processor.MarkdownRenderer"),
         patch("til.processor.TILDatabase"),
+        patch("til.processor.ShadowBuild") as mock_shadow,
         patch.object(TILProcessor, "process_all_files") as mock_process,
     ):
         processor = TILProcessor(config)
         processor.build_database()
 
         mock_process.assert_called_once()
+        mock_shadow.return_value.validate.assert_called_once()
+        mock_shadow.return_value.commit.assert_called_once()
+
+
+def test_build_database_failure_keeps_live_database(temp_dir: Path) -> None:
+    """Test a failed atomic build discards the shadow and keeps the database."""
+    config = TILConfig(root_path=temp_dir)
+
+    with (
+        patch("til.processor.GitRepository"),
+        patch("til.processor.MarkdownRenderer"),
+        patch("til.processor.TILDatabase") as mock_db,
+        patch("til.processor.ShadowBuild") as mock_shadow,
+        patch.object(
+            TILProcessor,
+            "process_all_files",
+            side_effect=FileProcessingError("No files were successfully processed"),
+        ),
+    ):
+        processor = TILProcessor(config)
+        live = processor.database
+
+        with pytest.raises(FileProcessingError):
+            processor.build_database()
+
+        mock_shadow.return_value.commit.assert_not_called()
+        mock_shadow.return_value.discard.assert_called_once()
+        assert processor.database is live
+        assert mock_db.call_count == 2
+
+
+def test_update_files(temp_git_repo: Repo, mock_github_api: None) -> None:
+    """Test changed files are applied without a full build."""
+    root = Path(temp_git_repo.working_dir)
+    config = TILConfig(root_path=root)
+    build_database(config)
+
+    processor = TILProcessor(config)
+    db = processor.database.db
+    build_id = db.execute("select build_id from til_build").fetchone()[0]
+    created = processor.database.get_previous_record("content_python_test-til-1.md")[
+        "created_utc"
+    ]
+
+    python_dir = root / "content" / "python"
+    (python_dir / "test-til-1.md").write_text("# Test TIL 1\n\nNow about walruses.")
+    (python_dir / "test-til-2.md").unlink()
+    (python_dir / "new.md").write_text("# New\n\nFresh entry.")
+
+    summary = processor.update_files(
+        [
+            python_dir / "test-til-1.md",
+            python_dir / "test-til-2.md",
+            python_dir / "new.md",
+            root / "content" / "bash" / "bash-test.md",
+        ]
+    )
+
+    assert summary == UpdateSummary(updated=2, deleted=1, errors=0)
+    edited = processor.database.get_previous_record("content_python_test-til-1.md")
+    assert edited["created_utc"] == created
+    assert "walruses" in edited["html"]
+    assert (
+        processor.database.get_previous_record("content_python_test-til-2.md") is None
+    )
+    assert [
+        row[0]
+        for row in db.execute(
+            "select path from til where rowid in "
+            "(select rowid from til_fts where til_fts match 'walruses')"
+        )
+    ] == ["content_python_test-til-1.md"]
+    assert db.execute("select total from til_stats").fetchone()[0] == 3
+    assert db.execute("select build_id from til_build").fetchone()[0] != build_id
+
+
+def test_watch_applies_batches(temp_git_repo: Repo, mock_github_api: None) -> None:
+    """Test watch applies each batch and checkpoints when it stops."""
+    root = Path(temp_git_repo.working_dir)
+    config = TILConfig(root_path=root)
+    build_database(config)
+    changed = root / "content" / "bash" / "bash-test.md"
+    changed.write_text("# Bash Test\n\nEdited.")
+
+    watcher = Mock()
+    watcher.wait.side_effect = [{changed}, set()]
+    updates = []
+    processor = TILProcessor(config)
+    processor.watch(
+        watcher,
+        on_update=lambda summary, seconds: updates.append(summary),
+        idle_timeout=0.01,
+    )
+
+    assert updates == [UpdateSummary(updated=1, deleted=0, errors=0)]
+    assert (
+        processor.database.db.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    )
+
+
+def test_build_database_profile(temp_git_repo: Repo, mock_github_api: None) -> None:
+    """Test a profiled build records each stage and file."""
+    config = TILConfig(root_path=Path(temp_git_repo.working_dir))
+    profiler = BuildProfiler()
+
+    TILProcessor(config, profiler=profiler).build_database()
+
+    for stage in ("history", "discover", "read", "render", "upsert", "search"):
+        assert stage in profiler.stages
+    assert profiler.stages["read"].calls == 3
+    assert profiler.stages["render"].bytes > 0
+    assert set(profiler.files["content_python_test-til-1.md"]) == {
+        "read",
+        "render",
+        "upsert",
+    }
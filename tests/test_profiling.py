@@ -0,0 +1,62 @@
+"""Tests for build profiling."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from til.profiling import BuildProfiler
+
+
+def test_stage_records_calls_time_and_bytes() -> None:
+    """Test stages are totalled overall and per file."""
+    profiler = BuildProfiler()
+    with profiler.stage("read", "content_python_a.md") as span:
+        span.bytes = 10
+    with profiler.stage("read", "content_python_b.md") as span:
+        span.bytes = 5
+    profiler.record("render", 0.5, 100, "content_python_a.md")
+    profiler.record("search", 0.25)
+
+    assert profiler.stages["read"].calls == 2
+    assert profiler.stages["read"].bytes == 15
+    assert profiler.stages["render"].seconds == 0.5
+    assert set(profiler.files) == {"content_python_a.md", "content_python_b.md"}
+    assert profiler.files["content_python_a.md"]["render"].bytes == 100
+    assert profiler.slowest_files(1)[0][0] == "content_python_a.md"
+
+
+def test_stage_records_failed_calls() -> None:
+    """Test a call that raises is still timed."""
+    profiler = BuildProfiler()
+    with pytest.raises(ValueError), profiler.stage("render", "content_x_y.md"):
+        raise ValueError("API down")
+
+    assert profiler.stages["render"].calls == 1
+    assert profiler.files["content_x_y.md"]["render"].calls == 1
+
+
+def test_write_report_and_table(tmp_path: Path) -> None:
+    """Test the JSON report and summary table cover every stage."""
+    profiler = BuildProfiler()
+    profiler.record("render", 0.5, 100, "content_python_a.md")
+    profiler.record("upsert", 0.125, 120, "content_python_a.md")
+    profiler.finish()
+    report_path = tmp_path / "reports" / "profile.json"
+
+    profiler.write_report(report_path)
+
+    report = json.loads(report_path.read_text())
+    assert report["version"] == 1
+    assert report["wall_seconds"] == round(profiler.wall_seconds, 6)
+    assert report["stages"]["render"] == {"calls": 1, "seconds": 0.5, "bytes": 100}
+    assert report["files"]["content_python_a.md"]["upsert"]["bytes"] == 120
+    assert not list(report_path.parent.glob(".*.tmp"))
+
+    table = profiler.format_table()
+    lines = table.splitlines()
+    # Slowest stage first
+    assert lines[1].split()[:2] == ["render", "1"]
+    assert lines[2].split()[0] == "upsert"
+    assert "Slowest files" in table
+    assert "content_python_a.md" in table
@@ -0,0 +1,137 @@
+"""Tests for related TIL computation."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from til.database import TILDatabase
+from til.related import RelatedTILs, tokenize
+
+
+pytest.importorskip("numpy")
+
+
+def make_record(path: str, title: str, body: str) -> dict[str, Any]:
+    """Create a complete record for the related tests."""
+    return {
+        "path": path,
+        "slug": path,
+        "topic": "testing",
+        "title": title,
+        "body": body,
+        "html": f"<p>{body}</p>",
+    }
+
+
+@pytest.fixture
+def til_db(temp_dir: Path) -> TILDatabase:
+    """Database with two sqlite entries, one git entry and one bash entry."""
+    til_db = TILDatabase(temp_dir / "test.db")
+    for record in [
+        make_record("sqlite-wal", "SQLite WAL mode", "sqlite wal journal checkpoint"),
+        make_record("sqlite-fts", "SQLite FTS5", "sqlite fts5 index query tokenizer"),
+        make_record("git-rebase", "Git rebase", "git rebase interactive commits"),
+        make_record("bash-loops", "Bash loops", "bash for loop over files"),
+    ]:
+        til_db.upsert_record(record)
+    return til_db
+
+
+def related_paths(til_db: TILDatabase, path: str) -> list[str]:
+    """Stored neighbours for a path, best first."""
+    return [
+        row["related_path"]
+        for row in til_db.db["til_related"].rows_where(
+            "path = ?", [path], order_by="rank"
+        )
+    ]
+
+
+def test_tokenize() -> None:
+    """Test tokenizing drops stopwords and punctuation."""
+    assert tokenize("How to use the SQLite WAL, with Python!") == [
+        "sqlite",
+        "wal",
+        "python",
+    ]
+
+
+def test_refresh_full(til_db: TILDatabase) -> None:
+    """Test first refresh computes neighbours for every entry."""
+    recomputed = RelatedTILs(til_db, top_k=2).refresh()
+
+    assert recomputed == 4
+    assert related_paths(til_db, "sqlite-wal") == ["sqlite-fts"]
+    assert related_paths(til_db, "sqlite-fts") == ["sqlite-wal"]
+    # No shared terms means no neighbours
+    assert related_paths(til_db, "bash-loops") == []
+
+
+def test_refresh_unchanged(til_db: TILDatabase) -> None:
+    """Test refreshing without changes recomputes nothing."""
+    related = RelatedTILs(til_db, top_k=2)
+    related.refresh()
+
+    assert related.refresh() == 0
+
+
+def test_refresh_changed_row_and_neighbours(til_db: TILDatabase) -> None:
+    """Test a changed entry is recomputed along with entries it affects."""
+    related = RelatedTILs(til_db, top_k=2)
+    related.refresh()
+
+    til_db.upsert_record(
+        make_record("bash-loops", "Bash loops", "bash loop over sqlite query output")
+    )
+    recomputed = related.refresh()
+
+    # bash-loops plus its new sqlite neighbours, but not git-rebase
+    assert recomputed == 3
+    assert "bash-loops" in related_paths(til_db, "sqlite-fts")
+    assert related_paths(til_db, "bash-loops")[0] == "sqlite-fts"
+
+
+def test_refresh_changed_row_joins_unchanged_neighbours(temp_dir: Path) -> None:
+    """Test an edit reaches entries it now outranks outside its own top-k."""
+    til_db = TILDatabase(temp_dir / "test.db")
+    for record in [
+        make_record("a", "A", "alpha beta"),
+        make_record("b", "B", "gamma delta"),
+        make_record("c", "C", "kappa lambda"),
+        make_record("d", "D", "delta zeta theta iota omicron"),
+    ]:
+        til_db.upsert_record(record)
+    related = RelatedTILs(til_db, top_k=1)
+    related.refresh()
+    assert related_paths(til_db, "b") == ["d"]
+
+    til_db.upsert_record(make_record("c", "C", "alpha beta gamma"))
+    related.refresh()
+
+    # c's own neighbour is a, yet c now outranks d for b
+    assert related_paths(til_db, "c") == ["a"]
+    assert related_paths(til_db, "b") == ["c"]
+
+
+def test_refresh_added_row_recomputes_all(til_db: TILDatabase) -> None:
+    """Test adding an entry recomputes every entry for the new IDF weights."""
+    related = RelatedTILs(til_db, top_k=2)
+    related.refresh()
+
+    til_db.upsert_record(make_record("git-log", "Git log", "git log graph"))
+
+    assert related.refresh() == 5
+
+
+def test_refresh_removed_row(til_db: TILDatabase) -> None:
+    """Test neighbours pointing at a removed entry are recomputed."""
+    related = RelatedTILs(til_db, top_k=2)
+    related.refresh()
+
+    til_db.get_table().delete("sqlite-fts")
+    related.refresh()
+
+    assert related_paths(til_db, "sqlite-wal") == []
+    assert related_paths(til_db, "sqlite-fts") == []
+    assert til_db.db["til_related_state"].count == 3
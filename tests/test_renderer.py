@@ -8,6 +8,7 @@ from pytest import LogCaptureFixture
 
 from til.config import TILConfig
 from til.exceptions import APIError, RenderingError
+from til.metrics import BuildMetrics
 from til.renderer import MarkdownRenderer
 
 
@@ -172,9 +173,11 @@ def test_render_request_error_then_success(
     assert mock_post.call_count == 2
 
 
+@patch("time.sleep")
 @patch("httpx.post")
 def test_render_rate_limit(
     mock_post: Mock,
+    mock_sleep: Mock,
 ) -> None:
     """Test handling of rate limit response."""
     # Mock 403 rate limit response
@@ -190,6 +193,51 @@ def test_render_rate_limit(
         renderer.render("# Test")
 
     assert mock_post.call_count == 2
+    # Backs off before retrying instead of spending more of the budget
+    mock_sleep.assert_called_once_with(1)
+
+
+@patch("time.sleep")
+@patch("httpx.post")
+def test_render_rate_limit_backs_off_exponentially(
+    mock_post: Mock,
+    mock_sleep: Mock,
+) -> None:
+    """Test waits between rate-limited attempts grow until a render succeeds."""
+    rate_limited = Mock(status_code=403, text="API rate limit exceeded")
+    success = Mock(status_code=200, text="<h1>Test</h1>")
+    mock_post.side_effect = [rate_limited, rate_limited, success]
+    config = TILConfig(github_token="test_token", max_retries=3, retry_delay=1)
+    renderer = MarkdownRenderer(config)
+
+    assert renderer.render("# Test") == "<h1>Test</h1>"
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+
+
+@patch("time.sleep")
+@patch("httpx.post")
+def test_render_counts_retries_and_backoff(
+    mock_post: Mock,
+    mock_sleep: Mock,
+) -> None:
+    """Test retries, rate limits and backoff sleeps are counted."""
+    rate_limited = Mock(status_code=403, text="API rate limit exceeded")
+    server_error = Mock(status_code=502, text="Bad gateway")
+    success = Mock(status_code=200, text="<h1>Test</h1>")
+    mock_post.side_effect = [rate_limited, server_error, success]
+    metrics = BuildMetrics()
+    config = TILConfig(github_token="test_token", max_retries=3, retry_delay=1)
+    renderer = MarkdownRenderer(config, metrics=metrics)
+
+    assert renderer.render("# Test") == "<h1>Test</h1>"
+
+    assert metrics.values["til_api_retries"][()] == 2
+    assert metrics.values["til_api_rate_limited"][()] == 1
+    sleeps = metrics.values["til_api_backoff_sleeps"]
+    assert sleeps[(("reason", "rate_limit"),)] == 1
+    assert sleeps[(("reason", "status"),)] == 1
+    assert metrics.values["til_api_backoff_seconds"][()] == 3
 
 
 @patch("httpx.post")
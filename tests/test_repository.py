@@ -2,6 +2,7 @@
 
 import pathlib
 from pathlib import Path
+from unittest.mock import patch
 
 import git
 import pytest
@@ -122,3 +123,31 @@ def test_get_file_history_multiple_commits(temp_git_repo: Repo, temp_dir: Path)
 
     # The updated time should match the second commit
     assert updated_time == second_commit.committed_datetime.isoformat()
+
+
+def test_get_file_history_cached(temp_git_repo: Repo, temp_dir: Path) -> None:
+    """Test history is reused and extended with new commits only."""
+    git_repo = GitRepository(pathlib.Path(temp_git_repo.working_dir))
+    first = git_repo.get_file_history()
+
+    with patch.object(git_repo.repo, "iter_commits") as iter_commits:
+        assert git_repo.get_file_history() == first
+        iter_commits.assert_not_called()
+
+    new_file = temp_dir / "content" / "python" / "cached.md"
+    new_file.write_text("# Cached\n\nNew commit.")
+    temp_git_repo.index.add(["content/python/cached.md"])
+    temp_git_repo.index.commit("Add cached TIL")
+
+    with patch.object(
+        git_repo.repo, "iter_commits", wraps=git_repo.repo.iter_commits
+    ) as iter_commits:
+        history = git_repo.get_file_history()
+        (rev,) = iter_commits.call_args.args
+        assert ".." in rev
+
+    assert history == GitRepository(temp_dir).get_file_history()
+    assert (
+        history["content/python/test-til-1.md"] == first["content/python/test-til-1.md"]
+    )
+    assert "content/python/cached.md" in history
@@ -0,0 +1,128 @@
+"""Tests for ShadowBuild class."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from til.database import TILDatabase
+from til.exceptions import DatabaseError
+from til.shadow_build import ShadowBuild
+
+
+def add_til(til_db: TILDatabase, slug: str, title: str) -> None:
+    """Insert a TIL with content long enough to pass validation."""
+    til_db.upsert_record(
+        {
+            "path": f"content_python_{slug}.md",
+            "slug": slug,
+            "topic": "python",
+            "title": title,
+            "body": f"# {title}\n\nSomething learned about {title}.",
+            "html": f"<h1>{title}</h1><p>Something learned about {title}.</p>",
+            "created": "2020-01-01T00:00:00",
+            "created_utc": "2020-01-01T00:00:00+00:00",
+            "updated": "2020-01-01T00:00:00",
+            "updated_utc": "2020-01-01T00:00:00+00:00",
+        }
+    )
+    til_db.enable_search()
+
+
+@pytest.fixture
+def live_db(temp_dir: Path) -> Path:
+    """Live database with one TIL."""
+    db_path = temp_dir / "til.db"
+    til_db = TILDatabase(db_path)
+    add_til(til_db, "lists", "Lists")
+    til_db.close()
+    return db_path
+
+
+def titles(db_path: Path) -> list[str]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("select title from til order by path")]
+    finally:
+        conn.close()
+
+
+def test_shadow_swap(live_db: Path) -> None:
+    """Test a validated shadow replaces the live database."""
+    # A reader holding the live database open throughout the build
+    reader = sqlite3.connect(live_db)
+
+    shadow = ShadowBuild(live_db)
+    til_db = TILDatabase(shadow.prepare())
+    add_til(til_db, "dicts", "Dicts")
+    til_db.close()
+
+    # The live database is unchanged until the swap
+    assert titles(live_db) == ["Lists"]
+
+    shadow.validate()
+    shadow.commit()
+
+    assert titles(live_db) == ["Dicts", "Lists"]
+    assert not shadow.path.exists()
+    # The reader still sees the snapshot it opened
+    assert reader.execute("select count(*) from til").fetchone() == (1,)
+    reader.close()
+
+
+def test_shadow_swap_keeps_wal_of_open_readers(live_db: Path) -> None:
+    """Test swapping a WAL database leaves its journal files to its readers."""
+    writer = sqlite3.connect(live_db)
+    writer.execute("PRAGMA journal_mode=WAL")
+    writer.execute("PRAGMA wal_autocheckpoint=0")
+    writer.execute("update til set title = 'Lists v2'")
+    writer.commit()
+    reader = sqlite3.connect(live_db)
+    assert reader.execute("select title from til").fetchone() == ("Lists v2",)
+
+    shadow = ShadowBuild(live_db)
+    til_db = TILDatabase(shadow.prepare())
+    add_til(til_db, "dicts", "Dicts")
+    til_db.close()
+    shadow.validate()
+    shadow.commit()
+
+    wal = live_db.with_name(live_db.name + "-wal")
+    shm = live_db.with_name(live_db.name + "-shm")
+    assert wal.exists()
+    assert shm.exists()
+    assert wal.stat().st_size == 0
+    # The new file is self-contained and nothing of the old WAL is replayed
+    assert titles(live_db) == ["Dicts", "Lists v2"]
+    assert reader.execute("select title from til").fetchone() == ("Lists v2",)
+    reader.close()
+    writer.close()
+
+
+def test_shadow_validation_failure(live_db: Path) -> None:
+    """Test a shadow with a broken search index is refused."""
+    shadow = ShadowBuild(live_db)
+    til_db = TILDatabase(shadow.prepare())
+    til_db.db.execute("drop table til_fts")
+    til_db.close()
+
+    with pytest.raises(DatabaseError, match="til_fts"):
+        shadow.validate()
+
+    shadow.discard()
+    assert not shadow.path.exists()
+    assert titles(live_db) == ["Lists"]
+
+
+def test_shadow_without_live_database(temp_dir: Path) -> None:
+    """Test the first build starts from an empty shadow."""
+    db_path = temp_dir / "til.db"
+    shadow = ShadowBuild(db_path)
+    til_db = TILDatabase(shadow.prepare())
+    add_til(til_db, "lists", "Lists")
+    til_db.close()
+
+    shadow.validate()
+    shadow.commit()
+
+    assert titles(db_path) == ["Lists"]
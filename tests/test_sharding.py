@@ -0,0 +1,53 @@
+"""Tests for build sharding."""
+
+import pytest
+
+from til.exceptions import ConfigurationError
+from til.processor import reconcile_records
+from til.sharding import parse_shard, Shard, shard_number
+
+
+def test_parse_shard() -> None:
+    """Test shards are parsed from i/N."""
+    assert parse_shard("2/4") == Shard(2, 4)
+    assert str(parse_shard(" 1 / 3 ")) == "1/3"
+
+
+@pytest.mark.parametrize("value", ["", "2", "0/4", "5/4", "1/0", "a/b"])
+def test_parse_shard_invalid(value: str) -> None:
+    """Test malformed or out of range shards are rejected."""
+    with pytest.raises(ConfigurationError, match="Invalid shard"):
+        parse_shard(value)
+
+
+def test_shards_partition_paths() -> None:
+    """Test every path lands in exactly one shard, the same one every time."""
+    paths = [f"content_python_{i}.md" for i in range(200)]
+    shards = [Shard(number, 4) for number in range(1, 5)]
+
+    for path in paths:
+        assert sum(shard.includes(path) for shard in shards) == 1
+        assert shard_number(path, 4) == shard_number(path, 4)
+    # Hashing spreads the files across shards
+    assert all(sum(shard.includes(path) for path in paths) > 20 for shard in shards)
+
+
+def test_reconcile_records() -> None:
+    """Test duplicate entries keep newest content and earliest creation."""
+    first = {
+        "title": "Old",
+        "created": "2020-01-01T00:00:00",
+        "created_utc": "2020-01-01T00:00:00+00:00",
+        "updated_utc": "2021-01-01T00:00:00+00:00",
+    }
+    second = {
+        "title": "New",
+        "created": "2022-01-01T00:00:00",
+        "created_utc": "2022-01-01T00:00:00+00:00",
+        "updated_utc": "2023-01-01T00:00:00+00:00",
+    }
+
+    for record in (reconcile_records(first, second), reconcile_records(second, first)):
+        assert record["title"] == "New"
+        assert record["created_utc"] == "2020-01-01T00:00:00+00:00"
+        assert record["created"] == "2020-01-01T00:00:00"
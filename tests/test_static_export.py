@@ -0,0 +1,117 @@
+"""Tests for StaticExporter class."""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from til.database import TILDatabase
+from til.exceptions import ConfigurationError
+from til.static_export import MANIFEST_NAME, page_file, StaticExporter
+
+
+SITE_DIR = Path(__file__).parent.parent
+
+
+def add_til(til_db: TILDatabase, topic: str, slug: str, title: str) -> None:
+    """Insert a TIL and refresh the aggregates the templates read."""
+    til_db.upsert_record(
+        {
+            "path": f"content_{topic}_{slug}.md",
+            "slug": slug,
+            "topic": topic,
+            "title": title,
+            "body": title,
+            "html": f"<p>{title}</p>",
+            "created": "2023-01-01T00:00:00",
+            "created_utc": "2023-01-01T00:00:00+00:00",
+            "updated": "2023-01-01T00:00:00",
+            "updated_utc": "2023-01-01T00:00:00+00:00",
+        }
+    )
+    til_db.refresh_aggregates()
+
+
+@pytest.fixture
+def til_db(temp_dir: Path) -> TILDatabase:
+    """Built database with one TIL in each of two topics."""
+    til_db = TILDatabase(temp_dir / "til.db")
+    til_db.create_related_tables()
+    add_til(til_db, "python", "lists", "Python lists")
+    add_til(til_db, "bash", "loops", "Bash loops")
+    return til_db
+
+
+def test_page_file() -> None:
+    """Test pages are written as directory index files."""
+    assert page_file("/") == "index.html"
+    assert page_file("/all") == "all/index.html"
+    assert page_file("/python/lists") == "python/lists/index.html"
+
+
+def test_export_writes_site(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test exporting renders every page, assets, feeds and sitemap."""
+    output_dir = temp_dir / "site"
+    result = StaticExporter(til_db, output_dir, SITE_DIR, jobs=2).export()
+
+    assert result.written == [
+        "/",
+        "/all",
+        "/bash",
+        "/bash/loops",
+        "/python",
+        "/python/lists",
+    ]
+    assert "Python lists" in (output_dir / "python/lists/index.html").read_text()
+    assert "Bash loops" in (output_dir / "all/index.html").read_text()
+    assert (output_dir / "static/style.css").exists()
+    assert (output_dir / "feeds/feed.atom").exists()
+    assert "/python/lists</loc>" in (output_dir / "sitemap.xml").read_text()
+
+    # Every page has a precompressed variant
+    page = (output_dir / "python/lists/index.html").read_bytes()
+    assert (
+        gzip.decompress((output_dir / "python/lists/index.html.gz").read_bytes())
+        == page
+    )
+
+
+def test_export_incremental(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test only pages whose inputs changed are rendered again."""
+    output_dir = temp_dir / "site"
+    exporter = StaticExporter(til_db, output_dir, SITE_DIR)
+    exporter.export()
+
+    result = exporter.export()
+    assert result.written == []
+    assert result.unchanged == 6
+
+    add_til(til_db, "bash", "loops", "Bash loops updated")
+    result = exporter.export()
+
+    assert "/python/lists" not in result.written
+    assert {"/all", "/bash", "/bash/loops"} <= set(result.written)
+    assert "Bash loops updated" in (output_dir / "bash/loops/index.html").read_text()
+
+
+def test_export_removes_deleted_pages(til_db: TILDatabase, temp_dir: Path) -> None:
+    """Test pages for deleted TILs are removed along with empty directories."""
+    output_dir = temp_dir / "site"
+    exporter = StaticExporter(til_db, output_dir, SITE_DIR)
+    exporter.export()
+
+    til_db.get_table().delete("content_bash_loops.md")
+    til_db.refresh_aggregates()
+    result = exporter.export()
+
+    assert result.removed == ["/bash", "/bash/loops"]
+    assert not (output_dir / "bash").exists()
+    manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+    assert "/bash/loops" not in manifest
+
+
+def test_export_requires_til_database(temp_dir: Path) -> None:
+    """Test the database must be named til.db for the templates."""
+    with pytest.raises(ConfigurationError, match=r"til\.db"):
+        StaticExporter(TILDatabase(temp_dir / "other.db"), temp_dir, SITE_DIR)
@@ -0,0 +1,158 @@
+"""Tests for build tracing."""
+
+import json
+import logging
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from git import Repo
+
+from til import tracing
+from til.config import TILConfig
+from til.logging_config import ContextFilter
+from til.processor import TILProcessor
+from til.renderer import MarkdownRenderer
+from til.tracing import start_tracing, stop_tracing, traced, Tracer
+
+
+@pytest.fixture
+def tracer() -> Iterator[Tracer]:
+    """Tracer active for the duration of a test."""
+    active = start_tracing(Tracer(request_id="test-request"))
+    try:
+        yield active
+    finally:
+        stop_tracing()
+
+
+def spans(tracer: Tracer) -> list[dict]:
+    """Complete events recorded by a tracer."""
+    return [event for event in tracer.events if event["ph"] == "X"]
+
+
+def test_span_nesting_and_collapsed_stacks() -> None:
+    """Test nested spans become stacks weighted by their own time."""
+    tracer = Tracer(request_id="abc")
+    with tracer.span("build", "build"), tracer.span("content_a.md", "file") as args:
+        args["bytes"] = 3
+
+    events = spans(tracer)
+    assert [event["name"] for event in events] == ["content_a.md", "build"]
+    assert events[0]["args"] == {"bytes": 3, "request_id": "abc"}
+    assert events[1]["ts"] <= events[0]["ts"]
+    assert events[1]["dur"] >= events[0]["dur"]
+    assert {line.rsplit(" ", 1)[0] for line in tracer.collapsed_stacks()} <= {
+        "build",
+        "build;content_a.md",
+    }
+    assert tracer.stacks["build;content_a.md"] == pytest.approx(events[0]["dur"], abs=1)
+
+
+def test_slow_files_and_waits_are_highlighted() -> None:
+    """Test slow file spans and waits get a highlight colour."""
+    tracer = Tracer(slow_file=0)
+    with tracer.span("content_a.md", "file"):
+        pass
+    with tracer.span("backoff", "wait"):
+        pass
+    tracer.instant("rate limited", "wait")
+
+    slow, wait = spans(tracer)
+    assert slow["args"]["slow"] is True
+    assert slow["cname"] == tracing.SLOW_COLOR
+    assert wait["cname"] == tracing.WAIT_COLOR
+    assert tracer.events[-1]["ph"] == "i"
+
+
+def test_request_id_from_logging(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test traces are tagged with the logging ContextFilter's request_id."""
+    monkeypatch.setattr(logging.getLogger(), "filters", [ContextFilter("from-logs")])
+
+    assert Tracer().request_id == "from-logs"
+
+
+def test_chrome_trace_names_threads(tmp_path: Path) -> None:
+    """Test the Chrome trace lists spans from every thread."""
+    tracer = Tracer(request_id="abc")
+
+    def work() -> None:
+        with tracer.span("render", "stage"):
+            pass
+
+    thread = threading.Thread(target=work, name="til-source_0")
+    thread.start()
+    thread.join()
+    work()
+    trace_path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(trace_path)
+
+    trace = json.loads(trace_path.read_text())
+    assert trace["otherData"]["request_id"] == "abc"
+    threads = {
+        event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"
+    }
+    assert threads == {"til-source_0", threading.current_thread().name}
+    assert len({event["tid"] for event in trace["traceEvents"]}) == 2
+
+
+def test_traced_only_records_while_tracing() -> None:
+    """Test decorated functions add spans only when a tracer is active."""
+
+    @traced("work", "test")
+    def work() -> int:
+        return 1
+
+    assert work() == 1
+    tracer = start_tracing()
+    try:
+        assert work() == 1
+    finally:
+        assert stop_tracing() is tracer
+    work()
+
+    assert [event["name"] for event in spans(tracer)] == ["work"]
+
+
+@patch("time.sleep")
+@patch("httpx.post")
+def test_render_traces_requests_and_backoff(
+    mock_post: Mock, mock_sleep: Mock, tracer: Tracer
+) -> None:
+    """Test API requests and retry waits show up in the trace."""
+    failure = Mock(status_code=500, text="Server error")
+    success = Mock(status_code=200, text="<h1>Test</h1>")
+    mock_post.side_effect = [failure, success]
+    renderer = MarkdownRenderer(TILConfig(max_retries=2, retry_delay=1))
+
+    renderer.render("# Test")
+
+    events = spans(tracer)
+    assert [(event["name"], event["cat"]) for event in events] == [
+        ("POST markdown", "http"),
+        ("backoff", "wait"),
+        ("POST markdown", "http"),
+    ]
+    assert [event["args"].get("status") for event in events] == [500, None, 200]
+    mock_sleep.assert_called_once_with(1)
+
+
+def test_build_trace(
+    temp_git_repo: Repo, mock_github_api: None, tracer: Tracer
+) -> None:
+    """Test a traced build covers repository, files, rendering and database."""
+    config = TILConfig(root_path=Path(temp_git_repo.working_dir))
+
+    TILProcessor(config).build_database()
+
+    events = spans(tracer)
+    categories = {event["cat"] for event in events}
+    assert {"build", "repository", "file", "stage", "http", "database"} <= categories
+    files = {event["name"] for event in events if event["cat"] == "file"}
+    assert "content_python_test-til-1.md" in files
+    assert any(
+        line.startswith("build;content_python_test-til-1.md;render;POST markdown ")
+        for line in tracer.collapsed_stacks()
+    )
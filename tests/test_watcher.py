@@ -0,0 +1,123 @@
+"""Tests for watching content directories."""
+
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from til.watcher import (
+    ContentWatcher,
+    create_watcher,
+    InotifyWatcher,
+    PollingWatcher,
+)
+
+
+linux_only = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux only"
+)
+
+
+@pytest.fixture
+def content_root(temp_dir: Path) -> Path:
+    """Content root with one TIL."""
+    topic = temp_dir / "content" / "python"
+    topic.mkdir(parents=True)
+    (topic / "lists.md").write_text("# Lists\n\nSlicing.")
+    return temp_dir
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        pytest.param(lambda roots: PollingWatcher(roots, interval=0.01), id="poll"),
+        pytest.param(InotifyWatcher, id="inotify", marks=linux_only),
+    ],
+)
+def test_detects_changes(
+    content_root: Path, factory: Callable[..., ContentWatcher]
+) -> None:
+    """Test edits, new files, renames into place and deletes are reported."""
+    topic = content_root / "content" / "python"
+    with factory([content_root]) as watcher:
+        assert watcher.wait(0.02, timeout=0.05) == set()
+
+        (topic / "lists.md").write_text("# Lists\n\nSlicing and more.")
+        assert watcher.wait(0.02, timeout=2) == {topic / "lists.md"}
+
+        draft = topic / ".dicts.md.swp"
+        draft.write_text("# Dicts\n\nMerging.")
+        draft.rename(topic / "dicts.md")
+        (topic / "notes.txt").write_text("Not a TIL")
+        assert watcher.wait(0.02, timeout=2) == {topic / "dicts.md"}
+
+        (topic / "dicts.md").unlink()
+        assert watcher.wait(0.02, timeout=2) == {topic / "dicts.md"}
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        pytest.param(lambda roots: PollingWatcher(roots, interval=0.01), id="poll"),
+        pytest.param(InotifyWatcher, id="inotify", marks=linux_only),
+    ],
+)
+def test_topic_moved_out_of_content(
+    content_root: Path, factory: Callable[..., ContentWatcher]
+) -> None:
+    """Test moving a topic directory away reports each of its files deleted."""
+    topic = content_root / "content" / "python"
+    (topic / "dicts.md").write_text("# Dicts\n\nMerging.")
+    with factory([content_root]) as watcher:
+        archived = content_root / "archive"
+        topic.rename(archived)
+        assert watcher.wait(0.02, timeout=2) == {
+            topic / "lists.md",
+            topic / "dicts.md",
+        }
+
+        # Edits in the moved directory are no longer under content/
+        (archived / "lists.md").write_text("# Lists\n\nArchived.")
+        assert watcher.wait(0.02, timeout=0.2) == set()
+
+        renamed = content_root / "content" / "py"
+        archived.rename(renamed)
+        assert watcher.wait(0.02, timeout=2) == {
+            renamed / "lists.md",
+            renamed / "dicts.md",
+        }
+
+
+@linux_only
+def test_inotify_watches_new_topics(content_root: Path) -> None:
+    """Test a topic directory created while watching is picked up."""
+    with InotifyWatcher([content_root]) as watcher:
+        topic = content_root / "content" / "bash"
+        topic.mkdir()
+        assert watcher.wait(0.02, timeout=0.2) == set()
+
+        (topic / "loops.md").write_text("# Loops\n\nfor i in.")
+        assert watcher.wait(0.02, timeout=2) == {topic / "loops.md"}
+
+
+def test_debounce_collects_burst(content_root: Path) -> None:
+    """Test changes arriving within the debounce period are returned together."""
+    topic = content_root / "content" / "python"
+
+    class Burst(ContentWatcher):
+        def __init__(self) -> None:
+            super().__init__([content_root])
+            self.batches = [{topic / "a.md"}, {topic / "b.md"}, set()]
+
+        def poll(self, timeout: object) -> set[Path]:
+            return self.batches.pop(0) if self.batches else set()
+
+    assert Burst().wait(0.01) == {topic / "a.md", topic / "b.md"}
+
+
+@linux_only
+def test_create_watcher_prefers_inotify(content_root: Path) -> None:
+    """Test inotify is used on Linux."""
+    with create_watcher([content_root]) as watcher:
+        assert isinstance(watcher, InotifyWatcher)